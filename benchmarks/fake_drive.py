@@ -0,0 +1,373 @@
+from googleapiclient.errors import HttpError
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from collections import Counter, deque
+import httplib2
+import itertools
+import json
+import random
+import re
+import threading
+import time
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+# Statuses injected by error_rate, picked at random: rate limiting and transient server errors
+INJECTED_STATUSES = (429, 500, 503)
+
+# Matches one "'<id>' in parents" term of a files.list query
+PARENTS_TERM = re.compile(r"'([^']+)' in parents")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Parses a partial response selector such as "nextPageToken, files(id, name)" into a
+    nested dict, e.g. {"nextPageToken": None, "files": {"id": None, "name": None}}.
+    Returns None for an empty selector, which selects everything.
+    """
+    if not fields or fields.strip() == "*":
+        return None
+    root: Dict[str, Any] = {}
+    stack = [root]
+    name = ""
+    for char in fields + ",":
+        if char == "(":
+            child: Dict[str, Any] = {}
+            stack[-1][name.strip()] = child
+            stack.append(child)
+            name = ""
+        elif char in ",)":
+            if name.strip():
+                stack[-1][name.strip()] = None
+            name = ""
+            if char == ")":
+                stack.pop()
+        else:
+            name += char
+    return root
+
+
+def project(value: Any, selector: Optional[Dict[str, Any]]) -> Any:
+    """
+    Keeps only the selected fields of a response, like the fields parameter of the real API.
+    """
+    if selector is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, selector) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], sub) for key, sub in selector.items() if key in value}
+
+
+def http_error(status: int, reason: str = "", retry_after: Optional[float] = None) -> HttpError:
+    """
+    Builds the HttpError the Drive client raises for an error response.
+    """
+    headers = {"status": str(status)}
+    if retry_after is not None:
+        headers["retry-after"] = str(retry_after)
+    content = json.dumps({"error": {"code": status, "errors": [{"reason": reason}] if reason else []}})
+    return HttpError(httplib2.Response(headers), content.encode("utf-8"), uri="fake://drive/v3")
+
+
+def parse_response(resp: Any, content: bytes) -> Dict[str, Any]:
+    return json.loads(content)
+
+
+class FakeRequest:
+    """
+    An unexecuted call, mirroring googleapiclient's HttpRequest: nothing happens until execute(),
+    and the JSON response body goes through postproc like a real response does.
+    """
+
+    def __init__(self, drive: "FakeDrive", method: str, params: Dict[str, Any]):
+        self.drive = drive
+        self.method = method
+        self.params = params
+        self.postproc = parse_response
+
+    def execute(self) -> Dict[str, Any]:
+        self.drive.round_trip()
+        return self.postproc(None, self.drive.call(self.method, self.params))
+
+
+class FakeBatch:
+    """
+    A batch request: one round trip carrying up to 100 calls, each answered or failed on its own.
+    """
+
+    def __init__(self, drive: "FakeDrive", callback: Optional[Callable[[str, Any, Optional[Exception]], None]]):
+        self.drive = drive
+        self.callback = callback
+        self.requests: List[Tuple[str, FakeRequest, Optional[Callable]]] = []
+        self._ids = itertools.count(1)
+
+    def add(self, request: FakeRequest, callback: Optional[Callable] = None, request_id: Optional[str] = None) -> None:
+        if len(self.requests) >= 100:
+            raise ValueError("A batch request holds at most 100 calls")
+        self.requests.append((request_id or str(next(self._ids)), request, callback))
+
+    def execute(self) -> None:
+        self.drive.round_trip(batch=True)
+        for request_id, request, callback in self.requests:
+            try:
+                response, exception = request.postproc(None, self.drive.call(request.method, request.params)), None
+            except HttpError as e:
+                response, exception = None, e
+            (callback or self.callback)(request_id, response, exception)
+
+
+class _Collection:
+    """
+    The object returned by service.files() or service.changes(): builds FakeRequests for its methods.
+    """
+
+    def __init__(self, drive: "FakeDrive", name: str):
+        self.drive = drive
+        self.name = name
+
+    def __getattr__(self, method: str) -> Callable[..., FakeRequest]:
+        if f"{self.name}.{method}" not in self.drive.handlers:
+            raise AttributeError(f"The fake Drive service has no method {self.name}.{method}")
+        return lambda **params: FakeRequest(self.drive, f"{self.name}.{method}", params)
+
+
+class FakeDrive:
+    """
+    In-process stand-in for a Drive v3 service object, for offline tests and benchmarks.
+
+    It answers files.list (parents queries, including coalesced "or" queries, and whole-corpus
+    scans, with pageSize/pageToken pagination and fields projection), files.get, files.create,
+    files.copy and files.update, batch requests, and changes.getStartPageToken/changes.list.
+    Every mutation is recorded in the change log, as on the real service.
+
+    Behaviour of the real service that matters for performance can be simulated:
+    latency (seconds per HTTP round trip; a batch is one round trip), error_rate (the share of
+    calls failing with a random 429/500/503), and quota_qps (calls per second above which calls
+    fail with 403 userRateLimitExceeded). Errors carry a Retry-After of retry_after seconds.
+
+    The same instance can be handed to every worker thread: it is thread-safe, and latency is
+    spent outside its lock so concurrent callers overlap like real connections do.
+
+    Attributes:
+        calls (Counter): Number of calls by method name, e.g. calls["files.list"].
+        round_trips (int): Number of HTTP round trips, counting each batch once.
+        errors (Counter): Number of injected errors by HTTP status.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, quota_qps: Optional[float] = None,
+                 retry_after: float = 0.0, page_size_limit: int = 1000, seed: Optional[int] = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_qps = quota_qps
+        self.retry_after = retry_after
+        self.page_size_limit = page_size_limit
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.change_log: List[str] = []
+        self.calls: Counter = Counter()
+        self.round_trips = 0
+        self.errors: Counter = Counter()
+        self._scheduled: deque = deque()
+        self._recent_calls: deque = deque()
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "files.list": self._files_list,
+            "files.get": self._files_get,
+            "files.create": self._files_create,
+            "files.copy": self._files_copy,
+            "files.update": self._files_update,
+            "changes.getStartPageToken": self._changes_start_token,
+            "changes.list": self._changes_list,
+        }
+
+    # Service object interface
+
+    def files(self) -> _Collection:
+        return _Collection(self, "files")
+
+    def changes(self) -> _Collection:
+        return _Collection(self, "changes")
+
+    def new_batch_http_request(self, callback: Optional[Callable] = None) -> FakeBatch:
+        return FakeBatch(self, callback)
+
+    # Setup and inspection
+
+    def add_item(self, item: Dict[str, Any], parent_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Stores an item directly, without counting a call or recording a change.
+        The item needs at least a name and mimeType; an id is generated when it has none.
+        """
+        with self._lock:
+            return self._store(dict(item), parent_id, record=False)
+
+    def add_folder(self, name: str, parent_id: Optional[str] = None, folder_id: Optional[str] = None) -> str:
+        return self.add_item({"id": folder_id, "name": name, "mimeType": FOLDER_MIME_TYPE}, parent_id)["id"]
+
+    def fail_next(self, status: int, count: int = 1, reason: str = "") -> None:
+        """
+        Makes the next count calls fail with the given status, before any random errors.
+        """
+        with self._lock:
+            self._scheduled.extend([(status, reason)] * count)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+            self.round_trips = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    # Request handling
+
+    def round_trip(self, batch: bool = False) -> None:
+        """
+        Counts one HTTP round trip and spends the configured latency, outside the lock.
+        """
+        with self._lock:
+            self.round_trips += 1
+            self.calls["batch"] += int(batch)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def call(self, method: str, params: Dict[str, Any]) -> bytes:
+        """
+        Answers one call with a JSON response body, or raises the HttpError the real client would raise.
+        """
+        with self._lock:
+            self.calls[method] += 1
+            error = self._injected_error()
+            if error is not None:
+                self.errors[error.resp.status] += 1
+                raise error
+            response = self.handlers[method](params)
+        return json.dumps(project(response, parse_fields(params.get("fields")))).encode("utf-8")
+
+    def _injected_error(self) -> Optional[HttpError]:
+        if self._scheduled:
+            status, reason = self._scheduled.popleft()
+            return http_error(status, reason, self.retry_after)
+        if self.quota_qps is not None:
+            now = time.monotonic()
+            while self._recent_calls and now - self._recent_calls[0] >= 1.0:
+                self._recent_calls.popleft()
+            if len(self._recent_calls) >= self.quota_qps:
+                return http_error(403, "userRateLimitExceeded", self.retry_after)
+            self._recent_calls.append(now)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return http_error(self._random.choice(INJECTED_STATUSES), retry_after=self.retry_after)
+        return None
+
+    def _store(self, item: Dict[str, Any], parent_id: Optional[str], record: bool = True) -> Dict[str, Any]:
+        if not item.get("id"):
+            item["id"] = f"fake-{next(self._ids)}"
+        if parent_id is not None:
+            item["parents"] = [parent_id]
+            self.children.setdefault(parent_id, []).append(item["id"])
+        item.setdefault("trashed", False)
+        item.setdefault("modifiedTime", "2024-01-01T00:00:00.000Z")
+        self.items[item["id"]] = item
+        if item["mimeType"] == FOLDER_MIME_TYPE:
+            self.children.setdefault(item["id"], [])
+        if record:
+            self.change_log.append(item["id"])
+        return item
+
+    def _get(self, file_id: str) -> Dict[str, Any]:
+        item = self.items.get(file_id)
+        if item is None:
+            raise http_error(404, "notFound")
+        return item
+
+    def _files_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        query = params.get("q", "")
+        parent_ids = PARENTS_TERM.findall(query)
+        if parent_ids:
+            ids = [child for parent_id in parent_ids for child in self.children.get(parent_id, [])]
+        else:
+            # A query without parents terms pages through the whole corpus
+            ids = list(self.items)
+        matches = [self.items[file_id] for file_id in ids
+                   if not ("trashed=false" in query.replace(" ", "") and self.items[file_id]["trashed"])]
+
+        if params.get("orderBy"):
+            matches = self._ordered(matches, params["orderBy"])
+
+        start = int(params.get("pageToken") or 0)
+        page_size = min(params.get("pageSize") or 100, self.page_size_limit)
+        response: Dict[str, Any] = {"files": [dict(item) for item in matches[start:start + page_size]]}
+        if start + page_size < len(matches):
+            response["nextPageToken"] = str(start + page_size)
+        return response
+
+    @staticmethod
+    def _ordered(items: List[Dict[str, Any]], order_by: str) -> List[Dict[str, Any]]:
+        """
+        Sorts listed items like the orderBy parameter, for the "folder" and "name" keys (optionally "desc").
+        """
+        for key in reversed([key.strip() for key in order_by.split(",")]):
+            name, _, direction = key.partition(" ")
+            if name == "folder":
+                sort_key: Callable[[Dict[str, Any]], Any] = lambda item: item["mimeType"] != FOLDER_MIME_TYPE
+            elif name == "name":
+                sort_key = lambda item: item["name"]
+            else:
+                raise http_error(400, "invalidParameter")
+            items = sorted(items, key=sort_key, reverse=direction.strip() == "desc")
+        return items
+
+    def _files_get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(self._get(params["fileId"]))
+
+    def _files_create(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        body = dict(params["body"])
+        parents = body.pop("parents", [None])
+        for parent_id in parents:
+            if parent_id is not None:
+                self._get(parent_id)
+        return dict(self._store(body, parents[0]))
+
+    def _files_copy(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        source = self._get(params["fileId"])
+        if source["mimeType"] == FOLDER_MIME_TYPE:
+            raise http_error(403, "cannotCopyFile")
+        body = dict(params.get("body", {}))
+        parents = body.pop("parents", source.get("parents", [None]))
+        self._get(parents[0])
+        copy = {key: value for key, value in source.items() if key not in ("id", "parents", "trashed")}
+        copy.update(body)
+        return dict(self._store(copy, parents[0]))
+
+    def _files_update(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        item = self._get(params["fileId"])
+        item.update(params.get("body", {}))
+        for parent_id in filter(None, (params.get("removeParents") or "").split(",")):
+            self.children[parent_id].remove(item["id"])
+            item["parents"] = [p for p in item.get("parents", []) if p != parent_id]
+        for parent_id in filter(None, (params.get("addParents") or "").split(",")):
+            self.children.setdefault(parent_id, []).append(item["id"])
+            item["parents"] = item.get("parents", []) + [parent_id]
+        self.change_log.append(item["id"])
+        return dict(item)
+
+    def _changes_start_token(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"startPageToken": str(len(self.change_log))}
+
+    def _changes_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        start = int(params["pageToken"])
+        page_size = min(params.get("pageSize") or 100, self.page_size_limit)
+        end = min(start + page_size, len(self.change_log))
+        changes = [{"fileId": file_id, "removed": False, "file": dict(self.items[file_id])}
+                   for file_id in self.change_log[start:end]]
+        response: Dict[str, Any] = {"changes": changes}
+        if end < len(self.change_log):
+            response["nextPageToken"] = str(end)
+        else:
+            response["newStartPageToken"] = str(end)
+        return response
@@ -0,0 +1,120 @@
+from typing import Dict, List, Any, Optional
+from benchmarks.fake_drive import FakeDrive
+from benchmarks.trees import skewed_tree
+from gdrive.fields import COUNT_FIELDS, COUNT_TREE_FIELDS, COMPARE_FIELDS, TREE_FIELDS, RENDER_FIELDS
+from gdrive.metrics import reset_metrics
+from gdrive.retry import configure_rate_limit, get_rate_limiter, set_rate_limiter
+from gdrive.tree import DriveTree, FOLDER_MIME_TYPE
+from gdrive.utils import list_drive_files
+import argparse
+import json
+import sys
+import tracemalloc
+
+# Projections whose response sizes are compared, with what the count and compare paths
+# requested before they had projections of their own
+PROJECTIONS = {
+    "count": COUNT_FIELDS,
+    "count (before)": "files(id, mimeType)",
+    "count tree": COUNT_TREE_FIELDS,
+    "compare": COMPARE_FIELDS,
+    "compare (before)": "files(id, name, mimeType, size, modifiedTime, md5Checksum)",
+    "tree": TREE_FIELDS,
+    "render": RENDER_FIELDS,
+}
+
+# Items per simulated files.list page when measuring memory
+PAGE_SIZE = 1000
+
+
+def measure_payloads(scale: int = 1) -> Dict[str, float]:
+    """
+    Lists the same folder of the skewed synthetic tree with every projection and returns
+    the response bytes per item each one costs.
+    """
+    previous = get_rate_limiter()
+    configure_rate_limit(1e9)
+    try:
+        drive = FakeDrive()
+        root_id = skewed_tree(drive, scale)
+        big_id = drive.children[root_id][0]
+        result = {}
+        for name, fields in PROJECTIONS.items():
+            metrics = reset_metrics()
+            items = sum(1 for _ in list_drive_files(drive, big_id, fields))
+            result[name] = round(metrics.total("bytes_received") / items, 1)
+        return result
+    finally:
+        set_rate_limiter(previous)
+
+
+def _pages(items: int) -> List[bytes]:
+    """
+    Builds files.list responses the way the API sends them, as JSON, so decoding gives every
+    item its own string objects just like a real crawl.
+    """
+    pages = []
+    for start in range(0, items, PAGE_SIZE):
+        files = []
+        for index in range(start, min(start + PAGE_SIZE, items)):
+            folder = index % 10 == 0
+            file = {"id": f"{index:028d}", "name": f"item-{index}", "mimeType": FOLDER_MIME_TYPE if folder else "application/pdf",
+                    "modifiedTime": "2024-01-01T00:00:00.000Z"}
+            if not folder:
+                file.update(size=str(index * 7), md5Checksum=f"{index:032x}")
+            files.append(file)
+        pages.append(json.dumps({"files": files}).encode())
+    return pages
+
+
+def measure_memory(items: int) -> Dict[str, Any]:
+    """
+    Decodes items pages of crawl results and measures, with tracemalloc, the memory still held
+    once they are kept as raw API dictionaries and once they are kept as DriveTree nodes.
+
+    Returns:
+        Dict[str, Any]: The item count and the bytes per item retained by each representation.
+    """
+    pages = _pages(items)
+    result: Dict[str, Any] = {"items": items}
+
+    tracemalloc.start()
+    kept: List[Dict[str, Any]] = []
+    for page in pages:
+        kept.extend(json.loads(page)["files"])
+    result["dict_bytes_per_item"] = round(tracemalloc.get_traced_memory()[0] / items, 1)
+    del kept
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    tree = DriveTree("root")
+    for page in pages:
+        for item in json.loads(page)["files"]:
+            tree.add_item(item, "root")
+    result["node_bytes_per_item"] = round(tracemalloc.get_traced_memory()[0] / items, 1)
+    del tree
+    tracemalloc.stop()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure response bytes per field projection and memory per crawled item")
+    parser.add_argument("--items", type=int, default=200000, help="Number of crawled items to hold in memory")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplies the size of the listed folder")
+    parser.add_argument("--json", action="store_true", help="Print the result as one JSON line")
+    args = parser.parse_args(argv)
+
+    result = {"bytes_per_item": measure_payloads(args.scale), "memory": measure_memory(args.items)}
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for name, size in result["bytes_per_item"].items():
+            print(f"{name:<24} {size:>8.1f} response bytes per item")
+        memory = result["memory"]
+        print(f"{'raw dicts':<24} {memory['dict_bytes_per_item']:>8.1f} bytes per item held ({memory['items']} items)")
+        print(f"{'tree nodes':<24} {memory['node_bytes_per_item']:>8.1f} bytes per item held")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+from typing import Dict, List, Any, Optional
+from gdrive.columnar import ColumnarTree, np
+import argparse
+import json
+import random
+import sys
+import time
+
+# Share of synthetic items that are folders, as in a typical drive
+FOLDER_SHARE = 0.1
+
+
+def synthetic_tree(items: int, seed: int = 0) -> ColumnarTree:
+    """
+    Builds a random tree of the given size: every item is placed in a folder picked at random
+    among those created so far, which gives a few dozen levels at a few million items.
+    """
+    rng = random.Random(seed)
+    tree = ColumnarTree("root")
+    folders = ["root"]
+    for index in range(1, items):
+        item_id = f"item-{index}"
+        is_folder = rng.random() < FOLDER_SHARE
+        tree.add(item_id, folders[rng.randrange(len(folders))], is_folder, 0 if is_folder else rng.randrange(1 << 20))
+        if is_folder:
+            folders.append(item_id)
+    return tree
+
+
+def measure_rollups(items: int) -> Dict[str, Any]:
+    """
+    Times building a synthetic ColumnarTree and rolling it up, vectorized when NumPy is installed
+    and in pure Python.
+
+    Returns:
+        Dict[str, Any]: The item count, the tree's depth and the seconds each step took.
+    """
+    start = time.perf_counter()
+    tree = synthetic_tree(items)
+    result: Dict[str, Any] = {"items": len(tree), "depth": max(tree.depth), "build_seconds": round(time.perf_counter() - start, 3)}
+
+    for name, vectorized in (("numpy", True), ("python", False)):
+        if vectorized and np is None:
+            result[f"{name}_seconds"] = None
+            continue
+        start = time.perf_counter()
+        rollups = tree.rollup(vectorized)
+        result[f"{name}_seconds"] = round(time.perf_counter() - start, 3)
+        result["root"] = rollups.totals(0)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time recursive counts and byte totals on a columnar tree")
+    parser.add_argument("--items", type=int, default=1000000, help="Number of items in the synthetic tree")
+    parser.add_argument("--json", action="store_true", help="Print the result as one JSON line")
+    args = parser.parse_args(argv)
+
+    result = measure_rollups(args.items)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{'items':<16} {result['items']:>10}   depth {result['depth']}")
+        for name in ("build", "numpy", "python"):
+            seconds = result[f"{name}_seconds"]
+            print(f"{name:<16} {'not installed' if seconds is None else f'{seconds:.3f} s':>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from typing import Dict, List, Any, Optional
+from benchmarks.fake_drive import FakeDrive
+from benchmarks.trees import SHAPES
+from gdrive.crawler import crawl_tree
+from gdrive.metrics import reset_metrics
+from gdrive.pipeline import copy_tree_pipelined
+from gdrive.retry import configure_rate_limit, get_rate_limiter, set_rate_limiter
+from gdrive.tree import TREE_FIELDS
+from gdrive.utils import count_files_and_folders
+from gdrive.verify import verify_folders
+import argparse
+import json
+import sys
+import time
+
+ASSESSMENTS = (1, 2, 3)
+
+# Default number of worker threads for the crawl, copy and verify stages
+DEFAULT_WORKERS = 8
+
+
+def run_assessment(drive: FakeDrive, assessment: int, root_id: str, workers: int = DEFAULT_WORKERS) -> int:
+    """
+    Runs one assessment against the fake service the way the reports do, and returns
+    the number of items it processed.
+    """
+    service_factory = lambda: drive  # The fake is thread-safe, so every worker can share it
+
+    if assessment == 1:
+        file_count, folder_count = count_files_and_folders(drive, root_id)
+        return file_count + folder_count
+
+    tree = crawl_tree(drive, root_id, fields=TREE_FIELDS, workers=workers,
+                      service_factory=service_factory, coalesce=True)
+    if assessment == 2:
+        return tree.total_items()
+
+    dest_id = drive.add_folder("copy")
+    copy_tree_pipelined(drive, tree, dest_id, workers=workers, service_factory=service_factory)
+    differences = verify_folders(drive, root_id, dest_id, tree, workers=workers, service_factory=service_factory)
+    if differences:
+        raise RuntimeError(f"The copy of {root_id} has {len(differences)} differences")
+    return tree.total_items()
+
+
+def run_benchmark(shape: str, assessment: int, scale: int = 1, workers: int = DEFAULT_WORKERS,
+                  latency: float = 0.0, error_rate: float = 0.0, quota_qps: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Builds a synthetic tree in a fresh FakeDrive and times one assessment over it.
+
+    Args:
+        shape (str): "wide", "deep" or "skewed", see benchmarks.trees.
+        assessment (int): 1, 2 or 3.
+        scale (int): Multiplies the size of the synthetic tree.
+        workers (int): Number of worker threads.
+        latency (float): Simulated seconds per HTTP round trip.
+        error_rate (float): Share of calls failing with a 429 or 5xx.
+        quota_qps (float, optional): Calls per second above which the fake returns rate-limit errors.
+
+    Returns:
+        Dict[str, Any]: The shape, assessment, items processed, calls by method, round trips,
+                        injected errors, response bytes, wall time in seconds and items per second.
+    """
+    drive = FakeDrive(latency=latency, error_rate=error_rate, quota_qps=quota_qps)
+    root_id = SHAPES[shape](drive, scale)
+    metrics = reset_metrics()
+
+    start = time.perf_counter()
+    items = run_assessment(drive, assessment, root_id, workers)
+    seconds = time.perf_counter() - start
+
+    return {
+        "shape": shape,
+        "assessment": assessment,
+        "items": items,
+        "api_calls": drive.total_calls - drive.calls["batch"],
+        "round_trips": drive.round_trips,
+        "calls": dict(drive.calls),
+        "errors": sum(drive.errors.values()),
+        "bytes_received": metrics.total("bytes_received"),
+        "seconds": round(seconds, 4),
+        "items_per_second": round(items / seconds, 1) if seconds else None,
+    }
+
+
+def run_suite(shapes: List[str], assessments: List[int], **options: Any) -> List[Dict[str, Any]]:
+    """
+    Runs every assessment on every shape. The options are passed to run_benchmark.
+    """
+    # The fake enforces its own quota, so the client-side limiter must not hide it while the suite runs
+    previous = get_rate_limiter()
+    configure_rate_limit(1e9)
+    try:
+        return [run_benchmark(shape, assessment, **options) for shape in shapes for assessment in assessments]
+    finally:
+        set_rate_limiter(previous)
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"{'shape':<8} {'assessment':>10} {'items':>7} {'api calls':>10} {'round trips':>12} "
+          f"{'errors':>7} {'KiB recv':>9} {'seconds':>9} {'items/s':>10}")
+    for r in results:
+        print(f"{r['shape']:<8} {r['assessment']:>10} {r['items']:>7} {r['api_calls']:>10} {r['round_trips']:>12} "
+              f"{r['errors']:>7} {r['bytes_received'] / 1024:>9.1f} {r['seconds']:>9.3f} {r['items_per_second'] or 0:>10.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline throughput benchmarks against a fake Drive service")
+    parser.add_argument("--shape", action="append", choices=sorted(SHAPES), help="Tree shape to run (repeatable, default: all)")
+    parser.add_argument("--assessment", action="append", type=int, choices=ASSESSMENTS, help="Assessment to run (repeatable, default: all)")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplies the size of every synthetic tree")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of worker threads")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per HTTP round trip")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls failing with a 429 or 5xx")
+    parser.add_argument("--quota-qps", type=float, help="Calls per second above which the fake rate-limits")
+    parser.add_argument("--json", action="store_true", help="Print one JSON line per result instead of a table")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.shape or sorted(SHAPES), args.assessment or list(ASSESSMENTS), scale=args.scale,
+                        workers=args.workers, latency=args.latency, error_rate=args.error_rate,
+                        quota_qps=args.quota_qps)
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
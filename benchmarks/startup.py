@@ -0,0 +1,87 @@
+from typing import Dict, List, Any, Optional
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a report loads before its first Drive request: the report module, the auth stack and a
+# service object built from the discovery document. The request is built but never sent.
+FIRST_REQUEST_SCRIPT = """
+from reports import count_source
+from gdrive.auth import build
+from google.oauth2.credentials import Credentials
+service = build("drive", "v3", credentials=Credentials(token="offline"))
+service.files().list(q="'root' in parents and trashed=false", fields="files(id, mimeType)")
+"""
+
+# Modules that must not be imported before the menu appears
+HEAVY_MODULES = ("googleapiclient.discovery", "google_auth_oauthlib", "tqdm", "gdrive.auth")
+
+
+def _time_process(args: List[str], stdin: str = "") -> float:
+    """
+    Runs a Python process from a scratch directory, so its log file lands there, and returns its wall time.
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    with tempfile.TemporaryDirectory() as cwd:
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, input=stdin, cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True)
+        return time.perf_counter() - start
+
+
+def heavy_modules_loaded_by_main() -> List[str]:
+    """
+    Returns the heavy modules that importing main loads; the list should be empty.
+    """
+    script = f"import sys, json, main; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_startup(runs: int = 5) -> Dict[str, Any]:
+    """
+    Measures, as the median over several fresh processes:
+    interpreter: starting Python and exiting, the floor under everything else;
+    time_to_menu: starting main.py, showing the menu and choosing Exit;
+    time_to_first_request: loading a report and building its first Drive request, without network.
+
+    Returns:
+        Dict[str, Any]: Median seconds for each measurement, and the heavy modules main imports.
+    """
+    main_path = os.path.join(REPO_ROOT, "main.py")
+    samples: Dict[str, List[float]] = {"interpreter": [], "time_to_menu": [], "time_to_first_request": []}
+    for _ in range(runs):
+        samples["interpreter"].append(_time_process(["-c", "pass"]))
+        samples["time_to_menu"].append(_time_process([main_path], stdin="5\n"))
+        samples["time_to_first_request"].append(_time_process(["-c", FIRST_REQUEST_SCRIPT]))
+    result: Dict[str, Any] = {name: round(statistics.median(values), 4) for name, values in samples.items()}
+    result["heavy_modules_before_menu"] = heavy_modules_loaded_by_main()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure time-to-menu and time-to-first-request")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh processes per measurement")
+    parser.add_argument("--json", action="store_true", help="Print the result as one JSON line")
+    args = parser.parse_args(argv)
+
+    result = measure_startup(args.runs)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for name in ("interpreter", "time_to_menu", "time_to_first_request"):
+            print(f"{name:<24} {result[name] * 1000:>8.1f} ms")
+        print(f"{'heavy modules at menu':<24} {', '.join(result['heavy_modules_before_menu']) or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
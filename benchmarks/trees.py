@@ -0,0 +1,60 @@
+from typing import Callable, Dict
+from benchmarks.fake_drive import FakeDrive
+import hashlib
+
+
+def _add_files(drive: FakeDrive, folder_id: str, count: int, prefix: str) -> None:
+    for index in range(count):
+        name = f"{prefix}-file-{index}.bin"
+        size = 1024 * (index % 64 + 1)
+        drive.add_item({
+            "name": name,
+            "mimeType": "application/octet-stream",
+            "size": str(size),
+            "md5Checksum": hashlib.md5(f"{name}:{size}".encode()).hexdigest(),
+        }, folder_id)
+
+
+def wide_tree(drive: FakeDrive, scale: int = 1) -> str:
+    """
+    A root holding many sibling folders of a few files each: 20 * scale folders of 10 files.
+    This is the shape where coalesced "in parents" queries and batching pay off most.
+    """
+    root_id = drive.add_folder("wide")
+    for index in range(20 * scale):
+        folder_id = drive.add_folder(f"folder-{index}", root_id)
+        _add_files(drive, folder_id, 10, f"w{index}")
+    return root_id
+
+
+def deep_tree(drive: FakeDrive, scale: int = 1) -> str:
+    """
+    A single chain of 20 * scale nested folders with 5 files at each level.
+    Every level depends on the one above it, so there is little to parallelise.
+    """
+    root_id = folder_id = drive.add_folder("deep")
+    for depth in range(20 * scale):
+        _add_files(drive, folder_id, 5, f"d{depth}")
+        folder_id = drive.add_folder(f"level-{depth}", folder_id)
+    return root_id
+
+
+def skewed_tree(drive: FakeDrive, scale: int = 1) -> str:
+    """
+    One folder with 500 * scale files next to 10 * scale nearly empty folders, so a single
+    paginated listing dominates the crawl.
+    """
+    root_id = drive.add_folder("skewed")
+    big_id = drive.add_folder("big", root_id)
+    _add_files(drive, big_id, 500 * scale, "big")
+    for index in range(10 * scale):
+        folder_id = drive.add_folder(f"small-{index}", root_id)
+        _add_files(drive, folder_id, 1, f"s{index}")
+    return root_id
+
+
+SHAPES: Dict[str, Callable[[FakeDrive, int], str]] = {
+    "wide": wide_tree,
+    "deep": deep_tree,
+    "skewed": skewed_tree,
+}
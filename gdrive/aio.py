@@ -0,0 +1,307 @@
+from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
+from typing import Dict, List, Any, Optional, AsyncIterator, Callable
+from gdrive.auth import GDriveAuth
+from gdrive.tree import DriveTree, DriveNode, TREE_FIELDS, FOLDER_MIME_TYPE
+from gdrive.journal import CopyJournal, FAILED
+from gdrive.retry import is_retryable_error, is_rate_limit_error, backoff_delay, get_rate_limiter
+from gdrive.metrics import get_metrics
+from gdrive.fields import page_fields
+from gdrive.traversal import Frontier
+from gdrive.utils import LISTING_ORDER
+from collections import deque
+import asyncio
+import httplib2
+import json
+import time
+import logging
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency, installed with `pip install .[async]`
+    aiohttp = None
+
+# Transport failures (dropped connections, timeouts) retried like the threaded backend's ConnectionError and TimeoutError
+TRANSPORT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError) if aiohttp is not None else (asyncio.TimeoutError,)
+
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+
+# Default number of Drive requests allowed in flight at once
+DEFAULT_MAX_IN_FLIGHT = 100
+
+
+class AsyncDriveClient:
+    """
+    Minimal asyncio Google Drive v3 client for crawl and copy workloads.
+
+    Requests are sent with aiohttp on a single connection pool and a semaphore bounds how many
+    are in flight at once, so one process can keep hundreds of requests going without a thread
+    per request. The OAuth credentials managed by GDriveAuth are reused and refreshed when they expire.
+
+    Use as an async context manager:
+
+        async with AsyncDriveClient() as client:
+            metadata = await client.get(folder_id, "name")
+    """
+
+    def __init__(self, credentials: Optional[Any] = None, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 session: Optional[Any] = None, retries: int = 5):
+        self.credentials = credentials if credentials is not None else GDriveAuth().creds
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._refresh_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncDriveClient":
+        if self._session is None:
+            if aiohttp is None:
+                raise ImportError("The asyncio backend requires aiohttp. Install it with `pip install .[async]`.")
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        """
+        Returns the Authorization header, refreshing the credentials first if they have expired.
+        Only one coroutine refreshes; the others wait for it and reuse the new token.
+        """
+        if not self.credentials.valid:
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self.credentials.refresh, Request())
+                    logging.info("Refreshed expired credentials for the asyncio backend.")
+        return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    async def _request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                       body: Optional[Dict[str, Any]] = None, api_method: str = "unknown") -> Dict[str, Any]:
+        """
+        Sends a Drive API request, retrying rate-limit and server errors, dropped connections and timeouts
+        with the policy from gdrive.retry. Each attempt waits for a token from the process-wide rate limiter
+        without blocking the event loop, and is recorded in the API metrics under api_method, e.g. "files.list".
+
+        Raises:
+            HttpError: If the request fails with a non-retryable status or retries are exhausted.
+            aiohttp.ClientError, asyncio.TimeoutError: If the connection keeps failing until retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            error: Optional[Exception] = None
+            content = b""
+            # The semaphore is held only while the request is in flight, not while backing off
+            async with self._semaphore:
+                wait = get_rate_limiter().reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                headers = await self._auth_headers()
+                start = time.perf_counter()
+                try:
+                    async with self._session.request(method, url, params=params, json=body, headers=headers) as response:
+                        status = response.status
+                        content = await response.read()
+                        if status < 400:
+                            get_metrics().record_call(api_method, time.perf_counter() - start, len(content))
+                            return json.loads(content)
+                        retry_after = response.headers.get("Retry-After")
+                except TRANSPORT_ERRORS as e:
+                    error = e
+
+            if error is None:
+                error_headers = {"status": status}
+                if retry_after:
+                    error_headers["retry-after"] = retry_after
+                error = HttpError(httplib2.Response(error_headers), content, uri=url)
+            get_metrics().record_call(api_method, time.perf_counter() - start, len(content), error)
+            retryable = isinstance(error, TRANSPORT_ERRORS) or is_retryable_error(error)
+            if not retryable or attempt + 1 >= self.retries:
+                raise error
+
+            get_metrics().record_retry(api_method)
+            delay = backoff_delay(error, attempt)
+            if is_rate_limit_error(error):
+                get_rate_limiter().pause(delay)
+            logging.error(f"Error executing {method} {url}: {error}. Retrying in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, file_id: str, fields: str = "id, name, mimeType") -> Dict[str, Any]:
+        """
+        Retrieves the metadata of a file or folder.
+        """
+        return await self._request("GET", f"{DRIVE_FILES_URL}/{file_id}", params={"fields": fields}, api_method="files.get")
+
+    async def list_children(self, folder_id: str, fields: str, page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the non-trashed children of a folder in LISTING_ORDER, following nextPageToken across pages.
+        """
+        params = {"q": f"'{folder_id}' in parents and trashed=false", "fields": page_fields(fields), "pageSize": page_size,
+                  "orderBy": LISTING_ORDER}
+
+        while True:
+            response = await self._request("GET", DRIVE_FILES_URL, params=params, api_method="files.list")
+            for item in response.get("files", []):
+                yield item
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+            params = {**params, "pageToken": page_token}
+
+    async def create_folder(self, name: str, parent_id: str) -> Dict[str, Any]:
+        """
+        Creates a folder inside the given parent folder and returns its metadata (id).
+        """
+        body = {"name": name, "mimeType": FOLDER_MIME_TYPE, "parents": [parent_id]}
+        return await self._request("POST", DRIVE_FILES_URL, params={"fields": "id"}, body=body,
+                                   api_method="files.create")
+
+    async def copy(self, file_id: str, name: str, parent_id: str) -> Dict[str, Any]:
+        """
+        Copies a file into the given parent folder and returns the copy's metadata (id).
+        """
+        body = {"name": name, "parents": [parent_id]}
+        return await self._request("POST", f"{DRIVE_FILES_URL}/{file_id}/copy", params={"fields": "id"}, body=body,
+                                   api_method="files.copy")
+
+
+async def crawl_tree_async(client: AsyncDriveClient, root_id: str, root_name: str = "Root Folder",
+                           fields: str = TREE_FIELDS) -> DriveTree:
+    """
+    Crawls a folder with one task per folder listing, bounded by the client's in-flight limit.
+    Folders waiting for a task are kept in a Frontier, which spills to disk past its memory budget.
+    Listings are merged in the order they were started, so the tree is the same on every run.
+
+    Args:
+        client (AsyncDriveClient): An open asyncio Drive client.
+        root_id (str): The ID of the folder to crawl.
+        root_name (str): Display name of the root folder.
+        fields (str): Fields to retrieve for each item.
+
+    Returns:
+        DriveTree: The populated tree with aggregates computed.
+    """
+    tree = DriveTree(root_id, root_name)
+
+    async def list_folder(folder_id: str) -> List[Dict[str, Any]]:
+        return [item async for item in client.list_children(folder_id, fields)]
+
+    pending: deque = deque()  # (listing task, folder ID), oldest first
+    with Frontier([root_id]) as frontier:
+        while frontier or pending:
+            while frontier and len(pending) < client.max_in_flight:
+                folder_id = frontier.popleft()
+                pending.append((asyncio.ensure_future(list_folder(folder_id)), folder_id))
+
+            task, folder_id = pending.popleft()
+            for item in await task:
+                # Skip items already seen through another parent so each item is counted once
+                if item["id"] in tree.nodes:
+                    continue
+                node = tree.add_item(item, folder_id)
+                if node.is_folder:
+                    frontier.append(node.id)
+
+    tree.compute_aggregates()
+    logging.info(f"Crawled folder ID {root_id} with the asyncio backend: {tree.total_items()} items")
+    return tree
+
+
+async def copy_tree_async(client: AsyncDriveClient, source_tree: DriveTree, destination_folder_id: str,
+                          on_copied: Optional[Callable[[DriveNode], None]] = None,
+                          on_error: Optional[Callable[[DriveNode, Exception], None]] = None,
+                          journal: Optional[CopyJournal] = None) -> int:
+    """
+    Copies every item of a DriveTree into a destination folder.
+
+    Folders are copied in rounds of up to DEFAULT_MAX_IN_FLIGHT folders taken from a Frontier, and
+    a folder only enters the frontier once it exists, so every parent exists before its children
+    are copied into it; all items of a round are sent concurrently.
+
+    Args:
+        client (AsyncDriveClient): An open asyncio Drive client.
+        source_tree (DriveTree): Snapshot of the source folder.
+        destination_folder_id (str): The ID of the destination folder.
+        on_copied (Callable, optional): Called with each source node once it has been copied.
+        on_error (Callable, optional): Called with a source node and the error if copying it failed.
+        journal (CopyJournal, optional): Records every copy; items it already lists as copied are skipped
+                                         and their destination folders reused.
+
+    Returns:
+        int: The number of items copied.
+    """
+    copied = 0
+    frontier = Frontier([(source_tree.root_id, destination_folder_id)])
+    done = journal.completed() if journal is not None else {}
+
+    async def copy_node(node: DriveNode, dest_id: str) -> Optional[str]:
+        nonlocal copied
+        if node.id in done:
+            # Copied by an earlier run; descend into the folder it already created
+            return done[node.id]
+        try:
+            if node.is_folder:
+                result = await client.create_folder(node.name, dest_id)
+            else:
+                result = await client.copy(node.id, node.name, dest_id)
+        except Exception as e:
+            logging.error(f"An error occurred while copying {node.name}: {e}")
+            if on_error is not None:
+                on_error(node, e)
+            if journal is not None:
+                journal.record(node.id, None, FAILED)
+            return None
+
+        copied += 1
+        if journal is not None:
+            journal.record(node.id, result["id"])
+        if on_copied is not None:
+            on_copied(node)
+        return result["id"]
+
+    with frontier:
+        while frontier:
+            folders = frontier.pop_many(DEFAULT_MAX_IN_FLIGHT)
+            jobs = [(node, dest_id) for source_id, dest_id in folders for node in source_tree.children(source_id)]
+            results = await asyncio.gather(*(copy_node(node, dest_id) for node, dest_id in jobs))
+
+            # Make the folders of this round durable before anything is copied into them
+            if journal is not None:
+                journal.flush()
+
+            # Descend only into folders that were created successfully
+            frontier.extend((node.id, new_id) for (node, _), new_id in zip(jobs, results) if node.is_folder and new_id)
+
+    return copied
+
+
+def crawl_tree_with_asyncio(root_id: str, root_name: str = "Root Folder", fields: str = TREE_FIELDS,
+                            max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> DriveTree:
+    """
+    Runs crawl_tree_async on a new event loop with credentials from GDriveAuth.
+    """
+    async def run() -> DriveTree:
+        async with AsyncDriveClient(max_in_flight=max_in_flight) as client:
+            return await crawl_tree_async(client, root_id, root_name, fields)
+
+    return asyncio.run(run())
+
+
+def copy_tree_with_asyncio(source_tree: DriveTree, destination_folder_id: str,
+                           on_copied: Optional[Callable[[DriveNode], None]] = None,
+                           on_error: Optional[Callable[[DriveNode, Exception], None]] = None,
+                           max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, journal: Optional[CopyJournal] = None) -> int:
+    """
+    Runs copy_tree_async on a new event loop with credentials from GDriveAuth.
+    """
+    async def run() -> int:
+        async with AsyncDriveClient(max_in_flight=max_in_flight) as client:
+            return await copy_tree_async(client, source_tree, destination_folder_id, on_copied, on_error, journal)
+
+    return asyncio.run(run())
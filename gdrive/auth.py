@@ -2,16 +2,68 @@ import os
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build, Resource
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery
+from googleapiclient.discovery import Resource
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
-from typing import Optional
+from typing import Optional, Any
+from functools import lru_cache
+from gdrive.pool import ServicePool, share_credentials, get_pool_size
+import httplib2
 import logging
 
-# Configure logging to output to file
-log_file = "gdrive_log.log"
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s', 
-                    handlers=[logging.FileHandler(log_file)])
+# Where the Drive discovery document is kept when the installed client library does not bundle it
+DISCOVERY_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "gdrivereports", "drive.v3.json")
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/drive/v3/rest"
+
+
+@lru_cache(maxsize=None)
+def load_discovery_document(cache_path: str = DISCOVERY_CACHE_PATH) -> Optional[str]:
+    """
+    Returns the Drive v3 discovery document, read at most once per process.
+
+    The copy bundled with google-api-python-client is used when there is one. Otherwise the
+    document is read from an on-disk cache, which is filled by fetching it once, so later
+    runs never download it again.
+
+    Returns:
+        str: The discovery document, or None if it could not be loaded.
+    """
+    document = get_static_doc("drive", "v3")
+    if document:
+        return document
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        pass
+    try:
+        response, content = httplib2.Http().request(DISCOVERY_URL)
+        if response.status != 200:
+            raise OSError(f"HTTP {response.status}")
+        document = content.decode("utf-8")
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            f.write(document)
+        logging.info(f"Cached the Drive discovery document in {cache_path}")
+        return document
+    except OSError as e:
+        logging.warning(f"Could not cache the Drive discovery document: {e}")
+        return None
+
+
+def build(service_name: str, version: str, **kwargs: Any) -> Resource:
+    """
+    Builds a service object like googleapiclient.discovery.build, but from the discovery document
+    loaded once by load_discovery_document instead of looking it up again for every service.
+    """
+    document = load_discovery_document() if (service_name, version) == ("drive", "v3") else None
+    if document is None:
+        return discovery.build(service_name, version, **kwargs)
+    return discovery.build_from_document(document, **kwargs)
+
 
 class GDriveAuth:
     _instance = None
@@ -24,12 +76,17 @@ class GDriveAuth:
             cls._instance = super(GDriveAuth, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, token_file: str = "token.json", credentials_file: str = "credentials.json"):
+    def __init__(self, token_file: str = "token.json", credentials_file: str = "credentials.json",
+                 pool_size: Optional[int] = None):
+        # Already authenticated: keep the shared credentials and the pooled clients
+        if getattr(self, "service", None) is not None and self.token_file == token_file:
+            return
         self.token_file = token_file
         self.credentials_file = credentials_file
         self.creds = None
         self.service = None
         self.scopes = ["https://www.googleapis.com/auth/drive"]
+        self.pool = ServicePool(self._new_service, get_pool_size() if pool_size is None else pool_size)
         if not self.service:
             self.authenticate_gdrive()
 
@@ -63,6 +120,9 @@ class GDriveAuth:
                     token.write(self.creds.to_json())
                     logging.info("New credentials saved to token.json.")
 
+            # Every service built from here on shares these credentials and refreshes them one at a time
+            share_credentials(self.creds)
+
             # Build and return the Google Drive service
             self.service = build("drive", "v3", credentials=self.creds)
             logging.info("Successfully authenticated and connected to Google Drive API.")
@@ -77,3 +137,11 @@ class GDriveAuth:
         Returns the authenticated Google Drive service object. Ensures that credentials are valid.
         """
         return self.service
+
+    def _new_service(self) -> Optional[Resource]:
+        """
+        Builds a service object for the pool, with a fresh HTTP transport.
+        """
+        if self.creds is None:
+            return None
+        return build("drive", "v3", http=AuthorizedHttp(self.creds, http=httplib2.Http()))
@@ -0,0 +1,96 @@
+from typing import Dict, List, Any, Optional, Callable, Hashable, Tuple, TYPE_CHECKING
+from gdrive.retry import is_retryable_error, is_rate_limit_error, backoff_delay, get_rate_limiter
+from gdrive.metrics import get_metrics, request_method
+import time
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+    from googleapiclient.http import HttpRequest
+
+# The Drive API accepts at most 100 calls in a single batch request
+MAX_BATCH_SIZE = 100
+
+
+def execute_batch(service: "Resource", requests: Dict[Hashable, "HttpRequest"], retries: int = 5,
+                  on_success: Optional[Callable[[Hashable, Dict[str, Any]], None]] = None
+                  ) -> Tuple[Dict[Hashable, Dict[str, Any]], Dict[Hashable, Exception]]:
+    """
+    Executes independent requests in Drive batch requests of up to MAX_BATCH_SIZE calls each.
+
+    Responses are demultiplexed back to the key each request was given. Sub-requests that fail
+    with a retryable error (see gdrive.retry) are collected and sent again in a new batch after
+    a backoff; sub-requests that succeeded are never re-sent. Every sub-request takes a token
+    from the shared rate limiter, since the Drive API counts each one against the quota.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        requests (Dict[Hashable, HttpRequest]): Unexecuted requests keyed by the caller's item key.
+        retries (int): The maximum number of rounds for retryable failures.
+        on_success (Callable, optional): Called with the key and response of each successful request.
+
+    Returns:
+        Tuple[Dict, Dict]: Responses by key for successful requests, and the final error by key for failed ones.
+    """
+    results: Dict[Hashable, Dict[str, Any]] = {}
+    errors: Dict[Hashable, Exception] = {}
+    pending = list(requests.items())
+    attempt = 0
+    metrics = get_metrics()
+
+    while pending:
+        retry: List[Tuple[Hashable, "HttpRequest"]] = []
+        delay = 0.0
+
+        for start in range(0, len(pending), MAX_BATCH_SIZE):
+            chunk = pending[start:start + MAX_BATCH_SIZE]
+            failed: Dict[Hashable, Exception] = {}
+
+            def callback(request_id: str, response: Dict[str, Any], exception: Exception) -> None:
+                key, request = chunk[int(request_id)]
+                # Sub-requests share the batch's round trip, so only the batch itself is timed
+                metrics.record_call(request_method(request), error=exception)
+                if exception is not None:
+                    failed[key] = exception
+                else:
+                    results[key] = response
+                    if on_success is not None:
+                        on_success(key, response)
+
+            batch = service.new_batch_http_request(callback=callback)
+            for index, (key, request) in enumerate(chunk):
+                batch.add(metrics.instrument(request), request_id=str(index))
+
+            get_rate_limiter().acquire(len(chunk))
+            start = time.perf_counter()
+            try:
+                batch.execute()
+                metrics.record_call("batch", time.perf_counter() - start)
+            except Exception as e:
+                metrics.record_call("batch", time.perf_counter() - start, error=e)
+                # The batch envelope itself failed, so none of its sub-requests got a response
+                logging.error(f"Batch request of {len(chunk)} calls failed: {e}")
+                for key, _ in chunk:
+                    if key not in results and key not in failed:
+                        failed[key] = e
+
+            for key, request in chunk:
+                if key not in failed:
+                    continue
+                if is_retryable_error(failed[key]) and attempt + 1 < retries:
+                    retry.append((key, request))
+                    metrics.record_retry(request_method(request))
+                    delay = max(delay, backoff_delay(failed[key], attempt))
+                    if is_rate_limit_error(failed[key]):
+                        get_rate_limiter().pause(delay)
+                else:
+                    errors[key] = failed[key]
+
+        if retry:
+            logging.error(f"{len(retry)} batched calls failed. Retrying them in {delay:.1f} seconds...")
+            time.sleep(delay)
+        pending = retry
+        attempt += 1
+
+    return results, errors
+
@@ -0,0 +1,161 @@
+from typing import Dict, List, Any, Optional
+import json
+import sqlite3
+import threading
+import time
+import logging
+
+DEFAULT_CACHE_PATH = "gdrive_cache.sqlite3"
+
+# Cached listings older than this many seconds are fetched again
+DEFAULT_TTL = 3600.0
+
+# Once the stored listings exceed this many bytes, the least recently used ones are evicted
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Eviction runs once every this many stored listings rather than on every write
+EVICT_EVERY = 100
+
+
+class MetadataCache:
+    """
+    On-disk SQLite cache of folder listings, keyed by folder ID and the fields requested.
+
+    Each entry stores the folder's children, the time they were fetched and the folder's
+    modifiedTime at that point. A listing is served from the cache while it is younger than
+    the TTL and, when the caller knows the folder's current modifiedTime, only if it is unchanged.
+    When the stored listings grow beyond max_bytes, the least recently used ones are evicted.
+
+    The cache is meant for read-only reports; a folder that is written to should be invalidated, or
+    listed with use_cache=False (see gdrive.utils.list_drive_files), which also drops its entries.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Crawler worker threads share the connection, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listings (
+                folder_id TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                items TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                modified_time TEXT,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (folder_id, fields)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS listings_last_used ON listings (last_used)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+
+    def get(self, folder_id: str, fields: str, modified_time: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the cached children of a folder, or None if there is no fresh entry.
+
+        Args:
+            folder_id (str): The ID of the folder.
+            fields (str): The fields string the listing was requested with.
+            modified_time (str, optional): The folder's current modifiedTime, if known.
+                                           A cached listing taken at a different modifiedTime is stale.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items, fetched_at, modified_time FROM listings WHERE folder_id = ? AND fields = ?",
+                (folder_id, fields),
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl or (modified_time is not None and modified_time != row[2]):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE listings SET last_used = ? WHERE folder_id = ? AND fields = ?", (now, folder_id, fields)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, folder_id: str, fields: str, items: List[Dict[str, Any]], modified_time: Optional[str] = None) -> None:
+        """
+        Stores the complete children listing of a folder.
+        """
+        payload = json.dumps(items, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (folder_id, fields, payload, now, modified_time, len(payload), now),
+            )
+            self._conn.commit()
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def invalidate(self, folder_id: str) -> None:
+        """
+        Drops every cached listing of a folder, e.g. after writing into it.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM listings WHERE folder_id = ?", (folder_id,))
+            self._conn.commit()
+
+    def evict(self) -> None:
+        """
+        Deletes expired entries, then the least recently used ones until the cache fits in max_bytes.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM listings WHERE fetched_at < ?", (time.time() - self.ttl,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM listings").fetchone()[0]
+            if total > self.max_bytes:
+                evicted = 0
+                rows = self._conn.execute("SELECT folder_id, fields, size FROM listings ORDER BY last_used").fetchall()
+                for folder_id, fields, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM listings WHERE folder_id = ? AND fields = ?", (folder_id, fields))
+                    total -= size
+                    evicted += 1
+                logging.info(f"Evicted {evicted} cached listings to stay within {self.max_bytes} bytes")
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """
+        Deletes every cached listing.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM listings")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Cache consulted by gdrive.utils.list_drive_files; None disables caching
+_metadata_cache: Optional[MetadataCache] = None
+
+
+def get_metadata_cache() -> Optional[MetadataCache]:
+    """
+    Returns the process-wide metadata cache, or None when caching is disabled.
+    """
+    return _metadata_cache
+
+
+def set_metadata_cache(cache: Optional[MetadataCache]) -> None:
+    """
+    Enables the given metadata cache for every folder listing in the process, or disables caching with None.
+    """
+    global _metadata_cache
+    _metadata_cache = cache
@@ -0,0 +1,276 @@
+from typing import Dict, List, Any, Optional, Tuple, Callable, TYPE_CHECKING
+from gdrive import utils
+from gdrive.tree import DriveTree, TREE_FIELDS
+from gdrive.fields import item_fields
+import json
+import os
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Version of the on-disk snapshot format, bumped whenever the layout changes
+# (2: snapshots record the fields they were crawled with)
+SNAPSHOT_VERSION = 2
+
+
+def change_fields(fields: str = TREE_FIELDS) -> str:
+    """
+    Returns the changes.list fields string that reports the same item fields as a crawl, plus
+    the parents and trashed state needed to place each change in the tree.
+    """
+    return f"nextPageToken, newStartPageToken, changes(fileId, removed, file(parents, trashed, {', '.join(item_fields(fields))}))"
+
+
+def get_start_page_token(service: "Resource", drive_id: Optional[str] = None) -> str:
+    """
+    Returns the page token marking the current state of the drive; changes made after this
+    point are reported by changes.list when called with the token.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        drive_id (str, optional): ID of the shared drive to track instead of My Drive.
+    """
+    params: Dict[str, Any] = {}
+    if drive_id:
+        params.update(driveId=drive_id, supportsAllDrives=True)
+    response = utils.execute_with_retry(service.changes().getStartPageToken(**params))
+    return response["startPageToken"]
+
+
+def list_changes(service: "Resource", page_token: str, fields: str = TREE_FIELDS,
+                 drive_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Fetches every change since a page token.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        page_token (str): Checkpoint from get_start_page_token or a previous call.
+        fields (str): The files.list fields the tree was crawled with.
+        drive_id (str, optional): ID of the shared drive to read changes from.
+
+    Returns:
+        tuple: The changes in the order they happened and the checkpoint for the next refresh.
+    """
+    changes: List[Dict[str, Any]] = []
+    while True:
+        params: Dict[str, Any] = {
+            "pageToken": page_token,
+            "pageSize": 1000,
+            "includeRemoved": True,
+            "spaces": "drive",
+            "fields": change_fields(fields),
+        }
+        if drive_id:
+            params.update(driveId=drive_id, supportsAllDrives=True, includeItemsFromAllDrives=True)
+        response = utils.execute_with_retry(service.changes().list(**params))
+        changes.extend(response.get("changes", []))
+
+        # The last page carries the checkpoint for the next run instead of a next page token
+        if "newStartPageToken" in response:
+            return changes, response["newStartPageToken"]
+        page_token = response["nextPageToken"]
+
+
+def _tree_parent(tree: DriveTree, node_id: str, parents: List[str]) -> Optional[str]:
+    """
+    Returns the first of an item's parents that is a folder in the tree and not inside the item itself.
+    """
+    for parent_id in parents:
+        parent = tree.nodes.get(parent_id)
+        if parent is None or not parent.is_folder:
+            continue
+        if node_id in tree.nodes and tree.is_ancestor(node_id, parent_id):
+            continue
+        return parent_id
+    return None
+
+
+def _apply_file(tree: DriveTree, file: Dict[str, Any]) -> Tuple[bool, bool]:
+    """
+    Applies one added, renamed, updated or moved item to the tree.
+
+    Returns:
+        tuple: Whether the change could be placed in the tree, and whether it added a folder
+               whose contents are not in the snapshot yet.
+    """
+    node = tree.nodes.get(file["id"])
+    if node is not None:
+        node.name = file.get("name", node.name)
+        node.size = file.get("size", node.size)
+        node.modified_time = file.get("modifiedTime", node.modified_time)
+        node.web_view_link = file.get("webViewLink", node.web_view_link)
+        node.md5_checksum = file.get("md5Checksum", node.md5_checksum)
+        if node.id == tree.root_id:
+            return True, False
+        parents = file.get("parents", [])
+        if node.parent_id in parents:
+            return True, False
+        new_parent_id = _tree_parent(tree, node.id, parents)
+        if new_parent_id is None:
+            return False, False
+        tree.move_node(node.id, new_parent_id)
+        return True, False
+
+    parent_id = _tree_parent(tree, file["id"], file.get("parents", []))
+    if parent_id is None:
+        return False, False
+    node = tree.insert_item(file, parent_id)
+    return True, node.is_folder
+
+
+def apply_changes(tree: DriveTree, changes: List[Dict[str, Any]]) -> List[str]:
+    """
+    Patches a tree with a list of changes: adds, removes, moves, trashes and renames.
+    Counts are updated along the affected ancestor chains only.
+
+    Args:
+        tree (DriveTree): The snapshot to patch, with aggregates computed.
+        changes (List[Dict[str, Any]]): Changes as returned by list_changes.
+
+    Returns:
+        List[str]: IDs of folders that entered the tree and still need to be listed, since a folder
+                   moved in from elsewhere brings contents that are not reported as changes.
+    """
+    entered: List[str] = []
+    deferred: List[Dict[str, Any]] = []
+
+    for change in changes:
+        file = change.get("file") or {}
+        file_id = change.get("fileId") or file.get("id")
+        if change.get("removed") or file.get("trashed"):
+            if file_id in tree.nodes and file_id != tree.root_id:
+                tree.remove_subtree(file_id)
+            continue
+        if "id" not in file:
+            continue
+        applied, added_folder = _apply_file(tree, file)
+        if not applied:
+            deferred.append(file)
+        elif added_folder:
+            entered.append(file["id"])
+
+    # An item can be reported before the folder it was added to, so retry until nothing else fits
+    progress = True
+    while deferred and progress:
+        progress = False
+        remaining = []
+        for file in deferred:
+            applied, added_folder = _apply_file(tree, file)
+            if not applied:
+                remaining.append(file)
+                continue
+            progress = True
+            if added_folder:
+                entered.append(file["id"])
+        deferred = remaining
+
+    # Whatever still has no parent in the tree lives outside the snapshot's folder now
+    for file in deferred:
+        if file["id"] in tree.nodes:
+            tree.remove_subtree(file["id"])
+
+    return [folder_id for folder_id in entered if folder_id in tree.nodes]
+
+
+def _graft_folders(service: "Resource", tree: DriveTree, folder_ids: List[str], fields: str) -> None:
+    """
+    Lists folders that entered the tree, and any subfolders they bring along, adding their contents.
+    """
+    tree.expand(folder_ids, lambda folder_id: utils.list_drive_files(
+        service, folder_id, fields, modified_time=tree.nodes[folder_id].modified_time), incremental=True)
+
+
+def refresh_tree(service: "Resource", tree: DriveTree, page_token: str, fields: str = TREE_FIELDS,
+                 drive_id: Optional[str] = None) -> str:
+    """
+    Brings a snapshot up to date by consuming the changes since its checkpoint, so the cost of
+    a refresh depends on how much changed rather than on the size of the tree.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        tree (DriveTree): The snapshot to patch in place.
+        page_token (str): The checkpoint the snapshot was taken at.
+        fields (str): The fields the snapshot was crawled with.
+        drive_id (str, optional): ID of the shared drive the folder lives in.
+
+    Returns:
+        str: The checkpoint for the next refresh.
+    """
+    changes, new_page_token = list_changes(service, page_token, fields, drive_id)
+    entered = apply_changes(tree, changes)
+    _graft_folders(service, tree, entered, fields)
+    logging.info(f"Applied {len(changes)} changes to the snapshot of folder ID {tree.root_id}, listing {len(entered)} new folders")
+    return new_page_token
+
+
+def save_snapshot(tree: DriveTree, path: str, page_token: str, fields: str = TREE_FIELDS) -> None:
+    """
+    Writes a tree, the changes checkpoint it was taken at and the fields it was crawled with to a JSON file.
+    The file is replaced atomically so an interrupted save keeps the previous snapshot.
+    """
+    snapshot = dict(tree.to_snapshot(), version=SNAPSHOT_VERSION, start_page_token=page_token, fields=fields)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, fields: Optional[str] = None) -> Tuple[DriveTree, str]:
+    """
+    Reads a tree saved by save_snapshot.
+
+    Args:
+        path (str): Location of the snapshot file.
+        fields (str, optional): The fields the caller needs. A snapshot crawled with other fields lacks
+                                values the caller reads, or was refreshed with different ones, and is rejected.
+
+    Returns:
+        tuple: The tree, with aggregates computed, and the checkpoint it was taken at.
+
+    Raises:
+        ValueError: If the snapshot has another version or was crawled with other fields.
+    """
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version in {path}: {snapshot.get('version')}")
+    if fields is not None and snapshot.get("fields") != fields:
+        raise ValueError(f"Snapshot {path} was crawled with {snapshot.get('fields')!r}, not {fields!r}")
+
+    return DriveTree.from_snapshot(snapshot), snapshot["start_page_token"]
+
+
+def load_or_crawl_snapshot(service: "Resource", path: str, root_id: str, crawl: Callable[[], DriveTree],
+                           fields: str = TREE_FIELDS, drive_id: Optional[str] = None) -> DriveTree:
+    """
+    Returns an up-to-date tree for a folder, refreshing the snapshot at path from the Changes API
+    when it exists and crawling the folder from scratch otherwise. The snapshot is saved again
+    with the new checkpoint either way.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        path (str): Location of the snapshot file.
+        root_id (str): The ID of the folder.
+        crawl (Callable): Performs a full crawl of the folder when there is no usable snapshot.
+        fields (str): The fields the folder is crawled with. A snapshot crawled with other fields,
+                      e.g. by an older version with a narrower projection, is crawled again.
+        drive_id (str, optional): ID of the shared drive the folder lives in.
+    """
+    if os.path.exists(path):
+        try:
+            tree, page_token = load_snapshot(path, fields)
+        except (ValueError, KeyError) as e:
+            logging.warning(f"Ignoring snapshot {path}, crawling again: {e}")
+        else:
+            if tree.root_id == root_id:
+                page_token = refresh_tree(service, tree, page_token, fields, drive_id)
+                save_snapshot(tree, path, page_token, fields)
+                return tree
+            logging.info(f"Snapshot {path} belongs to folder ID {tree.root_id}, crawling {root_id} instead")
+
+    # Take the checkpoint before crawling so changes made during the crawl are replayed next time
+    page_token = get_start_page_token(service, drive_id)
+    tree = crawl()
+    save_snapshot(tree, path, page_token, fields)
+    return tree
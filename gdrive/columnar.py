@@ -0,0 +1,202 @@
+from typing import Dict, List, Any, Optional, Union
+from array import array
+from gdrive.tree import DriveTree, FOLDER_MIME_TYPE
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency, installed with `pip install .[columnar]`
+    np = None
+
+# Parent index of the root node
+NO_PARENT = -1
+
+# Values of the kind column
+FILE = 0
+FOLDER = 1
+
+Column = Union[array, "np.ndarray"]
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """
+    Returns the bytes a Drive API item takes up: its size, or the quota it uses when it has no size.
+    """
+    return int(item.get("size") or item.get("quotaBytesUsed") or 0)
+
+
+class Rollups:
+    """
+    Aggregates computed by ColumnarTree.rollup, one column per aggregate, indexed like the tree's nodes.
+
+    For a folder, file_count and folder_count count its direct children, total_files and total_folders
+    its whole subtree (excluding itself), and total_bytes the sizes of every file in the subtree.
+    For a file the counts are 0 and total_bytes is its own size.
+    """
+
+    def __init__(self, file_count: Column, folder_count: Column, total_files: Column,
+                 total_folders: Column, total_bytes: Column):
+        self.file_count = file_count
+        self.folder_count = folder_count
+        self.total_files = total_files
+        self.total_folders = total_folders
+        self.total_bytes = total_bytes
+
+    def totals(self, index: int) -> Dict[str, int]:
+        """
+        Returns the aggregates of one node as plain integers.
+        """
+        return {
+            "file_count": int(self.file_count[index]),
+            "folder_count": int(self.folder_count[index]),
+            "total_files": int(self.total_files[index]),
+            "total_folders": int(self.total_folders[index]),
+            "total_bytes": int(self.total_bytes[index]),
+        }
+
+
+class ColumnarTree:
+    """
+    Compact, array-backed snapshot of a folder tree for drives with millions of items.
+
+    Every node is an integer index into a few typed columns instead of a Python object: its parent's
+    index, its kind (file or folder), its size in bytes and its depth below the root. The only per-node
+    Python objects are the Drive IDs and the ID -> index map. Nodes are appended parent first, as
+    the crawlers and DriveTree.walk visit them, so a parent's index is always lower than its children's.
+
+    Recursive counts and byte totals are computed by rollup() in bottom-up passes, one per depth,
+    vectorized with NumPy when it is installed and in a single pure-Python loop otherwise.
+    """
+
+    def __init__(self, root_id: str, root_name: str = "Root Folder"):
+        self.root_id = root_id
+        self.root_name = root_name
+        self.ids: List[str] = [root_id]
+        self.index: Dict[str, int] = {root_id: 0}
+        self.parent = array("q", [NO_PARENT])
+        self.kind = array("b", [FOLDER])
+        self.size = array("q", [0])
+        self.depth = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, item_id: str, parent_id: str, is_folder: bool, size: int = 0) -> int:
+        """
+        Appends a node below an already added folder.
+
+        Args:
+            item_id (str): The Drive ID of the item.
+            parent_id (str): The Drive ID of the folder it was listed in.
+            is_folder (bool): Whether the item is a folder.
+            size (int): The item's size in bytes.
+
+        Returns:
+            int: The node's index. An item seen before through another parent keeps its first index,
+                 so each item is counted once.
+        """
+        index = self.index.get(item_id)
+        if index is not None:
+            return index
+        parent = self.index[parent_id]
+        index = len(self.ids)
+        self.ids.append(item_id)
+        self.index[item_id] = index
+        self.parent.append(parent)
+        self.kind.append(FOLDER if is_folder else FILE)
+        self.size.append(size)
+        self.depth.append(self.depth[parent] + 1)
+        return index
+
+    def add_item(self, item: Dict[str, Any], parent_id: str) -> int:
+        """
+        Appends a Drive API item, as returned by files.list, below an already added folder.
+        """
+        return self.add(item["id"], parent_id, item["mimeType"] == FOLDER_MIME_TYPE, item_size(item))
+
+    @classmethod
+    def from_tree(cls, tree: DriveTree) -> "ColumnarTree":
+        """
+        Copies the structure and sizes of a DriveTree into columns.
+        """
+        columnar = cls(tree.root_id, tree.root.name)
+        for node in tree.walk():
+            columnar.add(node.id, node.parent_id, node.is_folder, int(node.size or node.quota_bytes_used or 0))
+        return columnar
+
+    def rollup(self, vectorized: Optional[bool] = None) -> Rollups:
+        """
+        Computes direct and recursive file/folder counts and byte totals for every node.
+
+        Args:
+            vectorized (bool, optional): Use NumPy. Defaults to True when NumPy is installed.
+
+        Returns:
+            Rollups: The aggregates, as NumPy arrays when vectorized and as typed arrays otherwise.
+        """
+        if vectorized is None:
+            vectorized = np is not None
+        if vectorized and np is None:
+            raise ImportError("Vectorized rollups require NumPy. Install it with `pip install .[columnar]`.")
+        rollups = self._rollup_numpy() if vectorized else self._rollup_python()
+        logging.info(f"Rolled up {len(self)} nodes below folder ID {self.root_id}")
+        return rollups
+
+    def _rollup_numpy(self) -> Rollups:
+        n = len(self)
+        parent = np.frombuffer(self.parent, dtype=np.int64)
+        is_folder = np.frombuffer(self.kind, dtype=np.int8).astype(bool)
+        depth = np.frombuffer(self.depth, dtype=np.int64)
+        sizes = np.frombuffer(self.size, dtype=np.int64)
+        children, is_file = parent[1:], ~is_folder[1:]
+
+        # Direct children: one histogram over every non-root node's parent
+        file_count = np.bincount(children, weights=is_file, minlength=n).astype(np.int64)
+        folder_count = np.bincount(children, weights=is_folder[1:], minlength=n).astype(np.int64)
+
+        # Files are leaves, so they are summed into their folders directly. What is left to fold
+        # bottom-up are the folders: their files, subfolders and bytes, one row per node.
+        totals = np.zeros((n, 3), dtype=np.int64)
+        totals[:, 0] = file_count
+        totals[:, 1] = folder_count
+        np.add.at(totals[:, 2], children[is_file], sizes[1:][is_file])
+
+        # Fold the deepest folders into their parents first, so every level is complete before it is folded
+        folders = np.flatnonzero(is_folder)
+        folders = folders[np.argsort(depth[folders], kind="stable")]
+        folder_depths = depth[folders]
+        starts = np.searchsorted(folder_depths, np.arange(int(folder_depths[-1]) + 2))
+        for level in range(len(starts) - 2, 0, -1):
+            nodes = folders[starts[level]:starts[level + 1]]
+            np.add.at(totals, parent[nodes], totals[nodes])
+
+        return Rollups(
+            file_count,
+            folder_count,
+            np.where(is_folder, totals[:, 0], 0),
+            np.where(is_folder, totals[:, 1], 0),
+            np.where(is_folder, totals[:, 2], sizes),
+        )
+
+    def _rollup_python(self) -> Rollups:
+        n = len(self)
+        parent, kind = self.parent, self.kind
+        file_count = array("q", bytes(8 * n))
+        folder_count = array("q", bytes(8 * n))
+        total_files = array("q", bytes(8 * n))
+        total_folders = array("q", bytes(8 * n))
+        total_bytes = array("q", (0 if k == FOLDER else s for k, s in zip(kind, self.size)))
+
+        # Children have higher indexes than their parents, so one reverse pass is bottom-up
+        for index in range(n - 1, 0, -1):
+            p = parent[index]
+            if kind[index] == FOLDER:
+                folder_count[p] += 1
+                total_folders[p] += total_folders[index] + 1
+                total_files[p] += total_files[index]
+            else:
+                file_count[p] += 1
+                total_files[p] += 1
+            total_bytes[p] += total_bytes[index]
+
+        return Rollups(file_count, folder_count, total_files, total_folders, total_bytes)
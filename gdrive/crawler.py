@@ -0,0 +1,249 @@
+from typing import Callable, Dict, List, Any, Optional, Tuple, TYPE_CHECKING
+from gdrive import utils
+from gdrive.fields import COUNT_TREE_FIELDS
+from gdrive.scan import scan_tree
+from gdrive.pool import ThreadServices
+from gdrive.traversal import Frontier, traverse
+from gdrive.tree import DriveTree, TREE_FIELDS, FOLDER_MIME_TYPE
+import math
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+    from gdrive.columnar import ColumnarTree
+
+# Default number of worker threads used for concurrent folder listings
+DEFAULT_WORKERS = 8
+
+# Crawl backends selectable per report: a thread pool of blocking clients, or the asyncio client in gdrive.aio
+BACKENDS = ("threads", "asyncio")
+
+
+class ConcurrentCrawler:
+    """
+    Breadth-first crawler that lists folders in parallel on a pool of worker threads.
+
+    Folders waiting to be listed are kept in a Frontier, which spills to disk on very large trees,
+    and listed by gdrive.traversal.traverse. With coalesce enabled, several folders
+    from the frontier are listed by one "'a' in parents or 'b' in parents" query, which collapses the
+    list calls for many small folders into a few. Folder sizes are not known before they are listed,
+    so any folder can be grouped; a large one simply makes the combined query run to more pages.
+    Each worker thread lazily builds its own service object from service_factory, because the
+    httplib2 transport behind a service is not thread-safe.
+
+    Listings are merged into the DriveTree on the calling thread in the order the folders left the
+    frontier, one folder at a time, and every listing is sorted by LISTING_ORDER. The resulting tree,
+    including which parent an item with several parents is placed under, is therefore the same
+    however the folders were grouped and in whichever order the listings complete.
+    """
+
+    def __init__(self, service_factory: Callable[[], "Resource"], workers: int = DEFAULT_WORKERS,
+                 fields: str = TREE_FIELDS, coalesce: bool = False, max_query_length: int = utils.MAX_QUERY_LENGTH,
+                 use_cache: bool = True):
+        self.service_factory = service_factory
+        self.workers = max(1, workers)
+        self.fields = fields
+        self.coalesce = coalesce
+        self.max_query_length = max_query_length
+        self.use_cache = use_cache
+        self._services = ThreadServices(service_factory)
+
+    def _get_service(self) -> "Resource":
+        """
+        Returns the service object owned by the current worker thread, building it on first use.
+        """
+        return self._services.get()
+
+    def _list_folders(self, folder_ids: List[str], modified_times: Dict[str, Optional[str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Lists every item of one or more folders on a worker thread, as (parent folder ID, item) pairs.
+        The folders' modifiedTime values let the metadata cache tell whether a cached listing is stale.
+        """
+        service = self._get_service()
+        if len(folder_ids) == 1:
+            items = utils.list_drive_files(service, folder_ids[0], self.fields, modified_time=modified_times[folder_ids[0]],
+                                           use_cache=self.use_cache)
+            return [(folder_ids[0], item) for item in items]
+        pairs = utils.list_drive_files_in_folders(service, folder_ids, self.fields, modified_times=modified_times,
+                                                  use_cache=self.use_cache)
+        # A combined query interleaves the folders; regroup them in frontier order, keeping each listing's order
+        position = {folder_id: index for index, folder_id in enumerate(folder_ids)}
+        return sorted(pairs, key=lambda pair: position[pair[0]])
+
+    def _next_group(self, frontier: Frontier, free_slots: int) -> List[str]:
+        """
+        Takes the next folders to list from the frontier: one folder, or with coalescing an even
+        share of the frontier for each free worker, as long as the combined query fits the length limit.
+        """
+        group = [frontier.popleft()]
+        if not self.coalesce:
+            return group
+
+        target = max(1, math.ceil((len(frontier) + 1) / max(1, free_slots)))
+        while frontier and len(group) < target:
+            if len(utils.build_parents_query(group + [frontier.peek()])) > self.max_query_length:
+                break
+            group.append(frontier.popleft())
+        return group
+
+    def crawl(self, root_id: str, root_name: str = "Root Folder") -> DriveTree:
+        """
+        Crawls a folder and everything beneath it.
+
+        Args:
+            root_id (str): The ID of the folder to crawl.
+            root_name (str): Display name of the root folder.
+
+        Returns:
+            DriveTree: The populated tree with aggregates computed.
+        """
+        tree = DriveTree(root_id, root_name)
+
+        def add(item: Dict[str, Any], folder_id: str) -> Optional[str]:
+            # Skip items already seen through another parent so each item is counted once
+            if item["id"] in tree.nodes:
+                return None
+            node = tree.add_item(item, folder_id)
+            return node.id if node.is_folder else None
+
+        self._crawl(root_id, add, lambda folder_id: tree.nodes[folder_id].modified_time)
+        tree.compute_aggregates()
+        logging.info(f"Crawled folder ID {root_id} with {self.workers} workers: {tree.total_items()} items")
+        return tree
+
+    def crawl_columnar(self, root_id: str, root_name: str = "Root Folder") -> "ColumnarTree":
+        """
+        Crawls a folder and everything beneath it straight into a ColumnarTree, for counts and byte
+        totals of drives with millions of items: no DriveNode is created, only a row per item.
+
+        Args:
+            root_id (str): The ID of the folder to crawl.
+            root_name (str): Display name of the root folder.
+
+        Returns:
+            ColumnarTree: The populated columns; call rollup() for the counts.
+        """
+        # Imported here so NumPy, when installed, loads only for columnar crawls
+        from gdrive.columnar import ColumnarTree
+
+        columnar = ColumnarTree(root_id, root_name)
+
+        def add(item: Dict[str, Any], folder_id: str) -> Optional[str]:
+            # Skip items already seen through another parent so each item is counted once
+            if item["id"] in columnar.index:
+                return None
+            columnar.add_item(item, folder_id)
+            return item["id"] if item["mimeType"] == FOLDER_MIME_TYPE else None
+
+        # Folders keep no modifiedTime here, so cached listings are checked against the TTL only
+        self._crawl(root_id, add, lambda folder_id: None)
+        logging.info(f"Crawled folder ID {root_id} into columns with {self.workers} workers: {len(columnar) - 1} items")
+        return columnar
+
+    def _crawl(self, root_id: str, add: Callable[[Dict[str, Any], str], Optional[str]],
+               modified_time: Callable[[str], Optional[str]]) -> None:
+        """
+        Lists root_id and every folder found beneath it on the worker pool. Each listed item is passed
+        to add with the folder it was listed in; add returns the item's ID when it is a new folder to list.
+        """
+        def take(frontier: Frontier, free_slots: int) -> Tuple[List[str], Dict[str, Optional[str]]]:
+            group = self._next_group(frontier, free_slots)
+            return group, {folder_id: modified_time(folder_id) for folder_id in group}
+
+        frontier = Frontier([root_id])
+        try:
+            listings = traverse(frontier, lambda task: self._list_folders(*task), self.workers, take, "drive-crawler",
+                                ordered=True)
+            for _, items in listings:
+                for folder_id, item in items:
+                    folder = add(item, folder_id)
+                    if folder is not None:
+                        frontier.append(folder)
+        finally:
+            frontier.close()
+            self._services.close()
+
+
+def crawl_tree(service: "Resource", root_id: str, root_name: str = "Root Folder", fields: str = TREE_FIELDS,
+               workers: int = 1, service_factory: Optional[Callable[[], "Resource"]] = None,
+               backend: str = "threads", coalesce: bool = False, flat_scan: bool = False,
+               drive_id: Optional[str] = None, use_cache: bool = True) -> DriveTree:
+    """
+    Builds a DriveTree for a folder, serially, with a pool of concurrent workers, on the asyncio backend,
+    or from a flat scan of the whole drive.
+
+    Args:
+        service (Resource): Google Drive API service instance, used for serial crawls.
+        root_id (str): The ID of the folder to crawl.
+        root_name (str): Display name of the root folder.
+        fields (str): Fields to retrieve for each item.
+        workers (int): Number of worker threads. 1 crawls serially on the given service.
+        service_factory (Callable, optional): Builds a new service for each worker thread.
+                                              Defaults to the shared client pool, GDriveAuth().pool.
+        backend (str): "threads" or "asyncio". The asyncio backend ignores workers and service_factory.
+        coalesce (bool): List several folders per "in parents" query on the threads backend.
+        flat_scan (bool): Page through every item in the drive once and rebuild the folder's subtree locally.
+        drive_id (str, optional): ID of the shared drive to scan when flat_scan is set.
+        use_cache (bool): Use the metadata cache. Pass False for a folder that is being written to,
+                          e.g. a copy destination; its cached listings are dropped as it is crawled.
+                          Flat scans and the asyncio backend never use the cache.
+
+    Returns:
+        DriveTree: The populated tree with aggregates computed.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown crawl backend {backend!r}. Choose one of: {', '.join(BACKENDS)}")
+
+    if flat_scan:
+        return scan_tree(service, root_id, root_name, fields, drive_id)
+
+    if backend == "asyncio":
+        # Imported here so aiohttp and the auth stack load only when the backend is used
+        from gdrive.aio import crawl_tree_with_asyncio
+        return crawl_tree_with_asyncio(root_id, root_name, fields)
+
+    if workers <= 1:
+        if not coalesce:
+            return DriveTree.build(service, root_id, root_name, fields, use_cache)
+        # A single worker owns the given service, so it is never shared between threads
+        return ConcurrentCrawler(lambda: service, 1, fields, coalesce, use_cache=use_cache).crawl(root_id, root_name)
+
+    if service_factory is None:
+        # Imported here so the OAuth and discovery libraries load only when a crawl needs them
+        from gdrive.auth import GDriveAuth
+        service_factory = GDriveAuth().pool
+
+    return ConcurrentCrawler(service_factory, workers, fields, coalesce, use_cache=use_cache).crawl(root_id, root_name)
+
+
+def crawl_columnar(service: "Resource", root_id: str, root_name: str = "Root Folder", fields: str = COUNT_TREE_FIELDS,
+                   workers: int = 1, service_factory: Optional[Callable[[], "Resource"]] = None,
+                   coalesce: bool = True, use_cache: bool = True) -> "ColumnarTree":
+    """
+    Crawls a folder into a ColumnarTree instead of a DriveTree, for counts-only reports on very large drives.
+    Add size (or quotaBytesUsed) to fields for byte totals.
+
+    Args:
+        service (Resource): Google Drive API service instance, used when crawling with one worker.
+        root_id (str): The ID of the folder to crawl.
+        root_name (str): Display name of the root folder.
+        fields (str): Fields to retrieve for each item; id and mimeType are required.
+        workers (int): Number of worker threads.
+        service_factory (Callable, optional): Builds a new service for each worker thread.
+                                              Defaults to the shared client pool, GDriveAuth().pool.
+        coalesce (bool): List several folders per "in parents" query.
+        use_cache (bool): Use the metadata cache; see gdrive.utils.list_drive_files.
+
+    Returns:
+        ColumnarTree: The populated columns; call rollup() for the counts.
+    """
+    if workers <= 1:
+        # A single worker owns the given service, so it is never shared between threads
+        service_factory = lambda: service
+    elif service_factory is None:
+        # Imported here so the OAuth and discovery libraries load only when a crawl needs them
+        from gdrive.auth import GDriveAuth
+        service_factory = GDriveAuth().pool
+
+    crawler = ConcurrentCrawler(service_factory, workers, fields, coalesce, use_cache=use_cache)
+    return crawler.crawl_columnar(root_id, root_name)
@@ -0,0 +1,40 @@
+from typing import List
+
+# Field projections for files.list, one per kind of listing. Each asks for only the per-item
+# fields its callers read; the Drive API omits everything else from the response.
+
+# Direct file/folder counts (Assessment 1): the mimeType tells files from folders
+COUNT_FIELDS = "files(mimeType)"
+
+# Recursive counts: folder IDs are needed to list the next level
+COUNT_TREE_FIELDS = "files(id, mimeType)"
+
+# Comparing a copy with its source: names pair items up, md5Checksum or size compares files
+COMPARE_FIELDS = "files(id, name, mimeType, size, md5Checksum)"
+
+# Crawls that are counted, copied and compared. modifiedTime tells the metadata cache
+# whether a folder's cached listing is stale.
+TREE_FIELDS = "files(id, name, mimeType, size, modifiedTime, md5Checksum)"
+
+# The printed Assessment 2 tree and its manifest: the crawl fields plus each file's link
+RENDER_FIELDS = "files(id, name, mimeType, size, modifiedTime, md5Checksum, webViewLink)"
+
+
+def item_fields(fields: str) -> List[str]:
+    """
+    Returns the per-item fields of a files.list projection, e.g. ["id", "name"] for "files(id, name)".
+    """
+    return [field.strip() for field in fields[fields.index("(") + 1:fields.rindex(")")].split(",")]
+
+
+def page_fields(fields: str, parents: bool = False) -> str:
+    """
+    Returns the fields string to send with each files.list page for a projection:
+    nextPageToken is added, without which pagination stops after the first page,
+    and with parents=True the parents field, which attributes items of a combined query to a folder.
+    """
+    if parents and "parents" not in item_fields(fields):
+        fields = fields.replace("files(", "files(parents, ", 1)
+    if "nextPageToken" not in fields:
+        fields = f"nextPageToken, {fields}"
+    return fields
@@ -0,0 +1,137 @@
+from typing import Dict, List, Any, Optional, Tuple
+from gdrive.tree import DriveTree
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+DEFAULT_JOURNAL_PATH = "gdrive_copy_journal.sqlite3"
+
+# Buffered records are committed (and fsync'd) once this many are pending...
+FLUSH_EVERY = 100
+
+# ...or once this many seconds have passed since the last commit
+FLUSH_INTERVAL = 2.0
+
+COPIED = "copied"
+FAILED = "failed"
+
+
+def root_journal_path(journal_path: str, source_folder_id: str, destination_folder_id: str) -> str:
+    """
+    Returns the journal location for one copy of a batch, e.g. gdrive_copy_journal.SRC-DST.sqlite3,
+    so copies running side by side each keep their own plan. Drive IDs are safe in file names.
+    """
+    base, ext = os.path.splitext(journal_path)
+    return f"{base}.{source_folder_id}-{destination_folder_id}{ext}"
+
+
+class CopyJournal:
+    """
+    Durable local record of a copy in progress, so an interrupted copy can be resumed.
+
+    The journal stores the source snapshot the copy was planned from and, for every source item,
+    the ID of its copy in the destination and whether copying it succeeded. Records are buffered
+    and committed in batches; a commit is a full fsync, so a crash loses at most the records of
+    the last FLUSH_EVERY items or FLUSH_INTERVAL seconds, which a resumed copy simply redoes.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Copy callbacks may run on worker threads, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Sync the WAL on every commit; commits are batched, so this is the interval fsync
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                source_id TEXT PRIMARY KEY,
+                dest_id TEXT,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._pending: List[Tuple[str, Optional[str], str, float]] = []
+        self._last_flush = time.monotonic()
+
+    def start(self, source_folder_id: str, destination_folder_id: str, source_tree: DriveTree) -> None:
+        """
+        Discards any previous journal and records a new copy plan.
+        """
+        snapshot = json.dumps(source_tree.to_snapshot(), separators=(",", ":"))
+        with self._lock:
+            self._pending.clear()
+            self._conn.execute("DELETE FROM items")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [("source_id", source_folder_id), ("dest_id", destination_folder_id), ("source_tree", snapshot)],
+            )
+            self._conn.commit()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def load_plan(self, source_folder_id: str, destination_folder_id: str) -> Optional[DriveTree]:
+        """
+        Returns the source snapshot of a journaled copy between the same two folders, or None if
+        the journal is empty or belongs to a different copy.
+        """
+        with self._lock:
+            if self._meta("source_id") != source_folder_id or self._meta("dest_id") != destination_folder_id:
+                return None
+            snapshot = self._meta("source_tree")
+        return DriveTree.from_snapshot(json.loads(snapshot)) if snapshot else None
+
+    def completed(self) -> Dict[str, str]:
+        """
+        Returns the destination ID of every source item that has already been copied.
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("SELECT source_id, dest_id FROM items WHERE state = ?", (COPIED,)).fetchall()
+        return dict(rows)
+
+    def record(self, source_id: str, dest_id: Optional[str], state: str = COPIED) -> None:
+        """
+        Buffers the outcome of copying one item, committing the buffer when it is full or old enough.
+        """
+        with self._lock:
+            self._pending.append((source_id, dest_id, state, time.time()))
+            due = len(self._pending) >= FLUSH_EVERY or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Commits every buffered record to disk.
+        """
+        with self._lock:
+            if self._pending:
+                # A failure never overwrites an earlier successful copy of the same item
+                self._conn.executemany(
+                    """
+                    INSERT INTO items VALUES (?, ?, ?, ?)
+                    ON CONFLICT(source_id) DO UPDATE SET dest_id = excluded.dest_id, state = excluded.state,
+                        updated_at = excluded.updated_at
+                    WHERE items.state != 'copied' OR excluded.state = 'copied'
+                    """,
+                    self._pending,
+                )
+                self._conn.commit()
+                logging.info(f"Journaled {len(self._pending)} copied items to {self.path}")
+                self._pending.clear()
+            self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,136 @@
+from typing import Dict, Any, Optional, IO
+from gdrive.tree import DriveTree, DriveNode
+import csv
+import gzip
+import io
+import json
+import logging
+
+MANIFEST_FORMATS = ("jsonl", "csv")
+
+# Manifest records are written through a buffer of this many bytes
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+ITEM = "item"
+ROLLUP = "folder_rollup"
+
+CSV_COLUMNS = [
+    "record", "id", "parent_id", "path", "mimeType", "size", "md5Checksum", "modifiedTime",
+    "file_count", "folder_count", "total_files", "total_folders",
+]
+
+
+def manifest_format(path: str) -> str:
+    """
+    Infers the manifest format from a file name such as report.csv or report.jsonl.gz.
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "jsonl"
+
+
+class ManifestWriter:
+    """
+    Streams manifest records to a JSON Lines or CSV file, optionally gzip-compressed.
+
+    Records are written one at a time through a fixed-size buffer, so memory use does not
+    grow with the number of items.
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None, compress: Optional[bool] = None):
+        self.path = path
+        self.format = format or manifest_format(path)
+        if self.format not in MANIFEST_FORMATS:
+            raise ValueError(f"Unknown manifest format {self.format!r}. Choose one of: {', '.join(MANIFEST_FORMATS)}")
+        compress = path.endswith(".gz") if compress is None else compress
+
+        if compress:
+            raw = gzip.open(path, "wb")
+            self._file: IO[str] = io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER_SIZE), encoding="utf-8", newline="")
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE)
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            self._csv.writeheader()
+        self.records = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, separators=(",", ":")))
+            self._file.write("\n")
+        self.records += 1
+
+    def write_item(self, node: DriveNode, path: str) -> None:
+        """
+        Writes the record of one file or folder.
+        """
+        self.write({
+            "record": ITEM,
+            "id": node.id,
+            "parent_id": node.parent_id,
+            "path": path,
+            "mimeType": node.mime_type,
+            "size": node.size,
+            "md5Checksum": node.md5_checksum,
+            "modifiedTime": node.modified_time,
+        })
+
+    def write_rollup(self, folder: DriveNode, path: str) -> None:
+        """
+        Writes the direct and recursive counts of one folder.
+        """
+        self.write({
+            "record": ROLLUP,
+            "id": folder.id,
+            "parent_id": folder.parent_id,
+            "path": path,
+            "mimeType": folder.mime_type,
+            "file_count": folder.file_count,
+            "folder_count": folder.folder_count,
+            "total_files": folder.total_files,
+            "total_folders": folder.total_folders,
+        })
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ManifestWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def write_manifest(tree: DriveTree, path: str, format: Optional[str] = None, compress: Optional[bool] = None) -> int:
+    """
+    Exports a crawled tree as a manifest: one record per item in pre-order, followed by a rollup
+    record for every folder (the root first).
+
+    Args:
+        tree (DriveTree): The crawled tree, with aggregates computed.
+        path (str): The manifest file to write.
+        format (str, optional): "jsonl" or "csv". Inferred from the file name by default.
+        compress (bool, optional): Gzip the manifest. Defaults to True for names ending in .gz.
+
+    Returns:
+        int: The number of records written.
+    """
+    # Only folder paths are kept; file paths are derived from them as items stream past
+    folder_paths: Dict[str, str] = {tree.root_id: tree.root.name}
+
+    with ManifestWriter(path, format, compress) as writer:
+        for node in tree.walk():
+            node_path = f"{folder_paths[node.parent_id]}/{node.name}"
+            if node.is_folder:
+                folder_paths[node.id] = node_path
+            writer.write_item(node, node_path)
+
+        writer.write_rollup(tree.root, folder_paths[tree.root_id])
+        for node in tree.walk():
+            if node.is_folder:
+                writer.write_rollup(node, folder_paths[node.id])
+
+    logging.info(f"Wrote {writer.records} manifest records for folder ID {tree.root_id} to {path}")
+    return writer.records
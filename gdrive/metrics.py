@@ -0,0 +1,238 @@
+from typing import Dict, List, Any, Optional, TextIO, TYPE_CHECKING
+from gdrive.retry import is_rate_limit_error
+import bisect
+import json
+import os
+import sys
+import threading
+
+if TYPE_CHECKING:
+    from googleapiclient.http import HttpRequest
+
+# Upper bounds, in seconds, of the latency histogram buckets; slower calls land in the +Inf bucket
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def request_method(request: Any) -> str:
+    """
+    Returns the API method a request calls, e.g. "files.list", for labelling its metrics.
+    """
+    method_id = getattr(request, "methodId", None)
+    if isinstance(method_id, str):
+        # googleapiclient names methods after the discovery document, e.g. "drive.files.list"
+        return method_id.split(".", 1)[-1] if method_id.startswith("drive.") else method_id
+    method = getattr(request, "method", None)
+    if isinstance(method, str) and "." in method:
+        return method
+    return "unknown"
+
+
+class MethodStats:
+    """
+    Counters and a latency histogram for one API method.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.quota_errors = 0
+        self.bytes_received = 0
+        self.timed_calls = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Estimates a latency percentile by interpolating inside the histogram bucket it falls in,
+        like Prometheus' histogram_quantile, capped at the slowest call seen.
+        Returns None when no call was timed.
+        """
+        if not self.timed_calls:
+            return None
+        rank = fraction * self.timed_calls
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(LATENCY_BUCKETS + (self.latency_max,), self.buckets):
+            if count and seen + count >= rank:
+                estimate = lower + (max(upper, lower) - lower) * (rank - seen) / count
+                return min(estimate, self.latency_max)
+            seen += count
+            lower = upper
+        return self.latency_max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "quota_errors": self.quota_errors,
+            "bytes_received": self.bytes_received,
+            "latency_seconds_sum": round(self.latency_sum, 6),
+            "latency_seconds_max": round(self.latency_max, 6),
+            "latency_buckets": dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+
+class ApiMetrics:
+    """
+    Thread-safe call counts, latency histograms, retries, quota errors and bytes received per API method.
+
+    Every call site records into the process-wide instance from get_metrics(): execute_with_retry,
+    batch requests (one "batch" entry per round trip plus an untimed entry per sub-request), and the
+    asyncio client.
+    """
+
+    def __init__(self):
+        self.methods: Dict[str, MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, method: str) -> MethodStats:
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = MethodStats()
+        return stats
+
+    def record_call(self, method: str, seconds: Optional[float] = None, bytes_received: int = 0,
+                    error: Optional[Exception] = None) -> None:
+        """
+        Records one call. Calls without a duration (sub-requests of a batch) are counted but not timed.
+        """
+        with self._lock:
+            stats = self._stats(method)
+            stats.calls += 1
+            stats.bytes_received += bytes_received
+            if error is not None:
+                stats.errors += 1
+                if is_rate_limit_error(error):
+                    stats.quota_errors += 1
+            if seconds is not None:
+                stats.timed_calls += 1
+                stats.latency_sum += seconds
+                stats.latency_max = max(stats.latency_max, seconds)
+                stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def record_bytes(self, method: str, bytes_received: int) -> None:
+        with self._lock:
+            self._stats(method).bytes_received += bytes_received
+
+    def record_retry(self, method: str) -> None:
+        with self._lock:
+            self._stats(method).retries += 1
+
+    def instrument(self, request: "HttpRequest") -> "HttpRequest":
+        """
+        Wraps a request's response parser so the size of the raw response body is recorded,
+        for plain and batched execution alike. Returns the same request.
+        """
+        postproc = getattr(request, "postproc", None)
+        if not callable(postproc) or getattr(request, "_metrics_instrumented", False) is True:
+            return request
+        method = request_method(request)
+
+        def counting_postproc(resp: Any, content: bytes) -> Any:
+            self.record_bytes(method, len(content or b""))
+            return postproc(resp, content)
+
+        request.postproc = counting_postproc
+        request._metrics_instrumented = True
+        return request
+
+    def total(self, attribute: str) -> int:
+        with self._lock:
+            return sum(getattr(stats, attribute) for stats in self.methods.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {method: stats.to_dict() for method, stats in sorted(self.methods.items())}
+
+    def to_prometheus(self, prefix: str = "gdrive_api") -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format, for the node_exporter textfile collector.
+        """
+        counters = [
+            ("calls_total", "calls", "Drive API calls made"),
+            ("errors_total", "errors", "Drive API calls that failed"),
+            ("retries_total", "retries", "Drive API calls retried after a retryable error"),
+            ("quota_errors_total", "quota_errors", "Drive API calls rejected by a rate limit"),
+            ("response_bytes_total", "bytes_received", "Bytes of Drive API response bodies received"),
+        ]
+        with self._lock:
+            methods = sorted(self.methods.items())
+            lines: List[str] = []
+            for name, attribute, description in counters:
+                lines += [f"# HELP {prefix}_{name} {description}.", f"# TYPE {prefix}_{name} counter"]
+                lines += [f'{prefix}_{name}{{method="{method}"}} {getattr(stats, attribute)}' for method, stats in methods]
+
+            name = f"{prefix}_latency_seconds"
+            lines += [f"# HELP {name} Drive API call latency.", f"# TYPE {name} histogram"]
+            for method, stats in methods:
+                cumulative = 0
+                for bound, count in zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], stats.buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{method="{method}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{method="{method}"}} {stats.latency_sum:.6f}')
+                lines.append(f'{name}_count{{method="{method}"}} {stats.timed_calls}')
+        return "\n".join(lines) + "\n"
+
+    def print_summary(self, out: Optional[TextIO] = None) -> None:
+        """
+        Prints one row per API method with its counts, bytes and mean/p50/p95 latency in milliseconds.
+        """
+        out = out or sys.stdout
+
+        def ms(seconds: Optional[float]) -> str:
+            return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+        with self._lock:
+            methods = sorted(self.methods.items())
+        out.write(f"\n{'API method':<28} {'calls':>7} {'errors':>7} {'retries':>8} {'quota':>6} "
+                  f"{'KiB recv':>10} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7}\n")
+        for method, stats in methods:
+            mean = stats.latency_sum / stats.timed_calls if stats.timed_calls else None
+            out.write(f"{method:<28} {stats.calls:>7} {stats.errors:>7} {stats.retries:>8} {stats.quota_errors:>6} "
+                      f"{stats.bytes_received / 1024:>10.1f} {ms(mean):>8} {ms(stats.percentile(0.5)):>7} "
+                      f"{ms(stats.percentile(0.95)):>7}\n")
+        out.flush()
+
+
+def metrics_format(path: str) -> str:
+    """
+    Picks the export format from a file name: "prometheus" for .prom files, "json" otherwise.
+    """
+    return "prometheus" if path.endswith(".prom") else "json"
+
+
+def write_metrics(metrics: ApiMetrics, path: str) -> None:
+    """
+    Writes the metrics to a JSON file or a Prometheus textfile. The file is replaced atomically,
+    so a textfile collector never reads a half-written file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if metrics_format(path) == "prometheus":
+            f.write(metrics.to_prometheus())
+        else:
+            json.dump(metrics.to_dict(), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Process-wide metrics shared by every thread, worker and backend
+_metrics = ApiMetrics()
+
+
+def get_metrics() -> ApiMetrics:
+    """
+    Returns the process-wide API metrics.
+    """
+    return _metrics
+
+
+def reset_metrics() -> ApiMetrics:
+    """
+    Starts a fresh set of process-wide metrics, e.g. at the start of each assessment.
+    """
+    global _metrics
+    _metrics = ApiMetrics()
+    return _metrics
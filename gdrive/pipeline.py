@@ -0,0 +1,188 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, List, Any, Optional, Hashable, Tuple, TYPE_CHECKING
+from gdrive.batch import execute_batch, MAX_BATCH_SIZE
+from gdrive.journal import CopyJournal, FAILED
+from gdrive.tree import DriveTree, DriveNode
+from gdrive.utils import create_folder_request, copy_file_request
+from gdrive.pool import ThreadServices
+from gdrive.traversal import Frontier
+import threading
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+    from googleapiclient.http import HttpRequest
+
+# Default number of worker threads copying files while the folder skeleton is being created
+DEFAULT_COPY_WORKERS = 8
+
+
+class CopyPipeline:
+    """
+    Copies a DriveTree as two overlapping stages.
+
+    The calling thread creates the destination folder skeleton in rounds of up to MAX_BATCH_SIZE
+    folders taken from a Frontier, sending all folder creations of a round together in batch requests.
+    As soon as a folder's destination ID exists, copying its files is handed to a pool of worker
+    threads, so file copies for the upper levels run while the lower levels are still being created. Each worker thread builds
+    its own service object from service_factory, because the httplib2 transport behind a service
+    is not thread-safe. Callbacks are serialized by a lock, so they can update a progress bar.
+    """
+
+    def __init__(self, service: "Resource", service_factory: Callable[[], "Resource"],
+                 workers: int = DEFAULT_COPY_WORKERS,
+                 on_copied: Optional[Callable[[DriveNode], None]] = None,
+                 on_error: Optional[Callable[[DriveNode, Exception], None]] = None,
+                 journal: Optional[CopyJournal] = None):
+        self.service = service
+        self.service_factory = service_factory
+        self.workers = max(1, workers)
+        self.on_copied = on_copied
+        self.on_error = on_error
+        self.journal = journal
+        self.copied = 0
+        self._services = ThreadServices(service_factory)
+        self._callback_lock = threading.Lock()
+
+    def _get_service(self) -> "Resource":
+        """
+        Returns the service object owned by the current worker thread, building it on first use.
+        """
+        return self._services.get()
+
+    def _report_errors(self, source_tree: DriveTree, errors: Dict[Hashable, Exception]) -> None:
+        """
+        Journals and reports every failed copy of a batch.
+        """
+        for node_id, error in errors.items():
+            node = source_tree.nodes[node_id]
+            logging.error(f"An error occurred while copying {node.name}: {error}")
+            if self.journal is not None:
+                self.journal.record(node_id, None, FAILED)
+            if self.on_error is not None:
+                with self._callback_lock:
+                    self.on_error(node, error)
+
+    def _on_success(self, source_tree: DriveTree, key: Hashable, response: Dict[str, Any]) -> None:
+        if self.journal is not None:
+            self.journal.record(key, response["id"])
+        with self._callback_lock:
+            self.copied += 1
+            if self.on_copied is not None:
+                self.on_copied(source_tree.nodes[key])
+
+    def _copy_files(self, source_tree: DriveTree, source_id: str, dest_id: str, done: Dict[str, str]) -> None:
+        """
+        Copies the files directly inside one source folder on a worker thread.
+        """
+        service = self._get_service()
+        requests: Dict[Hashable, "HttpRequest"] = {
+            node.id: copy_file_request(service, node.to_dict(), dest_id)
+            for node in source_tree.children(source_id)
+            if not node.is_folder and node.id not in done
+        }
+        _, errors = execute_batch(service, requests,
+                                   on_success=lambda key, response: self._on_success(source_tree, key, response))
+        self._report_errors(source_tree, errors)
+
+    def copy(self, source_tree: DriveTree, destination_folder_id: str) -> int:
+        """
+        Copies every item of a DriveTree into a destination folder.
+
+        Args:
+            source_tree (DriveTree): Snapshot of the source folder.
+            destination_folder_id (str): The ID of the destination folder.
+
+        Returns:
+            int: The number of items copied.
+        """
+        try:
+            self._copy(source_tree, destination_folder_id)
+        finally:
+            self._services.close()
+
+        logging.info(f"Copied {self.copied} items of folder ID {source_tree.root_id} with {self.workers} workers")
+        return self.copied
+
+    def _copy(self, source_tree: DriveTree, destination_folder_id: str) -> None:
+        """
+        Creates the folder skeleton round by round while the worker pool copies the files.
+        """
+        done = self.journal.completed() if self.journal is not None else {}
+        frontier = Frontier([(source_tree.root_id, destination_folder_id)])
+        file_jobs: List[Future] = []
+
+        with frontier, ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="drive-copier") as executor:
+            while frontier:
+                folders = frontier.pop_many(MAX_BATCH_SIZE)
+                # The folders of this round exist, so their files can be copied in the background
+                for source_id, dest_id in folders:
+                    file_jobs.append(executor.submit(self._copy_files, source_tree, source_id, dest_id, done))
+
+                # Meanwhile, create every subfolder of this round in batch requests
+                requests: Dict[Hashable, "HttpRequest"] = {}
+                resumed: List[Tuple[str, str]] = []
+                for source_id, dest_id in folders:
+                    for node in source_tree.children(source_id):
+                        if not node.is_folder:
+                            continue
+                        if node.id in done:
+                            # Created by an earlier run; reuse it
+                            resumed.append((node.id, done[node.id]))
+                            continue
+                        requests[node.id] = create_folder_request(self.service, node.to_dict(), dest_id)
+
+                results, errors = execute_batch(self.service, requests,
+                                                on_success=lambda key, response: self._on_success(source_tree, key, response))
+                self._report_errors(source_tree, errors)
+
+                # Make the new folders durable before anything is copied into them
+                if self.journal is not None:
+                    self.journal.flush()
+
+                # Descend only into folders that were created successfully
+                frontier.extend(resumed + [(node_id, results[node_id]["id"]) for node_id in requests if node_id in results])
+
+                # Keep only the copy jobs still running, surfacing errors from the finished ones
+                running = []
+                for job in file_jobs:
+                    if job.done():
+                        job.result()
+                    else:
+                        running.append(job)
+                file_jobs = running
+
+            # Surface unexpected errors raised on the worker threads
+            for job in file_jobs:
+                job.result()
+
+
+def copy_tree_pipelined(service: "Resource", source_tree: DriveTree, destination_folder_id: str,
+                        on_copied: Optional[Callable[[DriveNode], None]] = None,
+                        on_error: Optional[Callable[[DriveNode, Exception], None]] = None,
+                        journal: Optional[CopyJournal] = None, workers: int = DEFAULT_COPY_WORKERS,
+                        service_factory: Optional[Callable[[], "Resource"]] = None) -> int:
+    """
+    Copies every item of a DriveTree into a destination folder with a CopyPipeline.
+
+    Args:
+        service (Resource): Google Drive API service instance, used to create folders on the calling thread.
+        source_tree (DriveTree): Snapshot of the source folder.
+        destination_folder_id (str): The ID of the destination folder.
+        on_copied (Callable, optional): Called with each source node once it has been copied.
+        on_error (Callable, optional): Called with a source node and the error if copying it failed.
+        journal (CopyJournal, optional): Records every copy; items it already lists as copied are skipped
+                                         and their destination folders reused.
+        workers (int): Number of worker threads copying files.
+        service_factory (Callable, optional): Builds a new service for each worker thread.
+                                              Defaults to the shared client pool, GDriveAuth().pool.
+
+    Returns:
+        int: The number of items copied.
+    """
+    if service_factory is None:
+        # Imported here so the OAuth and discovery libraries load only when they are needed
+        from gdrive.auth import GDriveAuth
+        service_factory = GDriveAuth().pool
+    pipeline = CopyPipeline(service, service_factory, workers, on_copied, on_error, journal)
+    return pipeline.copy(source_tree, destination_folder_id)
@@ -0,0 +1,152 @@
+from typing import Callable, List, Any, Optional, Iterator
+from contextlib import contextmanager
+import threading
+import logging
+
+# Default number of idle service clients (and their open connections) kept for reuse
+DEFAULT_POOL_SIZE = 32
+
+_pool_size = DEFAULT_POOL_SIZE
+
+
+def configure_pool(size: int) -> None:
+    """
+    Sets how many idle service clients the shared pool keeps, e.g. to match the number of workers.
+    Takes effect for pools created afterwards.
+    """
+    global _pool_size
+    _pool_size = max(0, size)
+    logging.info(f"Drive client pool size set to {_pool_size}")
+
+
+def get_pool_size() -> int:
+    """
+    Returns the configured pool size.
+    """
+    return _pool_size
+
+
+def share_credentials(credentials: Any) -> Any:
+    """
+    Makes one OAuth credentials object safe to share between threads.
+
+    Every transport refreshes an expired token through credentials.refresh(). Without a lock,
+    all workers that notice the expiry at the same moment refresh at once. Here the first one
+    refreshes while the others wait, then find a new valid token and skip their own refresh.
+
+    Args:
+        credentials: google.oauth2 Credentials (or anything with refresh(), token and valid).
+
+    Returns:
+        The same credentials object.
+    """
+    if getattr(credentials, "_refresh_lock", None) is not None:
+        return credentials
+    refresh = credentials.refresh
+    lock = threading.Lock()
+
+    def locked_refresh(request: Any) -> None:
+        stale_token = credentials.token
+        with lock:
+            # Another thread refreshed while this one was waiting
+            if credentials.token != stale_token and credentials.valid:
+                return
+            refresh(request)
+            logging.info("Refreshed the shared access token")
+
+    credentials._refresh_lock = lock
+    credentials.refresh = locked_refresh
+    return credentials
+
+
+class ServicePool:
+    """
+    Thread-safe pool of Drive service clients, each with its own HTTP transport.
+
+    A client is used by one thread at a time: acquire() hands out an idle client, or builds
+    a new one when none is idle, and release() returns it for the next worker. Returned
+    clients keep their keep-alive connections open, so later workers skip the TLS handshake.
+    acquire() never blocks; size only caps how many idle clients are kept.
+
+    The pool is callable, so it can be passed anywhere a service_factory is expected.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = DEFAULT_POOL_SIZE):
+        self.factory = factory
+        self.size = max(0, size)
+        self.built = 0
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Any:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        service = self.factory()
+        if service is not None:
+            with self._lock:
+                self.built += 1
+        return service
+
+    def release(self, service: Any) -> None:
+        if service is None:
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(service)
+
+    def __call__(self) -> Any:
+        return self.acquire()
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """
+        Holds a client for the duration of a with block.
+        """
+        service = self.acquire()
+        try:
+            yield service
+        finally:
+            self.release(service)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+
+class ThreadServices:
+    """
+    Gives every worker thread a service client of its own, built on first use from service_factory.
+
+    The httplib2 transport behind a service is not thread-safe, so clients are never shared
+    between threads. When the factory is a ServicePool (or anything with a release method),
+    close() hands every client back to it once the workers are done.
+    """
+
+    def __init__(self, service_factory: Callable[[], Any]):
+        self.service_factory = service_factory
+        self._local = threading.local()
+        self._services: List[Any] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+            with self._lock:
+                self._services.append(service)
+        return service
+
+    def close(self) -> None:
+        """
+        Returns every client to the factory's pool. Call it only after the workers have stopped.
+        """
+        release: Optional[Callable[[Any], None]] = getattr(self.service_factory, "release", None)
+        with self._lock:
+            services, self._services = self._services, []
+            # Threads must not keep using clients that now belong to the pool
+            self._local = threading.local()
+        if release is not None:
+            for service in services:
+                release(service)
+            logging.debug(f"Returned {len(services)} service clients to the pool")
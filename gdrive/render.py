@@ -0,0 +1,88 @@
+from typing import List, Optional, TextIO, TYPE_CHECKING
+import sys
+
+if TYPE_CHECKING:
+    from gdrive.tree import DriveTree, DriveNode
+
+# Rendered lines are written to the output in chunks of this many lines
+BUFFER_LINES = 1000
+
+INDENT = "    "
+
+
+class TreeRenderer:
+    """
+    Renders a crawled DriveTree as an indented text tree, files before subfolders, each in
+    the order they were listed.
+
+    Rendering is separate from crawling: the renderer only reads the finished tree, and lines
+    are collected in a buffer and written in chunks instead of one print call per item.
+
+    Args:
+        out (TextIO, optional): Stream to write to. Defaults to sys.stdout at render time.
+        max_depth (int, optional): Deepest level to render below the starting folder; 1 shows its direct children only.
+        folders_only (bool): Leave out file lines.
+        quiet (bool): Render nothing, for summary-only reports.
+        hyperlinks (bool): Link files to their webViewLink with OSC-8 terminal escapes, or print the URL as plain text.
+        buffer_lines (int): Number of lines collected before they are written out.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None, max_depth: Optional[int] = None, folders_only: bool = False,
+                 quiet: bool = False, hyperlinks: bool = True, buffer_lines: int = BUFFER_LINES):
+        self.out = out
+        self.max_depth = max_depth
+        self.folders_only = folders_only
+        self.quiet = quiet
+        self.hyperlinks = hyperlinks
+        self.buffer_lines = max(1, buffer_lines)
+        self._buffer: List[str] = []
+
+    def _write(self, line: str) -> None:
+        self._buffer.append(line)
+        if len(self._buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            out = self.out or sys.stdout
+            out.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+
+    def folder_line(self, folder: "DriveNode", level: int) -> str:
+        return INDENT * level + f"📂 {folder.name} (ID: {folder.id}, Folders: {folder.folder_count}, Files: {folder.file_count})"
+
+    def file_line(self, file: "DriveNode", level: int) -> str:
+        file_url = file.web_view_link or "No URL available"
+        if self.hyperlinks:
+            return INDENT * level + f"📄 {file.name} (ID: {file.id}) - \033]8;;{file_url}\033\\webViewLink\033]8;;\033\\"
+        return INDENT * level + f"📄 {file.name} (ID: {file.id}) - {file_url}"
+
+    def render(self, tree: "DriveTree", folder_id: Optional[str] = None, level: int = 0) -> None:
+        """
+        Renders a folder and everything beneath it.
+
+        Args:
+            tree (DriveTree): The crawled tree.
+            folder_id (str, optional): The ID of the folder to render. Defaults to the root.
+            level (int): Indentation level of the starting folder.
+        """
+        if self.quiet:
+            return
+
+        # Folders still to render, with their depth below the starting folder; subfolders are
+        # pushed in reverse so they are rendered in listing order
+        stack = [(folder_id or tree.root_id, 0)]
+        while stack:
+            current_id, depth = stack.pop()
+            self._write(self.folder_line(tree.nodes[current_id], level + depth))
+
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+            children = tree.children(current_id)
+            if not self.folders_only:
+                for child in children:
+                    if not child.is_folder:
+                        self._write(self.file_line(child, level + depth + 1))
+            stack.extend((child.id, depth + 1) for child in reversed(children) if child.is_folder)
+
+        self.flush()
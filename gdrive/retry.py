@@ -0,0 +1,168 @@
+from googleapiclient.errors import HttpError
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+import json
+import random
+import threading
+import time
+import logging
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Error reasons the Drive API returns (usually with a 403) when a rate limit is hit
+RATE_LIMIT_REASONS = {"userRateLimitExceeded", "rateLimitExceeded"}
+
+# Default request rate shared by every worker in the process, sized to the per-user Drive quota
+DEFAULT_QPS = 20.0
+
+# Upper bound on a single backoff delay when the server gives no hint
+MAX_BACKOFF_SECONDS = 16.0
+
+
+def error_reasons(error: HttpError) -> set:
+    """
+    Returns the reason codes listed in a Drive API error response, e.g. {"userRateLimitExceeded"}.
+    """
+    try:
+        content = error.content.decode("utf-8") if isinstance(error.content, bytes) else error.content
+        details = json.loads(content).get("error", {})
+    except (ValueError, AttributeError):
+        return set()
+    if not isinstance(details, dict):
+        return set()
+    return {item.get("reason") for item in details.get("errors", []) if isinstance(item, dict)}
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Returns True if the error means the per-user or per-project quota was exceeded.
+    """
+    if not isinstance(error, HttpError):
+        return False
+    return error.resp.status == 429 or bool(error_reasons(error) & RATE_LIMIT_REASONS)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Classifies a failure as retryable (rate limits, server errors, dropped connections) or fatal
+    (bad requests, missing files, permission errors).
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUSES or is_rate_limit_error(error)
+    # Network-level failures such as timeouts and reset connections are transient
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Returns the delay requested by the server's Retry-After header, if it sent one.
+    The header holds either a number of seconds or an HTTP date.
+    """
+    if not isinstance(error, HttpError):
+        return None
+    value = error.resp.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(error: Exception, attempt: int) -> float:
+    """
+    Returns how long to wait before retrying: the server's Retry-After hint when present,
+    otherwise 2 ** attempt seconds (capped at MAX_BACKOFF_SECONDS) plus up to 1 second of jitter.
+    """
+    hint = retry_after_seconds(error)
+    if hint is not None:
+        return hint
+    return min(2 ** attempt, MAX_BACKOFF_SECONDS) + random.uniform(0, 1)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the rate of Drive API requests.
+
+    Tokens are added at `rate` per second up to `capacity`. Each request takes one token and waits
+    when the bucket is empty. When the server signals a rate limit, pause() holds back every caller
+    sharing the bucket, so workers back off together instead of burning quota on a retry storm.
+    """
+
+    def __init__(self, rate: float = DEFAULT_QPS, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes tokens from the bucket and returns how many seconds the caller must wait before using them.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Blocks until the requested tokens are available.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given number of seconds.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# Process-wide bucket shared by every thread, worker and backend
+_rate_limiter = TokenBucket()
+
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Returns the process-wide token bucket shared by all Drive requests.
+    """
+    return _rate_limiter
+
+
+def configure_rate_limit(qps: float, burst: Optional[float] = None) -> TokenBucket:
+    """
+    Replaces the process-wide token bucket, e.g. to match a project's per-user QPS quota.
+
+    Args:
+        qps (float): Sustained requests per second.
+        burst (float, optional): Bucket capacity. Defaults to one second of requests.
+
+    Returns:
+        TokenBucket: The new shared bucket.
+    """
+    global _rate_limiter
+    _rate_limiter = TokenBucket(qps, burst)
+    logging.info(f"Drive API rate limit set to {qps} requests/second")
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter: TokenBucket) -> None:
+    """
+    Installs a token bucket as the process-wide one, e.g. to restore the one get_rate_limiter returned earlier.
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
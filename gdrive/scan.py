@@ -0,0 +1,123 @@
+from typing import Dict, List, Any, Optional, Iterator, Iterable, TYPE_CHECKING
+from collections import defaultdict
+from gdrive.utils import execute_with_retry
+from gdrive.tree import DriveTree
+from gdrive.fields import page_fields
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Fields fetched for every item of a flat scan; parents is what the tree is rebuilt from
+SCAN_FIELDS = "files(id, parents, mimeType, name, size)"
+
+
+def scan_drive(service: "Resource", drive_id: Optional[str] = None, fields: str = SCAN_FIELDS,
+               page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Pages through every non-trashed file and folder visible in My Drive, or in a shared drive,
+    with one paginated files.list query instead of one query per folder.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        drive_id (str, optional): ID of the shared drive to scan. Scans the user's corpus when omitted.
+        fields (str): Fields to retrieve for each item. parents and nextPageToken are added if missing.
+        page_size (int): Number of items requested per page (the Drive API maximum is 1000).
+
+    Yields:
+        Dict[str, Any]: File metadata, one item at a time.
+    """
+    fields = page_fields(fields, parents=True)
+
+    params: Dict[str, Any] = {"q": "trashed=false", "fields": fields, "pageSize": page_size}
+    if drive_id:
+        params.update(corpora="drive", driveId=drive_id, supportsAllDrives=True, includeItemsFromAllDrives=True)
+    else:
+        params.update(corpora="user")
+
+    page_token = None
+    pages = 0
+    while True:
+        request = service.files().list(pageToken=page_token, **params)
+        response = execute_with_retry(request)
+        pages += 1
+        yield from response.get("files", [])
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+
+    logging.info(f"Scanned {'shared drive ' + drive_id if drive_id else 'My Drive'} in {pages} pages")
+
+
+def tree_from_items(items: Iterable[Dict[str, Any]], root_id: str, root_name: str = "Root Folder",
+                    listed_as: Optional[str] = None, require_root: bool = True) -> DriveTree:
+    """
+    Rebuilds the subtree under root_id from a flat list of items that carry their parents.
+
+    Items outside the subtree are discarded once the tree has been rebuilt.
+
+    Args:
+        items (Iterable[Dict[str, Any]]): Items from a flat scan, each with a parents field.
+        root_id (str): The ID of the folder whose subtree is rebuilt.
+        root_name (str): Display name of the root folder.
+        listed_as (str, optional): The ID the root's children name as their parent, when root_id
+                                   is an alias such as "root" for My Drive. Defaults to root_id.
+        require_root (bool): Raise when the root is neither an item of the scan nor the parent of one.
+
+    Returns:
+        DriveTree: The rebuilt tree with aggregates computed.
+
+    Raises:
+        ValueError: If require_root is set and the scan never mentions the root, e.g. because the
+                    folder is on a shared drive other than the one scanned.
+    """
+    listed_as = listed_as or root_id
+    children_by_parent: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    root_seen = False
+    for item in items:
+        root_seen = root_seen or item.get("id") == listed_as
+        for parent_id in item.get("parents", []):
+            children_by_parent[parent_id].append(item)
+
+    if require_root and not root_seen and listed_as not in children_by_parent:
+        raise ValueError(f"Folder ID {root_id} was not found in the flat scan. "
+                         f"It may be on a shared drive that was not scanned, or not be accessible.")
+
+    tree = DriveTree(root_id, root_name)
+    tree.expand([root_id], lambda folder_id: children_by_parent.get(listed_as if folder_id == root_id else folder_id, []))
+    tree.compute_aggregates()
+    return tree
+
+
+def scan_tree(service: "Resource", root_id: str, root_name: str = "Root Folder", fields: str = SCAN_FIELDS,
+              drive_id: Optional[str] = None) -> DriveTree:
+    """
+    Builds a DriveTree for a folder from a flat scan of the whole drive. API calls scale with
+    the number of items in the drive / 1000 rather than with the number of folders, which
+    pays off for very large roots.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        root_id (str): The ID of the folder to rebuild.
+        root_name (str): Display name of the root folder.
+        fields (str): Fields to retrieve for each item.
+        drive_id (str, optional): ID of the shared drive that contains the folder. Looked up from
+                                  the folder's metadata when omitted.
+
+    Returns:
+        DriveTree: The rebuilt tree with aggregates computed.
+
+    Raises:
+        ValueError: If the folder does not appear in the scanned drive.
+    """
+    # The folder's metadata gives its real ID, for aliases such as "root", and the shared drive
+    # it is on, whose items a scan of the user's corpus does not return
+    root = execute_with_retry(service.files().get(fileId=root_id, fields="id, driveId", supportsAllDrives=True))
+    drive_id = drive_id or root.get("driveId")
+    listed_as = root.get("id") or root_id
+    # An empty shared drive is never mentioned by its own scan
+    tree = tree_from_items(scan_drive(service, drive_id, fields), root_id, root_name, listed_as,
+                           require_root=listed_as != drive_id)
+    logging.info(f"Rebuilt folder ID {root_id} from a flat scan: {tree.total_items()} items")
+    return tree
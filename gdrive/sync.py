@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional, Callable, Hashable, Tuple, TYPE_CHECKING
+from gdrive.tree import DriveTree, DriveNode, TREE_FIELDS
+from gdrive.batch import execute_batch, MAX_BATCH_SIZE
+from gdrive.traversal import Frontier, traverse
+from gdrive.utils import create_folder_request, copy_file_request, trash_file_request
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+    from googleapiclient.http import HttpRequest
+
+# Fields crawled on both sides of a sync, enough to tell whether a file changed
+SYNC_FIELDS = TREE_FIELDS
+
+# How Google-native files (Docs, Sheets, Slides...), which have no checksum or size, are compared:
+#   "newer"  - copy again when the source was modified after the destination copy
+#   "always" - copy again on every sync
+#   "never"  - keep the destination copy once it exists
+NATIVE_POLICIES = ("newer", "always", "never")
+
+
+def is_google_native(node: DriveNode) -> bool:
+    return not node.is_folder and node.mime_type.startswith("application/vnd.google-apps.")
+
+
+def needs_copy(source: DriveNode, dest: DriveNode, native_policy: str = "newer") -> bool:
+    """
+    Decides whether a destination file is out of date with its source file.
+
+    Binary files are compared by md5Checksum and size. A copy gets a new modifiedTime, so
+    modifiedTime is only used for Google-native files under the "newer" policy.
+    """
+    if source.mime_type != dest.mime_type:
+        return True
+    if is_google_native(source):
+        if native_policy == "always":
+            return True
+        if native_policy == "never":
+            return False
+        return (source.modified_time or "") > (dest.modified_time or "")
+    if source.md5_checksum and dest.md5_checksum and source.md5_checksum != dest.md5_checksum:
+        return True
+    return source.size != dest.size
+
+
+def match_children(source_tree: DriveTree, source_id: str, dest_tree: DriveTree,
+                   dest_id: str) -> List[Tuple[DriveNode, Optional[DriveNode]]]:
+    """
+    Pairs every child of a source folder with the destination child at the same relative path.
+
+    Items are matched by name and by whether they are folders; when a folder holds several items
+    with the same name, they are paired in listing order.
+
+    Returns:
+        List[Tuple[DriveNode, Optional[DriveNode]]]: Each source child with its destination match, or None.
+    """
+    candidates: Dict[Tuple[str, bool], List[DriveNode]] = {}
+    if dest_id in dest_tree.nodes:
+        for node in dest_tree.children(dest_id):
+            candidates.setdefault((node.name, node.is_folder), []).append(node)
+
+    pairs = []
+    for node in source_tree.children(source_id):
+        matches = candidates.get((node.name, node.is_folder))
+        pairs.append((node, matches.pop(0) if matches else None))
+    return pairs
+
+
+def sync_tree_batched(service: "Resource", source_tree: DriveTree, dest_tree: DriveTree,
+                      native_policy: str = "newer",
+                      on_copied: Optional[Callable[[DriveNode], None]] = None,
+                      on_skipped: Optional[Callable[[DriveNode], None]] = None,
+                      on_error: Optional[Callable[[DriveNode, Exception], None]] = None) -> Dict[str, int]:
+    """
+    Copies only the missing or changed items of a source tree into a destination tree.
+
+    Pairs of matching source and destination folders are taken from a Frontier in rounds of up to
+    MAX_BATCH_SIZE, as CopyPipeline creates folders, so memory stays bounded however wide the tree is.
+    Existing destination folders are reused, missing folders are created, unchanged files are skipped,
+    and files that changed are copied again with the outdated destination copy moved to the trash afterwards.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        source_tree (DriveTree): Snapshot of the source folder, crawled with SYNC_FIELDS.
+        dest_tree (DriveTree): Snapshot of the destination folder, crawled with SYNC_FIELDS.
+        native_policy (str): How Google-native files are compared, one of NATIVE_POLICIES.
+        on_copied (Callable, optional): Called with each source node once it has been copied or created.
+        on_skipped (Callable, optional): Called with each source node that was already up to date.
+        on_error (Callable, optional): Called with a source node and the error if copying it failed.
+
+    Returns:
+        Dict[str, int]: Counts of "copied", "replaced", "skipped" and "failed" items.
+    """
+    if native_policy not in NATIVE_POLICIES:
+        raise ValueError(f"Unknown native file policy {native_policy!r}. Choose one of: {', '.join(NATIVE_POLICIES)}")
+
+    stats = {"copied": 0, "replaced": 0, "skipped": 0, "failed": 0}
+
+    def sync_round(folders: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Syncs the children of a round of folder pairs and returns the subfolder pairs to descend into.
+        """
+        requests: Dict[Hashable, "HttpRequest"] = {}
+        outdated: Dict[str, str] = {}  # source ID -> ID of the destination copy it replaces
+        subfolders: List[Tuple[str, str]] = []
+
+        for source_id, dest_id in folders:
+            for node, match in match_children(source_tree, source_id, dest_tree, dest_id):
+                if node.is_folder:
+                    if match is not None:
+                        # Reuse the existing folder and compare its contents in a later round
+                        subfolders.append((node.id, match.id))
+                        stats["skipped"] += 1
+                        if on_skipped is not None:
+                            on_skipped(node)
+                    else:
+                        requests[node.id] = create_folder_request(service, node.to_dict(), dest_id)
+                elif match is None:
+                    requests[node.id] = copy_file_request(service, node.to_dict(), dest_id)
+                elif needs_copy(node, match, native_policy):
+                    requests[node.id] = copy_file_request(service, node.to_dict(), dest_id)
+                    outdated[node.id] = match.id
+                else:
+                    stats["skipped"] += 1
+                    if on_skipped is not None:
+                        on_skipped(node)
+
+        def on_success(key: Hashable, response: Dict[str, str]) -> None:
+            stats["replaced" if key in outdated else "copied"] += 1
+            if on_copied is not None:
+                on_copied(source_tree.nodes[key])
+
+        results, errors = execute_batch(service, requests, on_success=on_success)
+
+        for node_id, error in errors.items():
+            stats["failed"] += 1
+            logging.error(f"An error occurred while syncing {source_tree.nodes[node_id].name}: {error}")
+            if on_error is not None:
+                on_error(source_tree.nodes[node_id], error)
+
+        # Trash the outdated copies only once their replacement exists
+        trash = {dest_id: trash_file_request(service, dest_id) for node_id, dest_id in outdated.items() if node_id in results}
+        _, trash_errors = execute_batch(service, trash)
+        for dest_id, error in trash_errors.items():
+            logging.error(f"Failed to trash the outdated copy {dest_id}: {error}")
+
+        # Descend into the folders created in this round too; everything below them is missing
+        return subfolders + [(node_id, results[node_id]["id"]) for node_id in requests
+                             if source_tree.nodes[node_id].is_folder and node_id in results]
+
+    with Frontier([(source_tree.root_id, dest_tree.root_id)]) as frontier:
+        rounds = traverse(frontier, sync_round, take=lambda frontier, free_slots: frontier.pop_many(MAX_BATCH_SIZE))
+        for _, subfolders in rounds:
+            frontier.extend(subfolders)
+
+    logging.info(f"Synced folder ID {source_tree.root_id} into {dest_tree.root_id}: {stats}")
+    return stats
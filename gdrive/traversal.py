@@ -0,0 +1,213 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, Future
+from typing import Callable, Dict, List, Any, Optional, Iterable, Iterator, Tuple
+from collections import deque
+import json
+import os
+import sqlite3
+import tempfile
+import logging
+
+# Default number of frontier entries kept in memory; beyond it the frontier spills to disk
+DEFAULT_MAX_IN_MEMORY = 100000
+
+# Spilled entries are written to disk in chunks of this many
+SPILL_CHUNK_SIZE = 1000
+
+_max_in_memory = DEFAULT_MAX_IN_MEMORY
+_spill_dir: Optional[str] = None
+
+
+def configure_frontier(max_in_memory: int, spill_dir: Optional[str] = None) -> None:
+    """
+    Sets the memory budget of every traversal frontier created afterwards.
+
+    Args:
+        max_in_memory (int): Entries kept in memory before the frontier spills to disk.
+        spill_dir (str, optional): Directory for spill files. Defaults to the system temp directory.
+    """
+    global _max_in_memory, _spill_dir
+    _max_in_memory = max(1, max_in_memory)
+    _spill_dir = spill_dir
+    logging.info(f"Traversal frontier keeps up to {_max_in_memory} entries in memory")
+
+
+class Frontier:
+    """
+    FIFO queue of pending traversal work, such as folder IDs still to be listed, with bounded memory.
+
+    Up to max_in_memory entries are kept in a deque. Once the frontier grows past that, newer entries
+    are appended to a SQLite file in chunks and read back in order as the in-memory entries run out,
+    so a tree of any width or depth can be traversed with at most max_in_memory + SPILL_CHUNK_SIZE
+    entries in memory. Entries must be strings or tuples of strings. A frontier is used by one thread.
+    """
+
+    def __init__(self, entries: Iterable[Any] = (), max_in_memory: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
+        self.max_in_memory = max(1, max_in_memory if max_in_memory is not None else _max_in_memory)
+        self.spill_dir = spill_dir if spill_dir is not None else _spill_dir
+        self.spill_path: Optional[str] = None
+        self.spilled = 0  # Entries written to disk and not read back yet
+        self._head: deque = deque()  # Oldest entries, in memory
+        self._tail: List[str] = []  # Newest entries, waiting to be written to disk
+        self._conn: Optional[sqlite3.Connection] = None
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._head) + self.spilled + len(self._tail)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def append(self, entry: Any) -> None:
+        # Once anything is on disk, newer entries go behind it to keep the order
+        if not self.spilled and not self._tail and len(self._head) < self.max_in_memory:
+            self._head.append(entry)
+            return
+        self._tail.append(json.dumps(entry))
+        if len(self._tail) >= SPILL_CHUNK_SIZE:
+            self._spill()
+
+    def extend(self, entries: Iterable[Any]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def popleft(self) -> Any:
+        if not self._head:
+            self._refill()
+        return self._head.popleft()
+
+    def pop_many(self, limit: int) -> List[Any]:
+        """
+        Removes and returns up to limit entries from the front, e.g. the next round of folders to copy.
+        """
+        entries = []
+        while self and len(entries) < limit:
+            entries.append(self.popleft())
+        return entries
+
+    def peek(self) -> Any:
+        """
+        Returns the next entry without removing it.
+        """
+        if not self._head:
+            self._refill()
+        return self._head[0]
+
+    def _spill(self) -> None:
+        """
+        Writes the buffered newest entries to the spill file.
+        """
+        if self._conn is None:
+            fd, self.spill_path = tempfile.mkstemp(prefix="gdrive-frontier-", suffix=".sqlite3", dir=self.spill_dir)
+            os.close(fd)
+            self._conn = sqlite3.connect(self.spill_path)
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS frontier (seq INTEGER PRIMARY KEY AUTOINCREMENT, entry TEXT NOT NULL)")
+            logging.info(f"Traversal frontier passed {self.max_in_memory} entries, spilling to {self.spill_path}")
+        self._conn.executemany("INSERT INTO frontier (entry) VALUES (?)", ((entry,) for entry in self._tail))
+        self.spilled += len(self._tail)
+        self._tail = []
+
+    def _refill(self) -> None:
+        """
+        Moves the oldest spilled entries back into memory, or the buffered ones when nothing is on disk.
+        """
+        if self.spilled:
+            rows = self._conn.execute("SELECT seq, entry FROM frontier ORDER BY seq LIMIT ?", (self.max_in_memory,)).fetchall()
+            self._conn.execute("DELETE FROM frontier WHERE seq <= ?", (rows[-1][0],))
+            self.spilled -= len(rows)
+            encoded = [entry for _, entry in rows]
+        else:
+            encoded, self._tail = self._tail[:self.max_in_memory], self._tail[self.max_in_memory:]
+        if not encoded:
+            raise IndexError("pop from an empty frontier")
+        self._head.extend(self._decode(entry) for entry in encoded)
+
+    @staticmethod
+    def _decode(entry: str) -> Any:
+        value = json.loads(entry)
+        return tuple(value) if isinstance(value, list) else value
+
+    def close(self) -> None:
+        """
+        Deletes the spill file, if any.
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+    def __enter__(self) -> "Frontier":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def traverse(frontier: Frontier, work: Callable[[Any], Any], workers: int = 0,
+             take: Optional[Callable[[Frontier, int], Any]] = None,
+             thread_name_prefix: str = "drive-traversal", ordered: bool = False) -> Iterator[Tuple[Any, Any]]:
+    """
+    Runs work on every task of a frontier and yields (task, result) pairs as the tasks finish,
+    or with ordered=True in the order the tasks were taken from the frontier.
+
+    This is the loop every tree traversal shares: the caller handles each result on its own thread
+    and appends follow-up tasks, e.g. the subfolders it found, to the same frontier. Nothing is
+    recursive, so depth is unlimited, and the frontier bounds memory however wide the tree is.
+
+    Args:
+        frontier (Frontier): Pending tasks; the traversal ends when it is empty and nothing is running.
+        work (Callable): Runs one task, e.g. lists a folder.
+        workers (int): Number of worker threads, each with up to two tasks queued. 0 runs every task
+                       on the calling thread.
+        take (Callable, optional): Takes the next task from the frontier, given how many tasks could
+                                   still be started; e.g. several folders for one coalesced query.
+                                   Defaults to frontier.popleft().
+        thread_name_prefix (str): Names the worker threads.
+        ordered (bool): Yield results in task order, so a caller that appends follow-up tasks
+                        visits the tree in the same order however long each task takes.
+
+    Yields:
+        Tuple[Any, Any]: A task and the result of work for it.
+    """
+    def next_task(free_slots: int) -> Any:
+        return take(frontier, free_slots) if take is not None else frontier.popleft()
+
+    if workers <= 0:
+        while frontier:
+            task = next_task(1)
+            yield task, work(task)
+        return
+
+    max_in_flight = workers * 2
+    in_flight: Dict[Future, Any] = {}
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+    try:
+        while frontier or in_flight:
+            # Keep every worker busy, with a small backlog so no worker idles between tasks
+            while frontier and len(in_flight) < max_in_flight:
+                task = next_task(max_in_flight - len(in_flight))
+                in_flight[executor.submit(work, task)] = task
+
+            if ordered:
+                # In-flight tasks are kept in the order they were submitted
+                future = next(iter(in_flight))
+                task = in_flight.pop(future)
+                yield task, future.result()
+                continue
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future.result()
+    finally:
+        # Stop working when the caller stops consuming, e.g. at the first difference
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,322 @@
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Callable, Sequence, TYPE_CHECKING
+from gdrive import utils
+from gdrive.fields import TREE_FIELDS
+from gdrive.traversal import Frontier, traverse
+import logging
+import sys
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+# Shared by every file node: only folders get a list of their own
+NO_CHILDREN: Sequence[str] = ()
+
+
+class DriveNode:
+    """
+    A single file or folder in a DriveTree snapshot.
+
+    Folders keep the IDs of their direct children along with per-folder aggregates:
+    direct file/folder counts and recursive totals for the whole subtree.
+
+    Nodes use __slots__ and an interned mime_type, so each distinct MIME type is stored once
+    however many items have it; a crawl of a million items keeps a million of these.
+    """
+
+    __slots__ = ("id", "name", "mime_type", "parent_id", "size", "modified_time", "web_view_link",
+                 "md5_checksum", "quota_bytes_used", "children", "file_count", "folder_count",
+                 "total_files", "total_folders")
+
+    def __init__(self, id: str, name: str, mime_type: str, parent_id: Optional[str] = None,
+                 size: Optional[str] = None, modified_time: Optional[str] = None,
+                 web_view_link: Optional[str] = None, md5_checksum: Optional[str] = None,
+                 quota_bytes_used: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.mime_type = sys.intern(mime_type)
+        self.parent_id = parent_id
+        self.size = size
+        self.modified_time = modified_time
+        self.web_view_link = web_view_link
+        self.md5_checksum = md5_checksum
+        self.quota_bytes_used = quota_bytes_used
+        self.children: Sequence[str] = [] if self.mime_type == FOLDER_MIME_TYPE else NO_CHILDREN
+        self.file_count = 0
+        self.folder_count = 0
+        self.total_files = 0
+        self.total_folders = 0
+
+    @property
+    def is_folder(self) -> bool:
+        return self.mime_type == FOLDER_MIME_TYPE
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the node as a Drive API style metadata dictionary, so it can be passed to the
+        helpers in gdrive.utils that expect raw API items.
+        """
+        item = {"id": self.id, "name": self.name, "mimeType": self.mime_type}
+        if self.size is not None:
+            item["size"] = self.size
+        if self.modified_time is not None:
+            item["modifiedTime"] = self.modified_time
+        if self.web_view_link is not None:
+            item["webViewLink"] = self.web_view_link
+        if self.md5_checksum is not None:
+            item["md5Checksum"] = self.md5_checksum
+        if self.quota_bytes_used is not None:
+            item["quotaBytesUsed"] = self.quota_bytes_used
+        return item
+
+
+class DriveTree:
+    """
+    In-memory snapshot of a Google Drive folder tree, built with a single crawl.
+
+    Nodes are stored in an id -> node map and each folder keeps a list of its children,
+    so counting, copying and comparing a tree can all read from the same snapshot instead
+    of listing every folder again.
+    """
+
+    def __init__(self, root_id: str, root_name: str = "Root Folder"):
+        self.root_id = root_id
+        self.nodes: Dict[str, DriveNode] = {root_id: DriveNode(root_id, root_name, FOLDER_MIME_TYPE)}
+
+    @property
+    def root(self) -> DriveNode:
+        return self.nodes[self.root_id]
+
+    def add_item(self, item: Dict[str, Any], parent_id: str) -> DriveNode:
+        """
+        Adds a Drive API item to the tree as a child of the given folder.
+
+        Args:
+            item (Dict[str, Any]): File metadata as returned by files.list.
+            parent_id (str): The ID of the folder the item was listed in.
+
+        Returns:
+            DriveNode: The node created for the item.
+        """
+        node = DriveNode(
+            item["id"],
+            item.get("name", ""),
+            item["mimeType"],
+            parent_id,
+            item.get("size"),
+            item.get("modifiedTime"),
+            item.get("webViewLink"),
+            item.get("md5Checksum"),
+            item.get("quotaBytesUsed"),
+        )
+        self.nodes[node.id] = node
+        self._children_list(parent_id).append(node.id)
+        return node
+
+    def _children_list(self, folder_id: str) -> List[str]:
+        """
+        Returns the mutable children list of a node, giving it one if it still shares NO_CHILDREN.
+        """
+        node = self.nodes[folder_id]
+        if not isinstance(node.children, list):
+            node.children = []
+        return node.children
+
+    def _propagate(self, folder_id: Optional[str], files: int, folders: int) -> None:
+        """
+        Adds file/folder deltas to the recursive totals of a folder and all of its ancestors.
+        """
+        while folder_id is not None:
+            folder = self.nodes[folder_id]
+            folder.total_files += files
+            folder.total_folders += folders
+            folder_id = folder.parent_id
+
+    def insert_item(self, item: Dict[str, Any], parent_id: str) -> DriveNode:
+        """
+        Adds a Drive API item to an already aggregated tree, updating the counts of its ancestors
+        incrementally instead of recomputing the whole tree.
+        """
+        node = self.add_item(item, parent_id)
+        parent = self.nodes[parent_id]
+        if node.is_folder:
+            parent.folder_count += 1
+            self._propagate(parent_id, 0, 1)
+        else:
+            parent.file_count += 1
+            self._propagate(parent_id, 1, 0)
+        return node
+
+    def _detach(self, node_id: str) -> DriveNode:
+        """
+        Unlinks a node (and with it its subtree) from its parent, updating the ancestors' counts.
+        """
+        node = self.nodes[node_id]
+        parent = self.nodes[node.parent_id]
+        self._children_list(parent.id).remove(node_id)
+        if node.is_folder:
+            parent.folder_count -= 1
+            self._propagate(parent.id, -node.total_files, -(node.total_folders + 1))
+        else:
+            parent.file_count -= 1
+            self._propagate(parent.id, -1, 0)
+        return node
+
+    def remove_subtree(self, node_id: str) -> None:
+        """
+        Removes a file, or a folder and everything beneath it, updating the ancestors' counts.
+        """
+        self._detach(node_id)
+        for descendant in list(self.walk(node_id)):
+            del self.nodes[descendant.id]
+        del self.nodes[node_id]
+
+    def move_node(self, node_id: str, new_parent_id: str) -> None:
+        """
+        Moves a file or folder (with its subtree) under another folder of the tree, updating the counts
+        of both the old and the new ancestors.
+        """
+        node = self._detach(node_id)
+        node.parent_id = new_parent_id
+        new_parent = self.nodes[new_parent_id]
+        self._children_list(new_parent_id).append(node_id)
+        if node.is_folder:
+            new_parent.folder_count += 1
+            self._propagate(new_parent_id, node.total_files, node.total_folders + 1)
+        else:
+            new_parent.file_count += 1
+            self._propagate(new_parent_id, 1, 0)
+
+    def expand(self, folder_ids: Iterable[str], list_folder: Callable[[str], Iterable[Dict[str, Any]]],
+               incremental: bool = False) -> None:
+        """
+        Lists folders of the tree breadth-first, along with every subfolder found on the way, and adds
+        their contents. Folders waiting to be listed are kept in a Frontier, so neither the depth nor
+        the width of the tree is limited by the call stack or by memory.
+
+        Args:
+            folder_ids (Iterable[str]): The folders to start from.
+            list_folder (Callable): Returns the items directly inside a folder, as files.list items.
+            incremental (bool): Update the ancestors' counts as each item is added (see insert_item),
+                                for a tree whose aggregates are already computed.
+        """
+        add = self.insert_item if incremental else self.add_item
+        with Frontier(folder_ids) as frontier:
+            for folder_id, items in traverse(frontier, list_folder):
+                for item in items:
+                    # Skip items already seen through another parent so each item is counted once
+                    if item["id"] in self.nodes:
+                        continue
+                    node = add(item, folder_id)
+                    if node.is_folder:
+                        frontier.append(node.id)
+
+    def is_ancestor(self, ancestor_id: str, node_id: str) -> bool:
+        """
+        Returns True if ancestor_id is node_id itself or one of its ancestors.
+        """
+        current: Optional[str] = node_id
+        while current is not None:
+            if current == ancestor_id:
+                return True
+            current = self.nodes[current].parent_id
+        return False
+
+    def children(self, folder_id: str) -> List[DriveNode]:
+        """
+        Returns the direct children of a folder in the order they were listed.
+        """
+        return [self.nodes[child_id] for child_id in self.nodes[folder_id].children]
+
+    def folder_contents(self, folder_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns the direct children of a folder as metadata dictionaries, matching the
+        output of gdrive.utils.get_folder_contents.
+        """
+        return [child.to_dict() for child in self.children(folder_id)]
+
+    def walk(self, folder_id: Optional[str] = None) -> Iterator[DriveNode]:
+        """
+        Yields every node below a folder (excluding the folder itself) in pre-order.
+        """
+        stack = list(reversed(self.nodes[folder_id or self.root_id].children))
+        while stack:
+            node = self.nodes[stack.pop()]
+            yield node
+            stack.extend(reversed(node.children))
+
+    def compute_aggregates(self) -> None:
+        """
+        Computes the direct and recursive file/folder counts of every folder bottom-up.
+        """
+        # Visit folders in pre-order, then fold counts into parents in reverse so that
+        # every subtree is complete before its parent is updated
+        folders = [self.root] + [node for node in self.walk() if node.is_folder]
+        for folder in folders:
+            folder.file_count = folder.folder_count = 0
+            for child in self.children(folder.id):
+                if child.is_folder:
+                    folder.folder_count += 1
+                else:
+                    folder.file_count += 1
+            folder.total_files = folder.file_count
+            folder.total_folders = folder.folder_count
+
+        for folder in reversed(folders):
+            if folder.parent_id is not None:
+                parent = self.nodes[folder.parent_id]
+                parent.total_files += folder.total_files
+                parent.total_folders += folder.total_folders
+
+    def total_items(self, folder_id: Optional[str] = None) -> int:
+        """
+        Returns the total number of files and folders below a folder (excluding the folder itself).
+        """
+        node = self.nodes[folder_id or self.root_id]
+        return node.total_files + node.total_folders
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the tree as a JSON-serializable dictionary that from_snapshot can rebuild it from.
+        """
+        return {
+            "root_id": self.root_id,
+            "root_name": self.root.name,
+            # Pre-order, so every parent is listed before its children
+            "nodes": [dict(node.to_dict(), parent=node.parent_id) for node in self.walk()],
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "DriveTree":
+        """
+        Rebuilds a tree saved with to_snapshot, with aggregates computed.
+        """
+        tree = cls(snapshot["root_id"], snapshot["root_name"])
+        for item in snapshot["nodes"]:
+            tree.add_item(item, item["parent"])
+        tree.compute_aggregates()
+        return tree
+
+    @classmethod
+    def build(cls, service: "Resource", root_id: str, root_name: str = "Root Folder",
+              fields: str = TREE_FIELDS, use_cache: bool = True) -> "DriveTree":
+        """
+        Crawls a folder once, breadth-first, and returns a snapshot of everything beneath it.
+
+        Args:
+            service (Resource): Google Drive API service instance.
+            root_id (str): The ID of the folder to crawl.
+            root_name (str): Display name of the root folder.
+            fields (str): Fields to retrieve for each item.
+            use_cache (bool): Use the metadata cache; see gdrive.utils.list_drive_files.
+
+        Returns:
+            DriveTree: The populated tree with aggregates computed.
+        """
+        tree = cls(root_id, root_name)
+        tree.expand([root_id], lambda folder_id: utils.list_drive_files(
+            service, folder_id, fields, modified_time=tree.nodes[folder_id].modified_time, use_cache=use_cache))
+        tree.compute_aggregates()
+        logging.info(f"Built tree for folder ID {root_id} with {tree.total_items()} items")
+        return tree
@@ -0,0 +1,110 @@
+from typing import Dict, List, Tuple
+from gdrive.tree import DriveTree, DriveNode
+import heapq
+
+# Fields crawled for storage reports; size is missing for Google-native files, quotaBytesUsed covers them
+STORAGE_FIELDS = "files(id, name, mimeType, size, quotaBytesUsed)"
+
+# Number of heaviest folders and files reported by default
+DEFAULT_TOP_N = 10
+
+
+def item_bytes(node: DriveNode) -> int:
+    """
+    Returns the bytes an item takes up: its size, or the quota it uses when it has no size.
+    """
+    if node.size is not None:
+        return int(node.size)
+    return int(node.quota_bytes_used or 0)
+
+
+class StorageUsage:
+    """
+    Byte totals of a crawled tree.
+
+    Attributes:
+        folder_bytes (Dict[str, int]): Recursive byte total of every folder, by folder ID.
+        folder_files (Dict[str, int]): Recursive file count of every folder, by folder ID.
+        top_folders (List[Tuple[int, DriveNode]]): The heaviest folders, largest first.
+        top_files (List[Tuple[int, DriveNode]]): The largest files, largest first.
+        by_mime_type (Dict[str, List[int]]): [file count, bytes] per mimeType.
+    """
+
+    def __init__(self, root_id: str):
+        self.root_id = root_id
+        self.folder_bytes: Dict[str, int] = {}
+        self.folder_files: Dict[str, int] = {}
+        self.top_folders: List[Tuple[int, DriveNode]] = []
+        self.top_files: List[Tuple[int, DriveNode]] = []
+        self.by_mime_type: Dict[str, List[int]] = {}
+
+    @property
+    def total_bytes(self) -> int:
+        return self.folder_bytes[self.root_id]
+
+
+def _push_bounded(heap: List[Tuple[int, str, DriveNode]], entry: Tuple[int, str, DriveNode], n: int) -> None:
+    """
+    Keeps the n largest entries seen so far in a min-heap.
+    """
+    if n <= 0:
+        return
+    if len(heap) < n:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+
+def compute_storage_usage(tree: DriveTree, top_n: int = DEFAULT_TOP_N) -> StorageUsage:
+    """
+    Computes recursive byte totals and file counts for every folder, the top-N heaviest folders
+    and files, and a breakdown by mimeType, in one bottom-up pass over the tree without any API calls.
+
+    The tree is visited in reverse pre-order, so every folder's descendants are counted before the
+    folder itself; the top-N lists are kept in heaps of at most top_n entries.
+
+    Args:
+        tree (DriveTree): A tree crawled with STORAGE_FIELDS (or at least size).
+        top_n (int): Number of folders and files to rank.
+
+    Returns:
+        StorageUsage: The totals and rankings.
+    """
+    usage = StorageUsage(tree.root_id)
+    folder_heap: List[Tuple[int, str, DriveNode]] = []
+    file_heap: List[Tuple[int, str, DriveNode]] = []
+    usage.folder_bytes[tree.root_id] = 0
+    usage.folder_files[tree.root_id] = 0
+
+    for node in reversed(list(tree.walk())):
+        if node.is_folder:
+            # Every descendant has been visited, so the folder's totals are final
+            size = usage.folder_bytes.setdefault(node.id, 0)
+            files = usage.folder_files.setdefault(node.id, 0)
+            _push_bounded(folder_heap, (size, node.id, node), top_n)
+        else:
+            size = item_bytes(node)
+            files = 1
+            _push_bounded(file_heap, (size, node.id, node), top_n)
+            counts = usage.by_mime_type.setdefault(node.mime_type, [0, 0])
+            counts[0] += 1
+            counts[1] += size
+
+        usage.folder_bytes[node.parent_id] = usage.folder_bytes.get(node.parent_id, 0) + size
+        usage.folder_files[node.parent_id] = usage.folder_files.get(node.parent_id, 0) + files
+
+    usage.top_folders = [(size, node) for size, _, node in sorted(folder_heap, reverse=True)]
+    usage.top_files = [(size, node) for size, _, node in sorted(file_heap, reverse=True)]
+    return usage
+
+
+def format_bytes(size: int) -> str:
+    """
+    Formats a byte count with a binary unit, e.g. 1536 -> "1.5 KiB".
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
@@ -1,27 +1,55 @@
-from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
-from typing import Tuple, Callable, List, Dict, Any
+from typing import Tuple, Callable, List, Dict, Any, Iterator, Optional, TYPE_CHECKING
 from colorama import Fore, Style
+from gdrive.cache import get_metadata_cache
+from gdrive.retry import is_retryable_error, is_rate_limit_error, backoff_delay, get_rate_limiter
+from gdrive.metrics import get_metrics, request_method
+from gdrive.fields import page_fields, COUNT_FIELDS, COUNT_TREE_FIELDS, COMPARE_FIELDS, RENDER_FIELDS
 import time
-import random
 from functools import wraps
 import logging
 
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+    from googleapiclient.http import HttpRequest
+    from gdrive.tree import DriveTree
+    from gdrive.render import TreeRenderer
+
+# Upper bound on the length of a coalesced "in parents" query, kept well below the request URL limit
+MAX_QUERY_LENGTH = 4000
+
+# Order of every folder listing: folders first, then by name. Without it the API returns children in
+# an unspecified order that differs between a single-folder listing and a combined parents query.
+LISTING_ORDER = "folder,name"
+
+LOG_FILE = "gdrive_log.log"
+
+def configure_logging(log_file: str = LOG_FILE) -> None:
+    """
+    Sends log records to the log file. Entry points call this once at startup,
+    so importing the package has no side effects.
+    """
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.FileHandler(log_file)])
+
 def exponential_backoff_retry(retries: int = 5) -> Callable[..., Any]:
     """
-    Decorator that applies exponential backoff retries to a function in case of an error.
+    Decorator that applies a quota-aware retry policy to a function that calls the Drive API.
     
-    The wrapped function will attempt to execute, and if it raises an exception, 
-    it will retry after a delay that increases exponentially with each attempt.
-    2 ** attempt plus a random jitter of up to 1 second.
-    Spreading out requests over time to avoid overwhelming the server.
+    Every attempt first takes a token from the process-wide token bucket (see gdrive.retry),
+    so all threads together stay within the per-user QPS quota.
+    Failures are classified before retrying: rate limits (429, userRateLimitExceeded,
+    rateLimitExceeded), server errors (5xx) and dropped connections are retried, while
+    anything else (404s, bad folder IDs, permission errors) is raised immediately.
+    The delay honors the server's Retry-After header; without one it is 2 ** attempt seconds,
+    capped at 16, plus a random jitter of up to 1 second.
     Jitter introduces randomness, staggering retry times slightly to prevent retry collision,
     so clients are less likely to all hit the server simultaneously.
-    This continues until the function succeeds or the maximum number of retries is reached.
-    min: 1, max 17
+    A rate-limit response also pauses the shared token bucket, so every worker backs off together.
     Args:
-        retries (int): The maximum number of retry attempts before raising an exception. 
-                       Defaults to 5 retries.
+        retries (int): The maximum number of attempts before the last error is re-raised. 
+                       Defaults to 5 attempts.
     Returns:
         Callable[..., Any]: A wrapped function that includes the retry logic.
     """
@@ -29,15 +57,23 @@ def exponential_backoff_retry(retries: int = 5) -> Callable[..., Any]:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             attempt = 0
-            while attempt < retries:
+            while True:
+                get_rate_limiter().acquire()
                 try:
                     # Try executing the function
                     return func(*args, **kwargs)
                 except Exception as e:
-                    logging.error(f"Error executing {func.__name__}: {e}. Retrying in {2 ** attempt} seconds...")
-                    time.sleep(2 ** attempt + random.uniform(0, 1))  # Exponential backoff with jitter
+                    if not is_retryable_error(e) or attempt + 1 >= retries:
+                        # Re-raise the original error so callers can still handle HttpError
+                        logging.error(f"Failed to execute {func.__name__} after {attempt + 1} attempt(s): {e}")
+                        raise
+                    delay = backoff_delay(e, attempt)
+                    if is_rate_limit_error(e):
+                        get_rate_limiter().pause(delay)
+                    get_metrics().record_retry(request_method(args[0]) if args else func.__name__)
+                    logging.error(f"Error executing {func.__name__}: {e}. Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
                     attempt += 1
-            raise Exception(f"Failed to execute {func.__name__} after {retries} retries")
         return wrapper
     return decorator
 
@@ -46,36 +82,192 @@ def execute_with_retry(request):
     """
     Helper function to execute a Google Drive API request with retry logic.
     Applies retries only to the execute() calls to ensure that only the API call itself is retried.
+    Each attempt is recorded in the API metrics (see gdrive.metrics).
     """
-    return request.execute()
+    metrics = get_metrics()
+    method = request_method(request)
+    metrics.instrument(request)
+    start = time.perf_counter()
+    try:
+        response = request.execute()
+    except Exception as e:
+        metrics.record_call(method, time.perf_counter() - start, error=e)
+        raise
+    metrics.record_call(method, time.perf_counter() - start)
+    return response
 
-def list_drive_files(service: Resource, folder_id: str, fields: str) -> List[Dict[str, Any]]:
+def list_drive_files(service: "Resource", folder_id: str, fields: str, page_size: int = 1000,
+                     modified_time: Optional[str] = None, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
     """
-    Helper function to query Google Drive API for files and folders in a specific folder.
+    Helper function to query Google Drive API for files and folders in a specific folder,
+    folders first and then by name (see LISTING_ORDER).
+    Follows nextPageToken so that folders larger than a single page are listed completely,
+    and yields items as each page arrives instead of building the full list in memory.
+
+    When a metadata cache is enabled (see gdrive.cache), a fresh cached listing is returned
+    without calling the API, and a complete listing fetched from the API is stored in it.
+    A folder that is being written to, such as a copy destination, is listed with use_cache=False:
+    its cached listing may be stale even when the folder's modifiedTime is unchanged.
     
     Args:
         service (Resource): Google Drive API service instance.
         folder_id (str): ID of the folder to query.
-        fields (str): Fields to retrieve for each file.
+        fields (str): Fields to retrieve for each file. nextPageToken is added if missing.
+        page_size (int): Number of items requested per page (the Drive API maximum is 1000).
+        modified_time (str, optional): The folder's current modifiedTime, used to tell whether a cached listing is stale.
+        use_cache (bool): Read and store the listing in the metadata cache. With False the listing always
+                          comes from the API and any cached listing of the folder is dropped.
         
-    Returns:
-        List[Dict[str, Any]]: List of file metadata.
+    Yields:
+        Dict[str, Any]: File metadata, one item at a time.
     """
+    cache = get_metadata_cache()
+    if cache is not None and not use_cache:
+        cache.invalidate(folder_id)
+        cache = None
+    if cache is not None:
+        cached = cache.get(folder_id, fields, modified_time)
+        if cached is not None:
+            yield from cached
+            return
+        listed: List[Dict[str, Any]] = []
+
     query = f"'{folder_id}' in parents and trashed=false"
-    request = service.files().list(q=query, fields=fields)
-    response = execute_with_retry(request)
-    return response.get("files", [])
+    # Pagination only works if the response includes the token for the next page
+    list_fields = page_fields(fields)
+
+    page_token = None
+    while True:
+        request = service.files().list(q=query, fields=list_fields, pageSize=page_size, pageToken=page_token,
+                                       orderBy=LISTING_ORDER)
+        response = execute_with_retry(request)
+        files = response.get("files", [])
+        if cache is not None:
+            listed.extend(files)
+        yield from files
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+
+    # Only a complete listing is cached
+    if cache is not None:
+        cache.put(folder_id, fields, listed, modified_time)
+
+def build_parents_query(folder_ids: List[str]) -> str:
+    """
+    Builds a files.list query matching the non-trashed children of any of the given folders.
+    """
+    parents = " or ".join(f"'{folder_id}' in parents" for folder_id in folder_ids)
+    return f"({parents}) and trashed=false" if len(folder_ids) > 1 else f"{parents} and trashed=false"
 
-def count_children_recursively(service: Resource, folder_id: str, folder_name: str, level: int = 0) -> Tuple[int, int]:
+def coalesce_folder_ids(folder_ids: List[str], max_query_length: int = MAX_QUERY_LENGTH) -> List[List[str]]:
+    """
+    Splits folder IDs into groups whose combined parents query stays within max_query_length characters.
+    """
+    groups: List[List[str]] = []
+    group: List[str] = []
+    for folder_id in folder_ids:
+        if group and len(build_parents_query(group + [folder_id])) > max_query_length:
+            groups.append(group)
+            group = []
+        group.append(folder_id)
+    if group:
+        groups.append(group)
+    return groups
+
+def list_drive_files_in_folders(service: "Resource", folder_ids: List[str], fields: str, page_size: int = 1000,
+                                modified_times: Optional[Dict[str, Optional[str]]] = None,
+                                use_cache: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Lists the children of several folders with a single paginated query of the form
+    "'a' in parents or 'b' in parents ...", splitting the results back out per folder.
+    This collapses many list calls for small folders into one. Each folder's children come back
+    in LISTING_ORDER, the same order list_drive_files returns them in.
+
+    When a metadata cache is enabled, folders with a fresh cached listing are answered from
+    it and only the remaining folders are queried; their listings are then cached per folder.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        folder_ids (List[str]): IDs of the folders to query. The caller keeps the query within
+                                the length limit, see coalesce_folder_ids.
+        fields (str): Fields to retrieve for each file. parents and nextPageToken are added if missing.
+        page_size (int): Number of items requested per page (the Drive API maximum is 1000).
+        modified_times (Dict[str, str], optional): Each folder's current modifiedTime, used to tell whether a cached listing is stale.
+        use_cache (bool): Use the metadata cache; see list_drive_files.
+
+    Yields:
+        Tuple[str, Dict[str, Any]]: The ID of the queried folder the item belongs to, and the file metadata.
+    """
+    modified_times = modified_times or {}
+    cache = get_metadata_cache()
+    if cache is not None and not use_cache:
+        for folder_id in folder_ids:
+            cache.invalidate(folder_id)
+        cache = None
+    if cache is not None:
+        uncached = []
+        for folder_id in folder_ids:
+            cached = cache.get(folder_id, fields, modified_times.get(folder_id))
+            if cached is None:
+                uncached.append(folder_id)
+                continue
+            for file in cached:
+                yield folder_id, file
+        folder_ids = uncached
+        if not folder_ids:
+            return
+        listed: Dict[str, List[Dict[str, Any]]] = {folder_id: [] for folder_id in folder_ids}
+
+    # The parents field is what lets the combined results be attributed to each folder
+    query_fields = page_fields(fields, parents=True)
+
+    queried = set(folder_ids)
+    query = build_parents_query(folder_ids)
+    page_token = None
+    while True:
+        request = service.files().list(q=query, fields=query_fields, pageSize=page_size, pageToken=page_token,
+                                       orderBy=LISTING_ORDER)
+        response = execute_with_retry(request)
+        for file in response.get("files", []):
+            parent_id = next((parent for parent in file.get("parents", []) if parent in queried), None)
+            if parent_id is not None:
+                if cache is not None:
+                    listed[parent_id].append(file)
+                yield parent_id, file
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+
+    # Only complete listings are cached
+    if cache is not None:
+        for folder_id, files in listed.items():
+            cache.put(folder_id, fields, files, modified_times.get(folder_id))
+
+def count_children_recursively(service: "Resource", folder_id: str, folder_name: str, level: int = 0,
+                               snapshot_path: Optional[str] = None, manifest_path: Optional[str] = None,
+                               renderer: Optional["TreeRenderer"] = None, **crawl_options: Any) -> Tuple[int, int]:
     """
     Recursively count all files and folders in a given folder, including any nested subfolders.
     Prints a tree structure for visualization.
 
+    The folder is crawled first, optionally with a pool of concurrent workers, and the tree is
+    printed once the crawl has finished so the output order does not depend on which listing
+    completed first.
+
     Args:
         service (Resource): Google Drive API service instance.
         folder_id (str): The ID of the folder for which files and folders are to be counted.
         folder_name (str): The name of the current folder.
         level (int): Current depth level for printing the tree structure.
+        snapshot_path (str, optional): Keep a snapshot of the tree in this file and, when it already exists,
+                                       refresh it from the Drive Changes API instead of crawling again.
+        manifest_path (str, optional): Also export the tree as a JSONL or CSV manifest (gzipped for .gz names).
+        renderer (TreeRenderer, optional): Renders the finished tree. Defaults to the full tree on stdout.
+        **crawl_options: Passed to gdrive.crawler.crawl_tree: workers, service_factory, backend,
+                         coalesce, flat_scan and drive_id.
 
     Returns:
         tuple: A tuple containing two elements:
@@ -85,34 +277,41 @@ def count_children_recursively(service: Resource, folder_id: str, folder_name: s
             Avoid iterating through both files and subfolders separately.
             Instead, iterate through files just once, incrementing file_count or folder_count based on each item's mimeType.
     """
-    file_count, folder_count = count_files_and_folders(service, folder_id)
-
-    # Print the current folder (with indentation based on the level)
-    print("    " * level + f"📂 {folder_name} (ID: {folder_id}, Folders: {folder_count}, Files: {file_count})")
-
-    # Initialize the nested_folder_count variable with the count of folders directly within the current folder
-    nested_folder_count = folder_count
-    files = list_drive_files(service, folder_id, "files(id, mimeType, name, webViewLink)")
-
-    # Filter out subfolders and files
-    subfolders = [f for f in files if f["mimeType"] == "application/vnd.google-apps.folder"]
-    files = [f for f in files if f["mimeType"] != "application/vnd.google-apps.folder"]
-
-    # Print files with indentation based on the level
-    for file in files:
-        file_url = file.get("webViewLink", "No URL available")
-        print("    " * (level + 1) + f"📄 {file['name']} (ID: {file['id']}) - \033]8;;{file_url}\033\\webViewLink\033]8;;\033\\")
+    # Imported here because gdrive.crawler builds on the helpers in this module
+    from gdrive.crawler import crawl_tree
+    from gdrive.render import TreeRenderer
+
+    fields = RENDER_FIELDS
+    if snapshot_path:
+        from gdrive.changes import load_or_crawl_snapshot
+        tree = load_or_crawl_snapshot(service, snapshot_path, folder_id,
+                                      lambda: crawl_tree(service, folder_id, folder_name, fields, **crawl_options),
+                                      fields, crawl_options.get("drive_id"))
+    else:
+        tree = crawl_tree(service, folder_id, folder_name, fields, **crawl_options)
+    (renderer or TreeRenderer()).render(tree, folder_id, level)
+    if manifest_path:
+        from gdrive.manifest import write_manifest
+        write_manifest(tree, manifest_path)
+    return tree.root.total_files, tree.root.total_folders
+
+def print_tree(tree: "DriveTree", folder_id: str, level: int = 0) -> None:
+    """
+    Prints a folder of a crawled DriveTree and everything beneath it, files before subfolders,
+    each in the order they were listed. See gdrive.render.TreeRenderer for depth limits,
+    folders-only and plain output.
 
-    # Recursively count files and folders inside each subfolder
-    for folder in subfolders:
-        sub_file_count, sub_folder_count = count_children_recursively(service, folder["id"], folder["name"], level + 1)
-        file_count += sub_file_count
-        nested_folder_count += sub_folder_count
+    Args:
+        tree (DriveTree): The crawled tree.
+        folder_id (str): The ID of the folder to print.
+        level (int): Current depth level for printing the tree structure.
+    """
+    from gdrive.render import TreeRenderer
 
-    return file_count, nested_folder_count
+    TreeRenderer().render(tree, folder_id, level)
 
 
-def count_files_and_folders(service: Resource, folder_id: str) -> Tuple[int, int]:
+def count_files_and_folders(service: "Resource", folder_id: str) -> Tuple[int, int]:
     """
     Counts the number of files and folders that are direct children of a given Google Drive folder.
 
@@ -135,17 +334,18 @@ def count_files_and_folders(service: Resource, folder_id: str) -> Tuple[int, int
     """
     try:
         # Attempt to list files in the folder using the Drive API
-        files = list_drive_files(service, folder_id, "files(id, mimeType)")
+        file_count = 0
+        folder_count = 0
+
+        # Consume the listing as a stream, counting each item as its page arrives
+        for file in list_drive_files(service, folder_id, COUNT_FIELDS):
+            if file["mimeType"] == "application/vnd.google-apps.folder":
+                folder_count += 1
+            else:
+                file_count += 1
 
-        if not files:
+        if not file_count and not folder_count:
             logging.warning(f"No files found in folder with ID: {folder_id}")
-        
-        file_count = sum(
-            1 for file in files if file["mimeType"] != "application/vnd.google-apps.folder"
-        )
-        folder_count = sum(
-            1 for file in files if file["mimeType"] == "application/vnd.google-apps.folder"
-        )
 
         logging.info(f"Counted {file_count} files and {folder_count} folders in folder ID: {folder_id}")
         return file_count, folder_count
@@ -160,49 +360,43 @@ def count_files_and_folders(service: Resource, folder_id: str) -> Tuple[int, int
         logging.error(f"An error occurred while counting files and folders: {e}")
         raise Exception(f"An unexpected error occurred: {e}") from e
 
-def count_total_items(service: Resource, folder_id: str) -> int:
+def count_total_items(service: "Resource", folder_id: str) -> int:
     """
     Recursively count all files and subfolders in a Google Drive folder.
+    Small folders are listed together with coalesced "in parents" queries.
     """
-    # Returns a count of files and folders directly within the specified folder
-    file_count, folder_count = count_files_and_folders(service, folder_id)
+    # Imported here because gdrive.crawler builds on the helpers in this module
+    from gdrive.crawler import crawl_tree
 
-    # Initialized with the sum of file_count and folder_count
-    total_items = file_count + folder_count
-
-    # Retrieves a list of all folders within the current folder
-    subfolders = [file for file in list_drive_files(service, folder_id, 'files(id, mimeType)') if file["mimeType"] == "application/vnd.google-apps.folder"]
-    
-    # For each subfolder, the function recursively calls count_total_items, passing in the subfolder’s ID
-    # to count all items within that subfolder
-    for subfolder in subfolders:
-        total_items += count_total_items(service, subfolder["id"])  # Recursively count subfolder items
-    return total_items
+    return crawl_tree(service, folder_id, fields=COUNT_TREE_FIELDS, coalesce=True).total_items()
 
-def get_folder_contents(service: Resource, folder_id: str) -> List[Dict[str, Any]]:
+def get_folder_contents(service: "Resource", folder_id: str, use_cache: bool = True) -> List[Dict[str, Any]]:
     """
     Retrieves all non-trashed files and folders directly located in the specified Google Drive folder.
 
     Args:
         service (Resource): The Google Drive API service instance.
         folder_id (str): The ID of the folder to retrieve contents from.
+        use_cache (bool): Use the metadata cache; pass False for a folder that has been written to.
 
     Returns:
-        List[Dict[str, Any]]: A list of dictionaries containing file metadata (id, name, mimeType).
+        List[Dict[str, Any]]: A list of dictionaries containing file metadata (id, name, mimeType, size, md5Checksum).
     """
-    return list_drive_files(service, folder_id, "files(id, name, mimeType, size, modifiedTime)")
+    return list(list_drive_files(service, folder_id, COMPARE_FIELDS, use_cache=use_cache))
 
-def create_folder_with_retry(service: Resource, file: Dict[str, Any], dest_id: str) -> Dict[str, Any]:
+def create_folder_request(service: "Resource", file: Dict[str, Any], dest_id: str) -> "HttpRequest":
     """
-    Helper function to create a folder with exponential backoff retry logic.
+    Builds (without executing) the request that creates a folder named after the given
+    folder in the destination folder.
     Folders in Google Drive cannot be copied directly; instead, a new folder needs to be created in the destination.
+
     Args:
         service (Resource): Google Drive API service instance.
         file (dict): The file/folder metadata.
         dest_id (str): The ID of the destination folder where the new folder will be created.
 
     Returns:
-        dict: Metadata of the created folder.
+        HttpRequest: The unexecuted files.create request.
     """
     folder_metadata = {
         "name": file["name"],
@@ -210,12 +404,11 @@ def create_folder_with_retry(service: Resource, file: Dict[str, Any], dest_id: s
         "parents": [dest_id],
     }
     # API call to create a new folder with the specified metadata in the destination directory
-    request = service.files().create(body=folder_metadata, fields="id")
-    return execute_with_retry(request)
+    return service.files().create(body=folder_metadata, fields="id")
 
-def copy_file_with_retry(service: Resource, file: Dict[str, Any], dest_id: str) -> Dict[str, Any]:
+def copy_file_request(service: "Resource", file: Dict[str, Any], dest_id: str) -> "HttpRequest":
     """
-    Helper function to copy a file with exponential backoff retry logic.
+    Builds (without executing) the request that copies a file into the destination folder.
 
     Args:
         service (Resource): Google Drive API service instance.
@@ -223,63 +416,77 @@ def copy_file_with_retry(service: Resource, file: Dict[str, Any], dest_id: str)
         dest_id (str): The ID of the destination folder where the file will be copied.
 
     Returns:
-        dict: Metadata of the copied file.
+        HttpRequest: The unexecuted files.copy request.
     """
     file_metadata = {"name": file["name"], "parents": [dest_id]}
     # The file ID (file["id"]) is passed to copy, indicating the file to be duplicated
-    request = service.files().copy(fileId=file["id"], body=file_metadata)
-    return execute_with_retry(request)
+    return service.files().copy(fileId=file["id"], body=file_metadata, fields="id")
 
-def are_folders_identical(service: Resource, folder_id1: str, folder_id2: str) -> bool:
+def trash_file_request(service: "Resource", file_id: str) -> "HttpRequest":
     """
-    Compare two folders in Google Drive to check if they have the same files and folders,
-    excluding size checks for Google-native files (Google Docs, Sheets, Slides).
-    
+    Builds (without executing) the request that moves a file to the trash, where it can still be restored.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        file_id (str): The ID of the file to trash.
+
+    Returns:
+        HttpRequest: The unexecuted files.update request.
+    """
+    return service.files().update(fileId=file_id, body={"trashed": True}, fields="id")
+
+def create_folder_with_retry(service: "Resource", file: Dict[str, Any], dest_id: str) -> Dict[str, Any]:
+    """
+    Helper function to create a folder with exponential backoff retry logic.
+    Folders in Google Drive cannot be copied directly; instead, a new folder needs to be created in the destination.
+    Args:
+        service (Resource): Google Drive API service instance.
+        file (dict): The file/folder metadata.
+        dest_id (str): The ID of the destination folder where the new folder will be created.
+
+    Returns:
+        dict: Metadata of the created folder.
+    """
+    return execute_with_retry(create_folder_request(service, file, dest_id))
+
+def copy_file_with_retry(service: "Resource", file: Dict[str, Any], dest_id: str) -> Dict[str, Any]:
+    """
+    Helper function to copy a file with exponential backoff retry logic.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        file (dict): The file metadata.
+        dest_id (str): The ID of the destination folder where the file will be copied.
+
+    Returns:
+        dict: Metadata of the copied file.
+    """
+    return execute_with_retry(copy_file_request(service, file, dest_id))
+
+def are_folders_identical(service: "Resource", folder_id1: str, folder_id2: str, source_tree: Optional["DriveTree"] = None) -> bool:
+    """
+    Compare two folders in Google Drive to check if they have the same files and folders.
+    Files are compared by md5Checksum where both sides have one and by size otherwise,
+    excluding Google-native files (Google Docs, Sheets, Slides), which have neither.
+
     Args:
         service (Resource): The authenticated Google Drive API service.
         folder_id1 (str): The ID of the first folder to compare.
         folder_id2 (str): The ID of the second folder to compare.
+        source_tree (DriveTree, optional): Snapshot containing the first folder. When given,
+                                           the first folder's contents are read from it instead of the API.
 
     Returns:
         bool: True if the folders are equal, False otherwise.
     """
-    # Retrieve the contents (files and folders) of both folders using the helper function
-    folder1_contents = get_folder_contents(service, folder_id1)
-    folder2_contents = get_folder_contents(service, folder_id2)
+    # Imported here because gdrive.verify builds on the helpers in this module
+    from gdrive.verify import iter_differences
 
-    # Sort the contents of both folders by the file/folder name to ensure they can be compared in order
-    folder1_contents.sort(key=lambda x: x["name"])
-    folder2_contents.sort(key=lambda x: x["name"])
-
-    # Check if the number of items in both folders is the same; if not, the folders are not equal
-    if len(folder1_contents) != len(folder2_contents):
-        logging.warning(f"Mismatch in item count between folder {folder_id1} and {folder_id2}")
+    # Stop at the first difference; gdrive.verify.verify_folders reports all of them
+    for difference in iter_differences(service, folder_id1, folder_id2, source_tree, workers=1):
+        logging.warning(f"Mismatch between folder {folder_id1} and {folder_id2}: {difference.kind} {difference.path}")
         return False
 
-    # Iterate through the contents of both folders simultaneously and compare each item
-    for file1, file2 in zip(folder1_contents, folder2_contents):
-        # Compare file/folder names and MIME types; if they don't match, the folders are not equal
-        if file1["name"] != file2["name"] or file1["mimeType"] != file2["mimeType"]:
-            logging.warning(f"Mismatch: {file1['name']} in folder 1, {file2['name']} in folder 2")
-            return False
-
-        # If the item is a file and is not a Google-native file, compare its size
-        if file1["mimeType"] != "application/vnd.google-apps.folder":
-            if not file1["mimeType"].startswith("application/vnd.google-apps."):  # Exclude Google-native files
-                size1 = int(file1.get("size", 0))  # Get the size of file1 (default to 0 if not present)
-                size2 = int(file2.get("size", 0))  # Get the size of file2 (default to 0 if not present)
-                if size1 != size2:
-                    logging.WARNING(
-                        f"Size mismatch for file {file1['name']}: "
-                        f"{size1} bytes in folder 1, {size2} bytes in folder 2"
-                    )
-                    return False
-
-        # If the item is a folder, recursively compare the contents of both folders
-        if file1["mimeType"] == "application/vnd.google-apps.folder":
-            if not are_folders_identical(service, file1["id"], file2["id"]):
-                return False
-
     # If all checks pass, the folders are considered equal
     return True
 
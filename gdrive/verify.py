@@ -0,0 +1,180 @@
+from typing import Callable, Dict, List, Any, Optional, Iterator, Tuple, TYPE_CHECKING
+from gdrive import utils
+from gdrive.tree import DriveTree, FOLDER_MIME_TYPE
+from gdrive.pool import ThreadServices
+from gdrive.traversal import Frontier, traverse
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Default number of worker threads listing folder pairs in parallel
+DEFAULT_VERIFY_WORKERS = 8
+
+MISSING = "missing"    # In the source only
+EXTRA = "extra"        # In the destination only
+SIZE = "size"          # Both sides exist, sizes differ
+CHECKSUM = "checksum"  # Both sides exist, md5Checksum values differ
+
+
+class Difference:
+    """
+    One difference between a source folder and its copy, located by its path below the compared folders.
+    """
+
+    def __init__(self, kind: str, path: str, source: Optional[Dict[str, Any]] = None,
+                 dest: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.path = path
+        self.source = source
+        self.dest = dest
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "path": self.path,
+            "source_id": self.source["id"] if self.source else None,
+            "dest_id": self.dest["id"] if self.dest else None,
+            "source_size": self.source.get("size") if self.source else None,
+            "dest_size": self.dest.get("size") if self.dest else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"Difference({self.kind!r}, {self.path!r})"
+
+
+def _keyed(items: List[Dict[str, Any]]) -> List[Tuple[Tuple[str, str, int], Dict[str, Any]]]:
+    """
+    Sorts a folder's items and keys each by (name, mimeType, ordinal), where the ordinal tells apart
+    items sharing a name and type. Such duplicates are ordered by checksum and size first, so
+    identical duplicates on both sides receive the same ordinal.
+    """
+    items = sorted(items, key=lambda item: (item["name"], item["mimeType"], item.get("md5Checksum", ""), int(item.get("size", 0))))
+    keyed = []
+    previous = None
+    ordinal = 0
+    for item in items:
+        name_type = (item["name"], item["mimeType"])
+        ordinal = ordinal + 1 if name_type == previous else 0
+        previous = name_type
+        keyed.append(((item["name"], item["mimeType"], ordinal), item))
+    return keyed
+
+
+def merge_join(source_items: List[Dict[str, Any]],
+               dest_items: List[Dict[str, Any]]) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """
+    Pairs the items of two folders by (name, mimeType, ordinal) in a single pass over both sorted lists.
+
+    Yields:
+        tuple: (source item, destination item), with None on the side where the item is absent.
+    """
+    source, dest = _keyed(source_items), _keyed(dest_items)
+    i = j = 0
+    while i < len(source) or j < len(dest):
+        if j >= len(dest) or (i < len(source) and source[i][0] < dest[j][0]):
+            yield source[i][1], None
+            i += 1
+        elif i >= len(source) or dest[j][0] < source[i][0]:
+            yield None, dest[j][1]
+            j += 1
+        else:
+            yield source[i][1], dest[j][1]
+            i += 1
+            j += 1
+
+
+def compare_items(source: Dict[str, Any], dest: Dict[str, Any]) -> Optional[str]:
+    """
+    Compares a matched pair of files: by md5Checksum when both sides have one, otherwise by size.
+    Google-native files have neither and always compare equal.
+
+    Returns:
+        str: The kind of difference, or None if the files match.
+    """
+    if source.get("md5Checksum") and dest.get("md5Checksum"):
+        return CHECKSUM if source["md5Checksum"] != dest["md5Checksum"] else None
+    if source["mimeType"].startswith("application/vnd.google-apps."):
+        return None
+    return SIZE if int(source.get("size", 0)) != int(dest.get("size", 0)) else None
+
+
+def iter_differences(service: "Resource", source_folder_id: str, dest_folder_id: str,
+                     source_tree: Optional[DriveTree] = None, workers: int = DEFAULT_VERIFY_WORKERS,
+                     service_factory: Optional[Callable[[], "Resource"]] = None) -> Iterator[Difference]:
+    """
+    Compares a folder with its copy and yields every difference as it is found.
+
+    Matched folder pairs are listed concurrently on a pool of worker threads and compared one pair
+    at a time, so only the folders being compared are held in memory rather than both trees.
+    Pairs still to be compared wait in a Frontier, which spills to disk past its memory budget.
+    Destination folders are always listed from the API, never from the metadata cache, and their
+    cached listings are dropped: a copy writes into them without reliably changing their modifiedTime.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        source_folder_id (str): The ID of the source folder.
+        dest_folder_id (str): The ID of the destination folder.
+        source_tree (DriveTree, optional): Snapshot containing the source folder. When given,
+                                           the source side is read from it instead of the API.
+        workers (int): Number of worker threads listing folders.
+        service_factory (Callable, optional): Builds a new service for each worker thread.
+                                              Defaults to the shared client pool, GDriveAuth().pool.
+
+    Yields:
+        Difference: Each missing, extra or mismatched item.
+    """
+    if service_factory is None:
+        if workers <= 1:
+            # A single worker owns the given service, so it is never shared between threads
+            service_factory = lambda: service
+        else:
+            # Imported here so the OAuth and discovery libraries load only when they are needed
+            from gdrive.auth import GDriveAuth
+            service_factory = GDriveAuth().pool
+    services = ThreadServices(service_factory)
+
+    def list_folder(folder_id: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+        return utils.get_folder_contents(services.get(), folder_id, use_cache=use_cache)
+
+    def list_pair(source_id: str, dest_id: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        if source_tree is not None:
+            source_items = source_tree.folder_contents(source_id)
+        else:
+            source_items = list_folder(source_id)
+        return source_items, list_folder(dest_id, use_cache=False)
+
+    frontier = Frontier([(source_folder_id, dest_folder_id, "")])
+    pairs = traverse(frontier, lambda task: list_pair(task[0], task[1]), max(1, workers), thread_name_prefix="drive-verifier")
+    try:
+        for (_, _, path), (source_items, dest_items) in pairs:
+            for source, dest in merge_join(source_items, dest_items):
+                item_path = f"{path}/{(source or dest)['name']}"
+                if dest is None:
+                    yield Difference(MISSING, item_path, source=source)
+                elif source is None:
+                    yield Difference(EXTRA, item_path, dest=dest)
+                elif source["mimeType"] == FOLDER_MIME_TYPE:
+                    frontier.append((source["id"], dest["id"], item_path))
+                else:
+                    kind = compare_items(source, dest)
+                    if kind is not None:
+                        yield Difference(kind, item_path, source, dest)
+    finally:
+        # Closing the traversal first stops listing when the caller stops consuming, e.g. at the first difference
+        pairs.close()
+        frontier.close()
+        services.close()
+
+
+def verify_folders(service: "Resource", source_folder_id: str, dest_folder_id: str,
+                   source_tree: Optional[DriveTree] = None, workers: int = DEFAULT_VERIFY_WORKERS,
+                   service_factory: Optional[Callable[[], "Resource"]] = None) -> List[Difference]:
+    """
+    Compares a folder with its copy and returns every difference; an empty list means the copy is identical.
+    See iter_differences for the arguments.
+    """
+    differences = list(iter_differences(service, source_folder_id, dest_folder_id, source_tree, workers, service_factory))
+    for difference in differences:
+        logging.warning(f"Parity check: {difference.kind} {difference.path}")
+    return differences
@@ -1,17 +1,61 @@
-from reports import copy_files, count_recursive, count_source
+from reports import batch_runner
 from colorama import Fore, Back, init
-from gdrive.utils import print_welcome
+from gdrive.utils import print_welcome, configure_logging
+from gdrive.cache import MetadataCache, set_metadata_cache, DEFAULT_CACHE_PATH, DEFAULT_TTL
+from gdrive.journal import DEFAULT_JOURNAL_PATH
+from gdrive.sync import NATIVE_POLICIES
+from gdrive.render import TreeRenderer
+from gdrive.usage import DEFAULT_TOP_N
+from gdrive.metrics import get_metrics, reset_metrics, write_metrics
+from gdrive.pool import configure_pool, DEFAULT_POOL_SIZE
+from gdrive.traversal import configure_frontier, DEFAULT_MAX_IN_MEMORY
+from gdrive.crawler import BACKENDS
+import argparse
+import importlib.util
+import logging
+import sys
 
 # Initialize colorama
 init(autoreset=True)
 
 
 class GDriveReportingTool:
-    def __init__(self):
+    def __init__(self, snapshot_path=None, manifest_path=None, renderer=None, resume=False, journal_path=DEFAULT_JOURNAL_PATH, sync=False,
+                 native_policy="newer", top_n=DEFAULT_TOP_N, metrics_path=None, backend="threads", flat_scan=False,
+                 drive_id=None, columnar=False):
         """
         Initialize the Google Drive Reporting Tool class.
+
+        Args:
+            snapshot_path (str, optional): Snapshot file Assessment 2 refreshes incrementally.
+            manifest_path (str, optional): File Assessment 2 exports a manifest of every item to.
+            renderer (TreeRenderer, optional): How Assessment 2 prints the tree.
+            resume (bool): Let Assessment 3 resume an interrupted copy from its journal.
+            journal_path (str): Location of the Assessment 3 copy journal.
+            sync (bool): Make Assessment 3 copy only the items missing or changed in the destination.
+            native_policy (str): How sync compares Google-native files.
+            top_n (int): Number of folders and files Assessment 4 lists.
+            metrics_path (str, optional): File the API metrics are written to after each assessment (.json or .prom).
+            backend (str): "threads" or "asyncio", the backend Assessments 2 and 3 crawl and copy with.
+            flat_scan (bool): Build the trees of Assessments 1, 2 and 4 and the source of Assessment 3
+                              from one flat scan of the whole drive.
+            drive_id (str, optional): ID of the shared drive to scan; looked up from the folder when omitted.
+            columnar (bool): Make Assessment 2 count in compact arrays and print only the totals.
         """
         self.assessment_number = None
+        self.snapshot_path = snapshot_path
+        self.manifest_path = manifest_path
+        self.renderer = renderer
+        self.resume = resume
+        self.journal_path = journal_path
+        self.sync = sync
+        self.native_policy = native_policy
+        self.top_n = top_n
+        self.metrics_path = metrics_path
+        self.backend = backend
+        self.flat_scan = flat_scan
+        self.drive_id = drive_id
+        self.columnar = columnar
 
     def show_assessment_options(self):
         """
@@ -36,7 +80,13 @@ class GDriveReportingTool:
             + Fore.WHITE
             + "Assessment 3: Copy folder contents from source folder to destination folder"
         )
-        print(Fore.GREEN + "(4) " + Fore.RED + "Exit")
+        print(
+            Fore.GREEN
+            + "(4) "
+            + Fore.WHITE
+            + "Assessment 4: Report storage usage and the largest folders and files"
+        )
+        print(Fore.GREEN + "(5) " + Fore.RED + "Exit")
 
     def get_assessment_choice(self):
         """
@@ -48,12 +98,12 @@ class GDriveReportingTool:
         while True:
             try:
                 self.assessment_number = int(
-                    input("Enter the assessment number (1, 2, 3, or 4 to Exit): ")
+                    input("Enter the assessment number (1, 2, 3, 4, or 5 to Exit): ")
                 )
-                if self.assessment_number in [1, 2, 3, 4]:
+                if self.assessment_number in [1, 2, 3, 4, 5]:
                     return self.assessment_number
                 else:
-                    print("Invalid choice. Please select 1, 2, 3, or 4.")
+                    print("Invalid choice. Please select 1, 2, 3, 4, or 5.")
             except ValueError:
                 print("Invalid input. Please enter a number.")
 
@@ -90,6 +140,17 @@ class GDriveReportingTool:
             "\nPlease enter the Google Drive folder ID to copy contents to (hint: 1TjN_VohuoM0MaIzYp-z16nVDLiVoWWW1): "
         )
 
+    def report_metrics(self):
+        """
+        Prints a summary of the Drive API calls made by the assessment that just ran,
+        and exports the metrics when a metrics path was given.
+        """
+        metrics = get_metrics()
+        print(Fore.YELLOW + "\nDrive API calls:")
+        metrics.print_summary()
+        if self.metrics_path:
+            write_metrics(metrics, self.metrics_path)
+
     def run_assessment(self):
         """
         Executes the chosen assessment based on the user's input.
@@ -104,20 +165,30 @@ class GDriveReportingTool:
             self.get_assessment_choice()
 
             # If the user chooses to exit, break the loop
-            if self.assessment_number == 4:
+            if self.assessment_number == 5:
                 print("Exiting the tool. Thank you!👋")
                 break
 
+            # Every assessment starts with fresh API metrics
+            reset_metrics()
+
             # Execute the corresponding assessment based on the user's input
+            # Each report is imported only when it runs, so the menu appears without loading
+            # the OAuth, discovery and progress bar libraries
             if self.assessment_number == 1:
+                from reports import count_source
                 folder_id = self.get_folder_id()
                 print(Fore.YELLOW + "\nRunning Assessment 1...")
-                count_source.count_files(folder_id)
+                count_source.count_files(folder_id, flat_scan=self.flat_scan, drive_id=self.drive_id)
 
             elif self.assessment_number == 2:
+                from reports import count_recursive
                 folder_id = self.get_folder_id()
                 print(Fore.YELLOW + "\nRunning Assessment 2...")
-                count_recursive.count_recursive(folder_id)
+                count_recursive.count_recursive(folder_id, backend=self.backend, flat_scan=self.flat_scan,
+                                                drive_id=self.drive_id, snapshot_path=self.snapshot_path,
+                                                manifest_path=self.manifest_path, renderer=self.renderer,
+                                                columnar=self.columnar)
 
             elif self.assessment_number == 3:
                 folder_id = self.get_source_folder_id()  # Get source folder ID
@@ -129,8 +200,24 @@ class GDriveReportingTool:
                     continue  # Skip this iteration and go back to the assessment selection
                 else:
                     print(Fore.YELLOW + "\nRunning Assessment 3...")
+                    from reports import copy_files
                     # Proceed with copying if the IDs are different
-                    copy_files.copy_folder_contents(folder_id, destination_folder_id)
+                    if self.sync:
+                        copy_files.sync_folder_contents(folder_id, destination_folder_id,
+                                                        native_policy=self.native_policy, flat_scan=self.flat_scan,
+                                                        drive_id=self.drive_id)
+                    else:
+                        copy_files.copy_folder_contents(folder_id, destination_folder_id, backend=self.backend,
+                                                        flat_scan=self.flat_scan, drive_id=self.drive_id,
+                                                        resume=self.resume, journal_path=self.journal_path)
+
+            elif self.assessment_number == 4:
+                from reports import storage_usage
+                folder_id = self.get_folder_id()
+                print(Fore.YELLOW + "\nRunning Assessment 4...")
+                storage_usage.storage_usage(folder_id, top_n=self.top_n, flat_scan=self.flat_scan, drive_id=self.drive_id)
+
+            self.report_metrics()
 
             # After the assessment finishes, ask the user if they want to run another assessment
             another = input("\nWould you like to run another assessment? (yes/no): ").lower()
@@ -140,6 +227,201 @@ class GDriveReportingTool:
                 break
 
 
-if __name__ == "__main__":
-    tool = GDriveReportingTool()
+def positive_int(value):
+    """
+    argparse type for options that need a whole number of at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line options.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Google Drive Reporting Tool")
+    parser.add_argument(
+        "--cache",
+        dest="cache",
+        action="store_true",
+        help="Answer folder listings from the on-disk metadata cache when they are still fresh",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Always list folders from the Google Drive API (default)",
+    )
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="Location of the metadata cache database")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help="Seconds a cached listing stays fresh")
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help="Save the Assessment 2 tree here and refresh it from the Drive Changes API on later runs",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        help="Export every item found by Assessment 2 to a JSONL or CSV manifest (.csv, .jsonl, optionally .gz)",
+    )
+    parser.add_argument("--max-depth", type=int, help="Print the Assessment 2 tree only down to this many levels")
+    parser.add_argument("--folders-only", action="store_true", help="Leave files out of the Assessment 2 tree")
+    parser.add_argument("--quiet", action="store_true", help="Print only the Assessment 2 totals, not the tree")
+    parser.add_argument("--plain", action="store_true", help="Print file URLs as plain text instead of terminal hyperlinks")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted Assessment 3 copy, skipping the items its journal lists as copied",
+    )
+    parser.add_argument("--journal-path", default=DEFAULT_JOURNAL_PATH, help="Location of the copy journal")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Make Assessment 3 copy only the files missing or changed in the destination, reusing its folders",
+    )
+    parser.add_argument(
+        "--native-policy",
+        choices=NATIVE_POLICIES,
+        default="newer",
+        help="When --sync copies Google Docs, Sheets and Slides again: when newer (default), always or never",
+    )
+    parser.add_argument("--top", type=positive_int, default=DEFAULT_TOP_N, help="Number of folders and files Assessment 4 lists")
+    parser.add_argument(
+        "--assessment",
+        type=int,
+        choices=batch_runner.ASSESSMENTS,
+        help="Run this assessment non-interactively over every root and print one JSON result per root",
+    )
+    parser.add_argument(
+        "--roots",
+        nargs="+",
+        metavar="ID",
+        help="Folder IDs to run --assessment on; for Assessment 3 use SOURCE_ID:DESTINATION_ID",
+    )
+    parser.add_argument("--roots-file", help="File with one root per line, in the same format as --roots")
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=batch_runner.DEFAULT_CONCURRENCY,
+        help="Number of roots --assessment processes at the same time",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write Drive API metrics after each assessment as JSON, or as a Prometheus textfile when PATH ends in .prom",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=positive_int,
+        default=DEFAULT_POOL_SIZE,
+        help="Number of idle Drive clients, and their open connections, kept for reuse by worker threads",
+    )
+    parser.add_argument(
+        "--frontier-limit",
+        type=positive_int,
+        default=DEFAULT_MAX_IN_MEMORY,
+        help="Folders waiting to be listed, compared or copied that are kept in memory before the queue spills to disk",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="threads",
+        help="Crawl and copy in Assessments 2 and 3 with worker threads (default) or with the asyncio client (requires aiohttp)",
+    )
+    parser.add_argument(
+        "--flat-scan",
+        action="store_true",
+        help="Page through every item of the drive once and rebuild folder trees locally instead of listing each folder",
+    )
+    parser.add_argument(
+        "--drive-id",
+        help="ID of the shared drive --flat-scan pages through (default: the drive the folder is on)",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Count Assessment 2 in compact arrays instead of one object per item and print only the totals, for folders with millions of items",
+    )
+    parser.set_defaults(cache=False)
+    args = parser.parse_args(argv)
+    # Checked without importing aiohttp, so the menu still appears without loading it
+    if args.backend == "asyncio" and importlib.util.find_spec("aiohttp") is None:
+        parser.error("--backend asyncio requires aiohttp. Install it with `pip install .[async]`.")
+    if args.columnar:
+        # A columnar count keeps no DriveTree to snapshot, export, print or rebuild from a scan
+        given = {
+            "--snapshot": args.snapshot is not None,
+            "--manifest": args.manifest is not None,
+            "--max-depth": args.max_depth is not None,
+            "--folders-only": args.folders_only,
+            "--flat-scan": args.flat_scan,
+            "--backend asyncio": args.backend == "asyncio",
+        }
+        conflicts = [option for option, is_given in given.items() if is_given]
+        if conflicts:
+            parser.error(f"--columnar cannot be combined with {', '.join(conflicts)}")
+    if args.assessment is not None:
+        # These options shape the interactive reports only; reject them rather than ignore them
+        given = {
+            "--snapshot": args.snapshot is not None,
+            "--manifest": args.manifest is not None,
+            "--max-depth": args.max_depth is not None,
+            "--folders-only": args.folders_only,
+            "--quiet": args.quiet,
+            "--plain": args.plain,
+        }
+        interactive_only = [option for option, is_given in given.items() if is_given]
+        if interactive_only:
+            parser.error(f"{', '.join(interactive_only)} cannot be combined with --assessment")
+    return args
+
+
+def main(argv=None):
+    """
+    Entry point: applies the command line options and starts the interactive tool, or with
+    --assessment runs one assessment over many roots without prompting.
+
+    Returns:
+        int: The process exit code.
+    """
+    args = parse_args(argv)
+    configure_logging()
+    configure_pool(args.pool_size)
+    configure_frontier(args.frontier_limit)
+    if args.cache:
+        set_metadata_cache(MetadataCache(args.cache_path, ttl=args.cache_ttl))
+
+    if args.assessment is not None:
+        roots = batch_runner.read_roots(args.roots, args.roots_file)
+        if not roots:
+            print(Fore.RED + "Error: --assessment needs at least one root from --roots or --roots-file.")
+            return 2
+        results = batch_runner.run_batch(args.assessment, roots, args.concurrency, resume=args.resume,
+                                         journal_path=args.journal_path, columnar=args.columnar, backend=args.backend,
+                                         flat_scan=args.flat_scan, drive_id=args.drive_id, sync=args.sync,
+                                         native_policy=args.native_policy)
+        succeeded, failed = batch_runner.print_results(results)
+        # Standard output carries the JSON results, so the summary goes to standard error
+        get_metrics().print_summary(sys.stderr)
+        if args.metrics:
+            write_metrics(get_metrics(), args.metrics)
+        logging.info(f"Assessment {args.assessment} finished: {succeeded} roots succeeded, {failed} failed")
+        return 1 if failed else 0
+
+    renderer = TreeRenderer(max_depth=args.max_depth, folders_only=args.folders_only, quiet=args.quiet,
+                            hyperlinks=not args.plain)
+    tool = GDriveReportingTool(snapshot_path=args.snapshot, manifest_path=args.manifest, renderer=renderer, resume=args.resume, journal_path=args.journal_path,
+                               sync=args.sync, native_policy=args.native_policy, top_n=args.top, metrics_path=args.metrics,
+                               backend=args.backend, flat_scan=args.flat_scan, drive_id=args.drive_id,
+                               columnar=args.columnar)
     tool.run_assessment()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
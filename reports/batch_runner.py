@@ -0,0 +1,229 @@
+from typing import Callable, Dict, List, Any, Optional, Iterator, Tuple, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from gdrive.crawler import crawl_columnar, crawl_tree
+from gdrive.journal import CopyJournal, DEFAULT_JOURNAL_PATH, root_journal_path
+from gdrive.utils import count_files_and_folders
+from gdrive.verify import verify_folders
+from gdrive.pool import ThreadServices
+import json
+import logging
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Default number of roots processed at the same time
+DEFAULT_CONCURRENCY = 4
+
+ASSESSMENTS = (1, 2, 3)
+
+
+def read_roots(roots: Optional[List[str]] = None, roots_file: Optional[str] = None) -> List[str]:
+    """
+    Collects folder IDs from the command line and from a file with one entry per line.
+    Blank lines and lines starting with # are ignored. For Assessment 3 an entry is
+    "SOURCE_ID:DESTINATION_ID".
+    """
+    entries = list(roots or [])
+    if roots_file:
+        with open(roots_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    entries.append(line)
+    return entries
+
+
+def count_source_root(service: "Resource", folder_id: str, **options: Any) -> Dict[str, Any]:
+    """
+    Assessment 1 for one root: files and folders directly inside it.
+    """
+    file_count, folder_count = count_files_and_folders(service, folder_id)
+    return {"files": file_count, "folders": folder_count}
+
+
+def count_recursive_root(service: "Resource", folder_id: str, columnar: bool = False, backend: str = "threads",
+                         flat_scan: bool = False, drive_id: Optional[str] = None, **options: Any) -> Dict[str, Any]:
+    """
+    Assessment 2 for one root: files and folders at any depth. With columnar, the crawl fills a
+    ColumnarTree, a few typed arrays, instead of a DriveNode per item.
+    """
+    if columnar:
+        columnar_tree = crawl_columnar(service, folder_id)
+        totals = columnar_tree.rollup().totals(0)
+        return {
+            "total_files": totals["total_files"],
+            "total_folders": totals["total_folders"],
+            "total_items": len(columnar_tree) - 1,
+        }
+    tree = crawl_tree(service, folder_id, backend=backend, coalesce=True, flat_scan=flat_scan, drive_id=drive_id)
+    return {
+        "total_files": tree.root.total_files,
+        "total_folders": tree.root.total_folders,
+        "total_items": tree.total_items(),
+    }
+
+
+def parse_copy_entry(entry: str) -> Tuple[str, str]:
+    """
+    Splits an Assessment 3 "SOURCE_ID:DESTINATION_ID" entry into its two folder IDs.
+    """
+    source_folder_id, sep, destination_folder_id = entry.partition(":")
+    if not sep or not source_folder_id or not destination_folder_id:
+        raise ValueError(f"Expected SOURCE_ID:DESTINATION_ID, got {entry!r}")
+    if source_folder_id == destination_folder_id:
+        raise ValueError("The source folder ID cannot be the same as the destination folder ID")
+    return source_folder_id, destination_folder_id
+
+
+def sync_root(service: "Resource", entry: str, native_policy: str = "newer", backend: str = "threads",
+              flat_scan: bool = False, drive_id: Optional[str] = None,
+              service_factory: Optional[Callable[[], "Resource"]] = None, **options: Any) -> Dict[str, Any]:
+    """
+    Assessment 3 with sync for one "SOURCE_ID:DESTINATION_ID" entry: copies only what is missing or
+    changed in the destination, as the interactive Assessment 3 does with --sync.
+    """
+    # Imported here so the sync stack loads only for Assessment 3
+    from gdrive.sync import sync_tree_batched, SYNC_FIELDS
+
+    source_folder_id, destination_folder_id = parse_copy_entry(entry)
+    source_tree = crawl_tree(service, source_folder_id, fields=SYNC_FIELDS, service_factory=service_factory,
+                             backend=backend, coalesce=True, flat_scan=flat_scan, drive_id=drive_id)
+    # The destination is written to, so its listings never come from the metadata cache
+    dest_tree = crawl_tree(service, destination_folder_id, fields=SYNC_FIELDS, service_factory=service_factory,
+                           backend=backend, coalesce=True, flat_scan=flat_scan, drive_id=drive_id, use_cache=False)
+    stats = sync_tree_batched(service, source_tree, dest_tree, native_policy)
+    return {"total_items": source_tree.total_items(), **stats}
+
+
+def copy_root(service: "Resource", entry: str, resume: bool = False, journal_path: str = DEFAULT_JOURNAL_PATH,
+              service_factory: Optional[Callable[[], "Resource"]] = None, sync: bool = False, backend: str = "threads",
+              flat_scan: bool = False, drive_id: Optional[str] = None, **options: Any) -> Dict[str, Any]:
+    """
+    Assessment 3 for one "SOURCE_ID:DESTINATION_ID" entry: copies the source folder's contents
+    and checks the copy for differences, on the same journaled, pipelined path as the interactive
+    Assessment 3. Each entry has a journal of its own (see root_journal_path), so with resume an
+    interrupted batch continues every copy where it stopped instead of duplicating it.
+    With sync, only what is missing or changed is copied; see sync_root.
+    """
+    if sync:
+        return sync_root(service, entry, backend=backend, flat_scan=flat_scan, drive_id=drive_id,
+                         service_factory=service_factory, **options)
+
+    # Imported here so the copy stack (progress bars, the asyncio client) loads only for Assessment 3
+    from reports.copy_files import plan_copy, run_copy
+
+    source_folder_id, destination_folder_id = parse_copy_entry(entry)
+    journal = CopyJournal(root_journal_path(journal_path, source_folder_id, destination_folder_id))
+    try:
+        source_tree, resumed = plan_copy(service, source_folder_id, destination_folder_id, journal, resume,
+                                         backend=backend, flat_scan=flat_scan, drive_id=drive_id,
+                                         service_factory=service_factory)
+        already_copied = len(journal.completed())
+        failed: List[str] = []
+
+        def on_error(node: Any, error: Exception) -> None:
+            logging.error(f"Failed to copy {node.name} ({node.id}) to {destination_folder_id}: {error}")
+            failed.append(node.id)
+
+        copied = run_copy(service, source_tree, destination_folder_id, journal, on_error=on_error, backend=backend,
+                          service_factory=service_factory)
+        differences = verify_folders(service, source_folder_id, destination_folder_id, source_tree,
+                                     service_factory=service_factory)
+    finally:
+        # Commit whatever is still buffered so a rerun can resume from here
+        journal.close()
+    return {
+        "total_items": source_tree.total_items(),
+        "resumed": resumed,
+        "copied": copied + already_copied,
+        "failed": len(failed),
+        "differences": len(differences),
+    }
+
+
+RUNNERS: Dict[int, Callable[..., Dict[str, Any]]] = {
+    1: count_source_root,
+    2: count_recursive_root,
+    3: copy_root,
+}
+
+
+def run_batch(assessment: int, roots: List[str], concurrency: int = DEFAULT_CONCURRENCY,
+              service_factory: Optional[Callable[[], "Resource"]] = None, resume: bool = False,
+              journal_path: str = DEFAULT_JOURNAL_PATH, columnar: bool = False, backend: str = "threads",
+              flat_scan: bool = False, drive_id: Optional[str] = None, sync: bool = False,
+              native_policy: str = "newer") -> Iterator[Dict[str, Any]]:
+    """
+    Runs an assessment over many roots in one process, several roots at a time.
+
+    All roots share one authenticated session: each worker thread builds a single service
+    object from it and reuses that service, and its connections, for every root it processes.
+    Folder listings go through the process-wide metadata cache when one is enabled.
+
+    Args:
+        assessment (int): 1, 2 or 3.
+        roots (List[str]): Folder IDs, or "SOURCE_ID:DESTINATION_ID" entries for Assessment 3.
+        concurrency (int): Number of roots processed at the same time.
+        service_factory (Callable, optional): Builds a service for each worker thread.
+                                              Defaults to the shared client pool, GDriveAuth().pool.
+        resume (bool): Let Assessment 3 resume each interrupted copy from its journal.
+        journal_path (str): Base location of the Assessment 3 journals, one per entry.
+        columnar (bool): Count Assessment 2 roots in a ColumnarTree instead of a DriveTree.
+        backend (str): "threads" or "asyncio", the backend Assessments 2 and 3 crawl and copy with.
+        flat_scan (bool): Build the trees of Assessments 2 and 3 from one flat scan of the whole drive.
+        drive_id (str, optional): ID of the shared drive to scan; looked up from the folder when omitted.
+        sync (bool): Make Assessment 3 copy only the items missing or changed in the destination.
+        native_policy (str): How sync compares Google-native files.
+
+    Yields:
+        Dict[str, Any]: One result per root, as each finishes, with "root", "assessment", "ok"
+                        and either the assessment's counts or an "error" message.
+    """
+    if assessment not in RUNNERS:
+        raise ValueError(f"Unknown assessment {assessment!r}. Choose one of: {', '.join(map(str, ASSESSMENTS))}")
+    if service_factory is None:
+        # Imported here so the OAuth and discovery libraries load only when they are needed
+        from gdrive.auth import GDriveAuth
+        service_factory = GDriveAuth().pool
+    runner = RUNNERS[assessment]
+    services = ThreadServices(service_factory)
+
+    def run_root(root: str) -> Dict[str, Any]:
+        service = services.get()
+        if service is None:
+            raise RuntimeError("Failed to authenticate with Google Drive")
+        return runner(service, root, resume=resume, journal_path=journal_path, service_factory=service_factory,
+                      columnar=columnar, backend=backend, flat_scan=flat_scan, drive_id=drive_id, sync=sync,
+                      native_policy=native_policy)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="drive-batch") as executor:
+            futures = {executor.submit(run_root, root): root for root in roots}
+            for future in as_completed(futures):
+                root = futures[future]
+                result: Dict[str, Any] = {"root": root, "assessment": assessment}
+                try:
+                    result.update(future.result(), ok=True)
+                except Exception as e:
+                    logging.error(f"Assessment {assessment} failed for {root}: {e}")
+                    result.update(ok=False, error=str(e))
+                yield result
+    finally:
+        services.close()
+
+
+def print_results(results: Iterator[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Prints each result as a JSON line as soon as it is available.
+
+    Returns:
+        tuple: The number of roots that succeeded and that failed.
+    """
+    succeeded = failed = 0
+    for result in results:
+        print(json.dumps(result), flush=True)
+        if result["ok"]:
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
@@ -1,29 +1,108 @@
-from typing import Dict, Any, Optional
+from typing import Callable, Optional, Tuple, TYPE_CHECKING
 from gdrive.auth import GDriveAuth
 from googleapiclient.errors import HttpError
-from gdrive.utils import (
-    count_total_items,
-    list_drive_files,
-    are_folders_identical,
-    get_rainbow_bar_format,
-    create_folder_with_retry,
-    copy_file_with_retry
-)
+from gdrive.crawler import crawl_tree, DEFAULT_WORKERS
+from gdrive.aio import copy_tree_with_asyncio
+from gdrive.pipeline import copy_tree_pipelined
+from gdrive.tree import DriveTree, DriveNode
+from gdrive.cache import get_metadata_cache
+from gdrive.journal import CopyJournal, DEFAULT_JOURNAL_PATH
+from gdrive.sync import sync_tree_batched, SYNC_FIELDS
+from gdrive.utils import get_rainbow_bar_format, configure_logging
+from gdrive.verify import verify_folders
 from tqdm import tqdm
 from colorama import Fore, init
 import logging
 
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
 # Initialize colorama
 init(autoreset=True)
 
-def copy_folder_contents(source_folder_id: str, destination_folder_id: str) -> None:
+# Differences printed after the parity check; all of them are logged
+MAX_DIFFERENCES_SHOWN = 20
+
+def plan_copy(service: "Resource", source_folder_id: str, destination_folder_id: str, journal: CopyJournal,
+              resume: bool = False, workers: int = DEFAULT_WORKERS, backend: str = "threads", flat_scan: bool = False,
+              drive_id: Optional[str] = None, service_factory: Optional[Callable[[], "Resource"]] = None) -> Tuple[DriveTree, bool]:
+    """
+    Returns the source snapshot a copy works from. When resuming a copy the journal recorded between
+    the same two folders, that is the journaled snapshot; otherwise the source is crawled once and
+    recorded in the journal as a new plan.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        source_folder_id (str): The ID of the source Google Drive folder.
+        destination_folder_id (str): The ID of the destination Google Drive folder.
+        journal (CopyJournal): The journal the copy is recorded in.
+        resume (bool): Reuse the journaled plan if there is one.
+        workers, backend, flat_scan, drive_id, service_factory: Passed to gdrive.crawler.crawl_tree.
+
+    Returns:
+        tuple: The source snapshot, and whether it was resumed from the journal.
+    """
+    source_tree = journal.load_plan(source_folder_id, destination_folder_id) if resume else None
+    if source_tree is not None:
+        return source_tree, True
+    source_tree = crawl_tree(service, source_folder_id, workers=workers, service_factory=service_factory, backend=backend,
+                             coalesce=True, flat_scan=flat_scan, drive_id=drive_id)
+    journal.start(source_folder_id, destination_folder_id, source_tree)
+    return source_tree, False
+
+def run_copy(service: "Resource", source_tree: DriveTree, destination_folder_id: str, journal: CopyJournal,
+             on_copied: Optional[Callable[[DriveNode], None]] = None,
+             on_error: Optional[Callable[[DriveNode, Exception], None]] = None, workers: int = DEFAULT_WORKERS,
+             backend: str = "threads", service_factory: Optional[Callable[[], "Resource"]] = None) -> int:
+    """
+    Copies a planned source snapshot into the destination folder, journaling every item, so a copy
+    that is interrupted can be resumed without duplicates.
+
+    Args:
+        service (Resource): Google Drive API service instance.
+        source_tree (DriveTree): The snapshot returned by plan_copy.
+        destination_folder_id (str): The ID of the destination Google Drive folder.
+        journal (CopyJournal): Records every copy; items it already lists as copied are skipped.
+        on_copied (Callable, optional): Called with each source node once it has been copied.
+        on_error (Callable, optional): Called with a source node and the error if copying it failed.
+        workers (int): Number of worker threads copying files.
+        backend (str): "threads" for the pipelined copy, or "asyncio" (requires aiohttp).
+        service_factory (Callable, optional): Builds a service for each worker thread.
+                                              Defaults to the shared client pool, GDriveAuth().pool.
+
+    Returns:
+        int: The number of items copied by this run.
+    """
+    # The copy writes into the destination root, so its cached listing is stale from here on. Folders it
+    # creates below the root are new, and the parity check drops any cached listing of the destination's folders
+    cache = get_metadata_cache()
+    if cache is not None:
+        cache.invalidate(destination_folder_id)
+
+    if backend == "asyncio":
+        # Copy the whole snapshot on the asyncio backend, one folder level at a time
+        return copy_tree_with_asyncio(source_tree, destination_folder_id, on_copied, on_error, journal=journal)
+    # Create the folder skeleton one level at a time while worker threads copy the files of finished folders
+    return copy_tree_pipelined(service, source_tree, destination_folder_id, on_copied, on_error, journal, workers,
+                               service_factory)
+
+def copy_folder_contents(source_folder_id: str, destination_folder_id: str, workers: int = DEFAULT_WORKERS,
+                         backend: str = "threads", flat_scan: bool = False, drive_id: Optional[str] = None,
+                         resume: bool = False, journal_path: str = DEFAULT_JOURNAL_PATH) -> None:
     """
     Copies all contents (files and subfolders) from the source Google Drive folder
-    to the destination folder. This is done recursively for nested folders.
+    to the destination folder. Nested folders are copied one level at a time.
 
     Args:
         source_folder_id (str): The ID of the source Google Drive folder.
         destination_folder_id (str): The ID of the destination Google Drive folder.
+        workers (int): Number of worker threads listing source folders and copying files in parallel.
+        backend (str): "threads" or "asyncio" (requires aiohttp) for the crawl and copy phases.
+        flat_scan (bool): Build the source snapshot from one flat scan of the whole drive.
+        drive_id (str, optional): ID of the shared drive to scan when flat_scan is set.
+        resume (bool): Continue the copy recorded in the journal instead of starting over: the journaled
+                       source snapshot is reused, copied items are skipped and created folders reused.
+        journal_path (str): Location of the copy journal.
     """
 
     # Authenticate the Google Drive API and get a service instance
@@ -34,61 +113,45 @@ def copy_folder_contents(source_folder_id: str, destination_folder_id: str) -> N
         logging.error("Failed to authenticate with Google Drive. Exiting.")
         return
 
+    # Every copy is journaled, so an interrupted run can be resumed with resume=True
+    journal = CopyJournal(journal_path)
+
     try:
-        # Step 1: Count total items to copy for tracking and user feedback
+        # Step 1: Crawl the source tree once, unless resuming; counting, copying and the parity check all read from this snapshot
         print("\nCounting total items to copy...")
-        total_items: int = count_total_items(service, source_folder_id)
+        source_tree, resumed = plan_copy(service, source_folder_id, destination_folder_id, journal, resume, workers,
+                                         backend, flat_scan, drive_id)
+        if resumed:
+            print("\nResuming the previous copy from the journal...")
+        elif resume:
+            print(Fore.YELLOW + "\nNo interrupted copy between these folders was found. Started over.")
+        total_items: int = source_tree.total_items()
         print(f"\nTotal items to copy: {total_items}")
 
-        # Initialize a counter to track the total items copied so far
-        total_items_copied: int = 0
-
-        # Recursive function to copy files and subfolders within the specified source folder
-        def recursively_copy_contents(source_id: str, dest_id: str) -> None:
-            # Allow the nested function to modify the total_items_copied
-            nonlocal total_items_copied
-
-            # Retrieve all files and folders in the current source folder
-            files = list_drive_files(service, source_id, "files(id, name, mimeType)")
-
-            # Iterate over each file or folder in the current folder
-            for file in files:
-                # Initialize copied_file as either a dictionary (to store file metadata) or None 
-                copied_file: Optional[Dict[str, Any]] = None
-
-                try:
-                    # If the current item is a folder, create the corresponding folder in the destination
-                    if file["mimeType"] == "application/vnd.google-apps.folder":
-                        copied_file = create_folder_with_retry(service, file, dest_id)
-
-                        # Recursively copy the subfolder contents by calling this function again
-                        recursively_copy_contents(file["id"], copied_file["id"])
-                    else:
-                        # If the current item is a file, copy the file to the destination folder
-                        copy_file_with_retry(service, file, dest_id)
-
-                    # Increment the count of copied items and update the progress bar display
-                    total_items_copied += 1
-                    progress_bar.bar_format = get_rainbow_bar_format(total_items_copied)
-                    progress_bar.update(1)  # Update the progress bar by one unit
-
-                except HttpError as he:
-                    # Handle specific HTTP errors, likely due to permission or network issues that disrupt copying
-                    logging.error(f"An HTTP error occurred while copying {file['name']}: {he}")
-                    print(Fore.RED + f"\nError: Failed to copy {file['name']}. Please check your permissions or folder ID.")
-                except Exception as e:
-                    # Catch any other unexpected errors during copying
-                    logging.error(f"An unexpected error occurred while copying {file['name']}: {e}")
-                    print(Fore.RED + f"\nAn unexpected error occurred while copying {file['name']}.")
+        # Initialize a counter to track the total items copied so far, including those of an earlier run
+        total_items_copied: int = len(journal.completed())
 
         # Start copying the contents of the source folder to the destination
         print(f"\nStarting to copy contents from {source_folder_id} to {destination_folder_id}...")
 
         # Initialize the progress bar with the total number of items to copy
-        progress_bar = tqdm(total=total_items, desc="Copying items", unit="item", dynamic_ncols=True)
+        progress_bar = tqdm(total=total_items, initial=total_items_copied, desc="Copying items", unit="item", dynamic_ncols=True)
+
+        def on_copied(node: DriveNode) -> None:
+            # Increment the count of copied items and update the progress bar display
+            nonlocal total_items_copied
+            total_items_copied += 1
+            progress_bar.bar_format = get_rainbow_bar_format(total_items_copied)
+            progress_bar.update(1)  # Update the progress bar by one unit
+
+        def on_error(node: DriveNode, error: Exception) -> None:
+            if isinstance(error, HttpError):
+                # Specific HTTP errors, likely due to permission or network issues that disrupt copying
+                print(Fore.RED + f"\nError: Failed to copy {node.name}. Please check your permissions or folder ID.")
+            else:
+                print(Fore.RED + f"\nAn unexpected error occurred while copying {node.name}.")
 
-        # Begin the recursive copying process, starting from the source folder
-        recursively_copy_contents(source_folder_id, destination_folder_id)
+        run_copy(service, source_tree, destination_folder_id, journal, on_copied, on_error, workers, backend)
 
         # Close the progress bar after copying is complete
         progress_bar.close()
@@ -99,11 +162,17 @@ def copy_folder_contents(source_folder_id: str, destination_folder_id: str) -> N
         # Check if the source and destination folders are identical
         print(f"\nRunning test to ensure parity...")
 
-        # Use function to check if the folders are identical
-        if are_folders_identical(service, source_folder_id, destination_folder_id):
+        # Compare the snapshot with a fresh listing of the destination, collecting every difference.
+        # Destination folders are listed from the API, dropping their cached listings, see iter_differences
+        differences = verify_folders(service, source_folder_id, destination_folder_id, source_tree, workers)
+        if not differences:
             print("\nThe folders are identical after copying.")
         else:
-            print(Fore.RED + "\nThe folders are not identical after copying.")
+            print(Fore.RED + f"\nThe folders are not identical after copying: {len(differences)} differences found.")
+            for difference in differences[:MAX_DIFFERENCES_SHOWN]:
+                print(Fore.RED + f"  {difference.kind:<9} {difference.path}")
+            if len(differences) > MAX_DIFFERENCES_SHOWN:
+                print(Fore.RED + f"  ... and {len(differences) - MAX_DIFFERENCES_SHOWN} more (see gdrive_log.log)")
 
     except HttpError as he:
         # Handle top-level HTTP-related errors (e.g., invalid folder ID or permissions issues)
@@ -115,11 +184,85 @@ def copy_folder_contents(source_folder_id: str, destination_folder_id: str) -> N
         logging.error(f"An unexpected error occurred during the copy process: {e}")
         print(Fore.RED + f"\nAn unexpected error occurred during the copy process: {e}")
 
+    finally:
+        # Commit whatever is still buffered so a rerun can resume from here
+        journal.close()
+
+def sync_folder_contents(source_folder_id: str, destination_folder_id: str, workers: int = DEFAULT_WORKERS,
+                         native_policy: str = "newer", flat_scan: bool = False, drive_id: Optional[str] = None) -> None:
+    """
+    Brings the destination folder up to date with the source folder, copying only what is
+    missing or changed. Both folders are crawled, items are matched by relative path, and
+    existing destination folders are reused.
+
+    Args:
+        source_folder_id (str): The ID of the source Google Drive folder.
+        destination_folder_id (str): The ID of the destination Google Drive folder.
+        workers (int): Number of worker threads listing folders in parallel.
+        native_policy (str): How Google-native files without a checksum are compared: "newer", "always" or "never".
+        flat_scan (bool): Build the snapshots from one flat scan of the whole drive.
+        drive_id (str, optional): ID of the shared drive to scan when flat_scan is set.
+    """
+
+    # Authenticate the Google Drive API and get a service instance
+    service = GDriveAuth().get_service()
+
+    # Check if authentication failed, and exit if it did
+    if service is None:
+        logging.error("Failed to authenticate with Google Drive. Exiting.")
+        return
+
+    try:
+        # Step 1: Crawl both folders side by side
+        print("\nComparing source and destination folders...")
+        source_tree = crawl_tree(service, source_folder_id, fields=SYNC_FIELDS, workers=workers, coalesce=True,
+                                  flat_scan=flat_scan, drive_id=drive_id)
+        # The destination is written to, so its listings never come from the metadata cache,
+        # and crawling it drops every cached listing of its folders
+        dest_tree = crawl_tree(service, destination_folder_id, fields=SYNC_FIELDS, workers=workers, coalesce=True,
+                                flat_scan=flat_scan, drive_id=drive_id, use_cache=False)
+        total_items: int = source_tree.total_items()
+        print(f"\nTotal items to check: {total_items}")
+
+        # Initialize a counter to track the total items checked so far
+        total_items_checked: int = 0
+        progress_bar = tqdm(total=total_items, desc="Syncing items", unit="item", dynamic_ncols=True)
+
+        def on_checked(node: DriveNode) -> None:
+            # Copied and skipped items both count towards the progress bar
+            nonlocal total_items_checked
+            total_items_checked += 1
+            progress_bar.bar_format = get_rainbow_bar_format(total_items_checked)
+            progress_bar.update(1)
+
+        def on_error(node: DriveNode, error: Exception) -> None:
+            if isinstance(error, HttpError):
+                print(Fore.RED + f"\nError: Failed to copy {node.name}. Please check your permissions or folder ID.")
+            else:
+                print(Fore.RED + f"\nAn unexpected error occurred while copying {node.name}.")
+
+        stats = sync_tree_batched(service, source_tree, dest_tree, native_policy, on_checked, on_checked, on_error)
+        progress_bar.close()
+
+        print(Fore.GREEN + f"\nSync complete: {stats['copied']} items copied, {stats['replaced']} files updated, "
+              f"{stats['skipped']} already up to date, {stats['failed']} failed.")
+
+    except HttpError as he:
+        # Handle top-level HTTP-related errors (e.g., invalid folder ID or permissions issues)
+        logging.error(f"An HTTP error occurred while syncing folder contents: {he}")
+        print(Fore.RED + f"\nError: Unable to access or sync the folder contents. Please check the folder IDs and your permissions.")
+
+    except Exception as e:
+        # Handle general top-level errors
+        logging.error(f"An unexpected error occurred during the sync process: {e}")
+        print(Fore.RED + f"\nAn unexpected error occurred during the sync process: {e}")
+
 if __name__ == "__main__":
     """
     Main execution block: Prompts the user for the destination folder ID and calls
     the function to copy the contents from the source folder to the destination.
     """
+    configure_logging()
     source_folder_id: str = input("Please enter the source folder ID: ").strip()
     destination_folder_id: str = input("\nPlease enter the destination folder ID: ").strip()
 
@@ -1,5 +1,8 @@
+from typing import Optional
 from gdrive.auth import GDriveAuth
-from gdrive.utils import count_children_recursively
+from gdrive.utils import count_children_recursively, execute_with_retry, configure_logging
+from gdrive.crawler import crawl_columnar, DEFAULT_WORKERS
+from gdrive.render import TreeRenderer
 from googleapiclient.errors import HttpError
 from colorama import Fore, init
 import logging
@@ -7,7 +10,10 @@ import logging
 # Initialize colorama
 init(autoreset=True)
 
-def count_recursive(source_folder_id: str) -> None:
+def count_recursive(source_folder_id: str, workers: int = DEFAULT_WORKERS, backend: str = "threads",
+                    flat_scan: bool = False, drive_id: Optional[str] = None, snapshot_path: Optional[str] = None,
+                    manifest_path: Optional[str] = None, renderer: Optional[TreeRenderer] = None,
+                    columnar: bool = False) -> None:
     """
     Generates a report that recursively counts the total number of child objects (files and folders)
     for each top-level folder inside the given source folder. It also prints a tree structure showing
@@ -15,6 +21,15 @@ def count_recursive(source_folder_id: str) -> None:
 
     Args:
         source_folder_id (str): The ID of the source Google Drive folder.
+        workers (int): Number of worker threads listing folders in parallel.
+        backend (str): "threads" or "asyncio" (requires aiohttp) for the folder crawl.
+        flat_scan (bool): Scan the whole drive once and rebuild the folder tree locally instead of listing each folder.
+        drive_id (str, optional): ID of the shared drive to scan when flat_scan is set.
+        snapshot_path (str, optional): Snapshot file refreshed through the Drive Changes API instead of crawling again.
+        manifest_path (str, optional): File to export a JSONL or CSV manifest of every item to.
+        renderer (TreeRenderer, optional): How the tree is printed (depth limit, folders only, quiet, plain links).
+        columnar (bool): Count in a ColumnarTree, a few typed arrays instead of an object per item, and print
+                         only the totals; for folders with millions of items.
     """
     # Authenticate the Google Drive API and get a service instance
     service = GDriveAuth().get_service()
@@ -26,12 +41,19 @@ def count_recursive(source_folder_id: str) -> None:
 
     try:
         # Get the name of the root folder using the Google Drive API
-        response = service.files().get(fileId=source_folder_id, fields="name").execute()
+        response = execute_with_retry(service.files().get(fileId=source_folder_id, fields="name"))
         # Only the name field should be returned
         root_folder_name = response.get("name", "Root Folder")  # Fallback to "Root Folder" if name not found
 
-        # Start the recursive counting for the source folder
-        total_files, total_folders = count_children_recursively(service, source_folder_id, root_folder_name)
+        if columnar:
+            # Counts only: the crawl fills typed arrays and no tree is printed
+            totals = crawl_columnar(service, source_folder_id, root_folder_name, workers=workers).rollup().totals(0)
+            total_files, total_folders = totals["total_files"], totals["total_folders"]
+        else:
+            # Start the recursive counting for the source folder
+            total_files, total_folders = count_children_recursively(service, source_folder_id, root_folder_name, workers=workers, backend=backend, coalesce=True,
+                                                                    flat_scan=flat_scan, drive_id=drive_id, snapshot_path=snapshot_path,
+                                                                    manifest_path=manifest_path, renderer=renderer)
 
         # Output the results if counting succeeded
         print(Fore.YELLOW + "\n-----------------------------------------")
@@ -54,6 +76,7 @@ if __name__ == "__main__":
     """
     Main execution block: Calls the function to generate the report for the specified source folder.
     """
+    configure_logging()
     # Prompt for user input
     source_folder_id: str = input("Please enter the Google Drive folder ID: ").strip()
 
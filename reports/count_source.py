@@ -1,18 +1,22 @@
+from typing import Optional
 from gdrive.auth import GDriveAuth
-from gdrive.utils import count_files_and_folders
+from gdrive.utils import count_files_and_folders, configure_logging
+from gdrive.scan import scan_tree
 from colorama import Fore, Style, init
 import logging
 
 # Initialize colorama
 init(autoreset=True)
 
-def count_files(source_folder_id: str) -> None:
+def count_files(source_folder_id: str, flat_scan: bool = False, drive_id: Optional[str] = None) -> None:
     """
     Generates a report that shows the total number of files and folders located
     at the root level of the specified source Google Drive folder.
 
     Args:
         source_folder_id (str): The ID of the Google Drive folder to count files and folders in.
+        flat_scan (bool): Count from a flat scan of the whole drive instead of listing the folder.
+        drive_id (str, optional): ID of the shared drive to scan when flat_scan is set.
     """
     # Authenticate the Google Drive API and get a service instance
     service = GDriveAuth().get_service()
@@ -24,8 +28,12 @@ def count_files(source_folder_id: str) -> None:
     
     try:
         # Count the number of files and folders at the root of the source folder
-        # Unpacks the tuple returned by count_files_and_folders
-        file_count, folder_count = count_files_and_folders(service, source_folder_id)
+        if flat_scan:
+            root = scan_tree(service, source_folder_id, drive_id=drive_id).root
+            file_count, folder_count = root.file_count, root.folder_count
+        else:
+            # Unpacks the tuple returned by count_files_and_folders
+            file_count, folder_count = count_files_and_folders(service, source_folder_id)
         
         # Only print the report if the counting succeeded
         print(Fore.YELLOW + "\n-----------------------------------------")
@@ -45,6 +53,7 @@ if __name__ == "__main__":
     """
     Main execution block: Calls the function to generate the report for the specified source folder.
     """
+    configure_logging()
     # Prompt for user input
     source_folder_id: str = input("Please enter the Google Drive folder ID: ").strip()
 
@@ -0,0 +1,84 @@
+from typing import Optional
+from gdrive.auth import GDriveAuth
+from gdrive.crawler import crawl_tree, DEFAULT_WORKERS
+from gdrive.utils import execute_with_retry, configure_logging
+from gdrive.usage import compute_storage_usage, format_bytes, STORAGE_FIELDS, DEFAULT_TOP_N
+from googleapiclient.errors import HttpError
+from colorama import Fore, init
+import logging
+
+# Initialize colorama
+init(autoreset=True)
+
+def storage_usage(source_folder_id: str, top_n: int = DEFAULT_TOP_N, workers: int = DEFAULT_WORKERS,
+                  flat_scan: bool = False, drive_id: Optional[str] = None) -> None:
+    """
+    Generates a report of where the bytes are inside the given source folder: the total size,
+    the heaviest subfolders (counting everything beneath them), the largest files and a
+    breakdown by file type. Sizes come from the crawl itself, without extra API calls.
+
+    Args:
+        source_folder_id (str): The ID of the source Google Drive folder.
+        top_n (int): Number of folders and files to list.
+        workers (int): Number of worker threads listing folders in parallel.
+        flat_scan (bool): Scan the whole drive once and rebuild the folder tree locally instead of listing each folder.
+        drive_id (str, optional): ID of the shared drive to scan when flat_scan is set.
+    """
+    # Authenticate the Google Drive API and get a service instance
+    service = GDriveAuth().get_service()
+
+    # Check if authentication failed, and exit if it did
+    if service is None:
+        logging.error("Failed to authenticate with Google Drive. Exiting.")
+        return
+
+    try:
+        # Get the name of the root folder using the Google Drive API
+        response = execute_with_retry(service.files().get(fileId=source_folder_id, fields="name"))
+        root_folder_name = response.get("name", "Root Folder")  # Fallback to "Root Folder" if name not found
+
+        tree = crawl_tree(service, source_folder_id, root_folder_name, STORAGE_FIELDS, workers=workers, coalesce=True,
+                          flat_scan=flat_scan, drive_id=drive_id)
+        usage = compute_storage_usage(tree, top_n)
+
+        print(Fore.YELLOW + "\n-----------------------------------------")
+        print(f"\n{Fore.GREEN}Total size of {root_folder_name}: {Fore.WHITE}{format_bytes(usage.total_bytes)} "
+              f"in {usage.folder_files[tree.root_id]} files")
+
+        print(f"\n{Fore.GREEN}Heaviest folders:")
+        for size, folder in usage.top_folders:
+            print(f"  {Fore.WHITE}{format_bytes(size):>10}  {folder.name} (ID: {folder.id}, Files: {usage.folder_files[folder.id]})")
+
+        print(f"\n{Fore.GREEN}Largest files:")
+        for size, file in usage.top_files:
+            print(f"  {Fore.WHITE}{format_bytes(size):>10}  {file.name} (ID: {file.id})")
+
+        print(f"\n{Fore.GREEN}By file type:")
+        by_size = sorted(usage.by_mime_type.items(), key=lambda entry: entry[1][1], reverse=True)
+        for mime_type, (count, size) in by_size:
+            print(f"  {Fore.WHITE}{format_bytes(size):>10}  {mime_type} ({count} files)")
+        print(Fore.YELLOW + "\n-----------------------------------------")
+
+    except HttpError as he:
+        # Handle HTTP-related errors (e.g., invalid folder ID or permissions issues)
+        logging.error(f"An HTTP error occurred: {he}")
+        print(f"Error: Unable to access folder {source_folder_id}. Please check the folder ID and your permissions.")
+
+    except Exception as e:
+        # Handle general errors
+        logging.error(f"An unexpected error occurred: {e}")
+        print(f"An unexpected error occurred: {e}")
+
+if __name__ == "__main__":
+    """
+    Main execution block: Calls the function to generate the report for the specified source folder.
+    """
+    configure_logging()
+    # Prompt for user input
+    source_folder_id: str = input("Please enter the Google Drive folder ID: ").strip()
+
+    if not source_folder_id:
+        logging.error("No folder ID provided. Exiting.")
+    else:
+        # Generate the storage usage report
+        storage_usage(source_folder_id)
@@ -9,7 +9,12 @@ setup(
     name='reports',
     version='0.1',
     packages=find_packages(),  # Automatically finds all packages (gdrive and reports)
+    py_modules=['main'],  # The top-level main.py holding the console script's entry point
     install_requires=parse_requirements('requirements.txt'),  # Load dependencies from requirements.txt
+    extras_require={
+        'async': ['aiohttp'],  # Optional asyncio backend (gdrive.aio)
+        'columnar': ['numpy'],  # Vectorized rollups for gdrive.columnar
+    },
     entry_points={
         'console_scripts': [
             'gdrivereports=main:main',  # Entry point to your main script function
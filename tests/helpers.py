@@ -0,0 +1,51 @@
+import httplib2
+from googleapiclient.errors import HttpError
+from gdrive.retry import configure_rate_limit, get_rate_limiter, set_rate_limiter
+
+def unthrottle(test_case):
+    """Lifts the process-wide rate limit for one test and restores the previous limiter when it ends."""
+    test_case.addCleanup(set_rate_limiter, get_rate_limiter())
+    configure_rate_limit(1e9)
+
+def http_error(status, content=b'error'):
+    return HttpError(httplib2.Response({'status': status}), content, uri='http://mock.url')
+
+def request(service, file, dest_id):
+    """Stands in for create_folder_request and copy_file_request; FakeService answers it."""
+    return {'key': file['id'], 'parent': dest_id}
+
+class FakeBatch:
+    """Runs each added request through `respond` and reports it to the batch callback."""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batch_sizes.append(len(self.requests))
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, self.service.respond(request), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+class FakeService:
+    def __init__(self, failures=None):
+        self.failures = failures or {}  # request -> list of errors to raise before succeeding
+        self.batch_sizes = []
+        self.executed = []
+        self.created = []
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def respond(self, request):
+        self.executed.append(request)
+        errors = self.failures.get(request['key'], [])
+        if errors:
+            raise errors.pop(0)
+        return {'id': f"new-{request['key']}"}
@@ -0,0 +1,212 @@
+import unittest
+import asyncio
+import json
+from unittest.mock import patch, MagicMock
+from googleapiclient.errors import HttpError
+from gdrive.aio import AsyncDriveClient, DRIVE_FILES_URL, crawl_tree_async, copy_tree_async, aiohttp
+from gdrive.tree import DriveTree
+from tests.helpers import unthrottle
+from gdrive.metrics import reset_metrics
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+# Kept separately so tests that patch asyncio.sleep don't count the fake server's own yields
+yield_to_loop = asyncio.sleep
+
+class FakeResponse:
+    def __init__(self, status, payload, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._content = json.dumps(payload).encode()
+
+    async def read(self):
+        return self._content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class FakeSession:
+    """Answers Drive requests from a dict of folder listings and records concurrency."""
+
+    def __init__(self, listings, page_size=2, failures=None):
+        self.listings = listings
+        self.page_size = page_size
+        self.failures = list(failures or [])
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, method, url, params=None, json=None, headers=None):
+        self.calls.append((method, url, params, json))
+        return self._respond(method, url, params or {}, json)
+
+    def _respond(self, method, url, params, body):
+        session = self
+
+        class Context:
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                await yield_to_loop(0)
+                if session.failures:
+                    status = session.failures.pop(0)
+                    if isinstance(status, Exception):
+                        raise status
+                    return FakeResponse(status, {'error': {'code': status}}, {'Retry-After': '2'})
+                if method == 'GET' and url != DRIVE_FILES_URL:
+                    return FakeResponse(200, {'id': url.rsplit('/', 1)[-1]})
+                if method == 'GET':
+                    folder_id = params['q'].split("'")[1]
+                    start = int(params.get('pageToken', 0))
+                    items = session.listings[folder_id]
+                    page = {'files': items[start:start + session.page_size]}
+                    if start + session.page_size < len(items):
+                        page['nextPageToken'] = str(start + session.page_size)
+                    return FakeResponse(200, page)
+                return FakeResponse(200, {'id': f"new-{body['name']}"})
+
+            async def __aexit__(self, *exc_info):
+                session.in_flight -= 1
+                return False
+
+        return Context()
+
+class TestAsyncDriveClient(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake server
+        self.credentials = MagicMock(valid=True, token='token')
+        self.listings = {
+            'root': [
+                {'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain'},
+                {'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain'},
+                {'id': 'sub', 'name': 'sub', 'mimeType': FOLDER},
+            ],
+            'sub': [{'id': 'c', 'name': 'c.txt', 'mimeType': 'text/plain'}],
+        }
+
+    def test_list_children_follows_page_tokens(self):
+        session = FakeSession(self.listings)
+
+        async def run():
+            client = AsyncDriveClient(self.credentials, session=session)
+            return [item['id'] async for item in client.list_children('root', 'files(id)')]
+
+        # Assertions
+        self.assertEqual(asyncio.run(run()), ['a', 'b', 'sub'])
+        self.assertEqual(len(session.calls), 2)  # One call per page
+        self.assertIn('nextPageToken', session.calls[0][2]['fields'])
+
+    def test_crawl_tree_async(self):
+        session = FakeSession(self.listings)
+
+        async def run():
+            async with AsyncDriveClient(self.credentials, session=session) as client:
+                return await crawl_tree_async(client, 'root', 'Root')
+
+        tree = asyncio.run(run())
+
+        # Assertions
+        self.assertEqual(tree.root.total_files, 3)
+        self.assertEqual(tree.root.total_folders, 1)
+        self.assertEqual([n.id for n in tree.walk()], ['a', 'b', 'sub', 'c'])
+
+    def test_in_flight_requests_are_bounded(self):
+        listings = {'root': [{'id': f'd{i}', 'name': f'd{i}', 'mimeType': FOLDER} for i in range(20)]}
+        listings.update({f'd{i}': [] for i in range(20)})
+        session = FakeSession(listings, page_size=100)
+
+        async def run():
+            client = AsyncDriveClient(self.credentials, max_in_flight=3, session=session)
+            return await crawl_tree_async(client, 'root')
+
+        asyncio.run(run())
+
+        # Assertions
+        self.assertGreater(session.max_in_flight, 1)
+        self.assertLessEqual(session.max_in_flight, 3)
+
+    @patch('gdrive.aio.asyncio.sleep')
+    def test_retries_rate_limit_errors(self, mock_sleep):
+        session = FakeSession(self.listings, failures=[429])
+
+        async def fake_sleep(delay):
+            return None
+
+        mock_sleep.side_effect = fake_sleep
+
+        async def run():
+            client = AsyncDriveClient(self.credentials, session=session)
+            return await client.get('root')
+
+        asyncio.run(run())
+
+        # Assertions
+        self.assertEqual(len(session.calls), 2)
+        mock_sleep.assert_any_call(2.0)  # The server's Retry-After hint is honored
+
+    @unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+    @patch('gdrive.aio.asyncio.sleep')
+    def test_retries_dropped_connections(self, mock_sleep):
+        session = FakeSession(self.listings, failures=[aiohttp.ServerDisconnectedError()])
+        metrics = reset_metrics()
+
+        async def fake_sleep(delay):
+            return None
+
+        mock_sleep.side_effect = fake_sleep
+
+        async def run():
+            client = AsyncDriveClient(self.credentials, session=session)
+            return await client.get('root')
+
+        metadata = asyncio.run(run())
+
+        # Assertions
+        self.assertEqual(metadata, {'id': 'root'})
+        self.assertEqual(len(session.calls), 2)
+        stats = metrics.methods['files.get']
+        self.assertEqual((stats.calls, stats.errors, stats.retries), (2, 1, 1))
+
+    def test_fatal_errors_raise_http_error(self):
+        session = FakeSession(self.listings, failures=[404])
+
+        async def run():
+            client = AsyncDriveClient(self.credentials, session=session)
+            return await client.get('missing')
+
+        # Assertions
+        with self.assertRaises(HttpError) as context:
+            asyncio.run(run())
+        self.assertEqual(context.exception.resp.status, 404)
+        self.assertEqual(len(session.calls), 1)
+
+    def test_copy_tree_creates_parents_first(self):
+        tree = DriveTree('root')
+        for item in self.listings['root']:
+            tree.add_item(item, 'root')
+        tree.add_item(self.listings['sub'][0], 'sub')
+        tree.compute_aggregates()
+        session = FakeSession(self.listings)
+        copied_ids = []
+
+        async def run():
+            client = AsyncDriveClient(self.credentials, session=session)
+            return await copy_tree_async(client, tree, 'dest', on_copied=lambda node: copied_ids.append(node.id))
+
+        copied = asyncio.run(run())
+
+        # Assertions
+        self.assertEqual(copied, 4)
+        self.assertEqual(copied_ids[-1], 'c')
+        folder_call = next(call for call in session.calls if (call[3] or {}).get('mimeType') == FOLDER)
+        child_call = next(call for call in session.calls if call[1] == f'{DRIVE_FILES_URL}/c/copy')
+        self.assertEqual(child_call[3]['parents'], ['new-sub'])
+        self.assertGreater(session.calls.index(child_call), session.calls.index(folder_call))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,10 @@ import os
 
 class TestAuthenticateGDrive(unittest.TestCase):
 
+    # Called before every test method
+    def setUp(self):
+        GDriveAuth._instance = None  # An authenticated instance would skip the flow under test
+
     @patch('gdrive.auth.build')
     @patch('gdrive.auth.Credentials.from_authorized_user_file')
     @patch("builtins.open", unittest.mock.mock_open())  # Mock file operations
@@ -0,0 +1,39 @@
+import unittest
+from unittest.mock import patch
+from gdrive.batch import execute_batch, MAX_BATCH_SIZE
+from tests.helpers import unthrottle, http_error, FakeService
+
+class TestExecuteBatch(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    def test_splits_batches_and_demultiplexes(self, mock_sleep):
+        service = FakeService()
+        requests = {f'k{i}': {'key': f'k{i}'} for i in range(MAX_BATCH_SIZE + 50)}
+
+        results, errors = execute_batch(service, requests)
+
+        # Assertions
+        self.assertEqual(service.batch_sizes, [MAX_BATCH_SIZE, 50])
+        self.assertEqual(results['k7'], {'id': 'new-k7'})
+        self.assertEqual(len(results), len(requests))
+        self.assertEqual(errors, {})
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    def test_retries_only_failed_sub_requests(self, mock_sleep):
+        service = FakeService(failures={'b': [http_error(429)], 'c': [http_error(404)]})
+        requests = {key: {'key': key} for key in ('a', 'b', 'c')}
+
+        results, errors = execute_batch(service, requests)
+
+        # Assertions
+        self.assertEqual(service.batch_sizes, [3, 1])  # Only the rate-limited call is sent again
+        self.assertEqual(set(results), {'a', 'b'})
+        self.assertEqual(errors['c'].resp.status, 404)  # Fatal errors are not retried
+        self.assertTrue(mock_sleep.called)
+
+if __name__ == '__main__':
+    unittest.main()
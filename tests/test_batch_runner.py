@@ -0,0 +1,122 @@
+import unittest
+import os
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+from reports.batch_runner import run_batch, read_roots
+from tests.helpers import unthrottle
+from gdrive.journal import root_journal_path
+from benchmarks.fake_drive import FakeDrive
+
+class TestBatchRunner(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the mock services
+        self.services = []
+        self.lock = threading.Lock()
+
+    def service_factory(self):
+        with self.lock:
+            service = MagicMock()
+            self.services.append(service)
+            return service
+
+    def test_read_roots_merges_args_and_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'roots.txt')
+            with open(path, 'w') as f:
+                f.write('# team folders\nb\n\nc\n')
+
+            # Assertions
+            self.assertEqual(read_roots(['a'], path), ['a', 'b', 'c'])
+
+    @patch('reports.batch_runner.count_files_and_folders')
+    def test_runs_every_root_on_shared_services(self, mock_count_files_and_folders):
+        mock_count_files_and_folders.side_effect = lambda service, folder_id: (len(folder_id), 1)
+        roots = [f'folder-{i}' for i in range(10)]
+
+        results = list(run_batch(1, roots, concurrency=3, service_factory=self.service_factory))
+
+        # Assertions
+        self.assertCountEqual([r['root'] for r in results], roots)
+        self.assertTrue(all(r['ok'] and r['files'] == 8 for r in results))
+        self.assertLessEqual(len(self.services), 3)  # One service per worker thread, not per root
+
+    @patch('reports.batch_runner.count_files_and_folders')
+    def test_failures_are_reported_per_root(self, mock_count_files_and_folders):
+        def count(service, folder_id):
+            if folder_id == 'bad':
+                raise ValueError('Invalid folder ID: bad')
+            return 2, 3
+        mock_count_files_and_folders.side_effect = count
+
+        results = {r['root']: r for r in run_batch(1, ['good', 'bad'], service_factory=self.service_factory)}
+
+        # Assertions
+        self.assertEqual(results['good'], {'root': 'good', 'assessment': 1, 'files': 2, 'folders': 3, 'ok': True})
+        self.assertFalse(results['bad']['ok'])
+        self.assertIn('Invalid folder ID', results['bad']['error'])
+
+    def test_copy_entries_need_a_destination(self):
+        results = list(run_batch(3, ['only-source'], service_factory=self.service_factory))
+
+        # Assertions
+        self.assertFalse(results[0]['ok'])
+        self.assertIn('SOURCE_ID:DESTINATION_ID', results[0]['error'])
+
+    def test_copies_are_journaled_per_entry_and_resumed(self):
+        drive = FakeDrive()
+        source_id = drive.add_folder('Source')
+        sub_id = drive.add_folder('Sub', source_id)
+        for i in range(5):
+            drive.add_item({'name': f'file-{i}.txt', 'mimeType': 'text/plain', 'size': '1'}, sub_id)
+        dest_id = drive.add_folder('Destination')
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_path = os.path.join(tmpdir, 'journal.sqlite3')
+            entry = f'{source_id}:{dest_id}'
+            first = list(run_batch(3, [entry], service_factory=lambda: drive, journal_path=journal_path))
+            # A rerun after the copy finished, as a nightly job that was restarted would do
+            second = list(run_batch(3, [entry], service_factory=lambda: drive, resume=True, journal_path=journal_path))
+            journal_exists = os.path.exists(root_journal_path(journal_path, source_id, dest_id))
+
+        # Assertions
+        self.assertTrue(journal_exists)
+        self.assertEqual((first[0]['copied'], first[0]['failed'], first[0]['differences']), (6, 0, 0))
+        self.assertTrue(second[0]['resumed'])
+        self.assertEqual((second[0]['copied'], second[0]['differences']), (6, 0))  # Nothing copied twice
+        self.assertEqual(len(drive.children[dest_id]), 1)
+
+    def test_sync_copies_only_missing_items(self):
+        drive = FakeDrive()
+        source_id = drive.add_folder('Source')
+        dest_id = drive.add_folder('Destination')
+        for i in range(3):
+            drive.add_item({'name': f'file-{i}.txt', 'mimeType': 'text/plain', 'size': '1'}, source_id)
+        drive.add_item({'name': 'file-0.txt', 'mimeType': 'text/plain', 'size': '1'}, dest_id)  # Already up to date
+
+        results = list(run_batch(3, [f'{source_id}:{dest_id}'], service_factory=lambda: drive, sync=True))
+
+        # Assertions
+        self.assertTrue(results[0]['ok'])
+        self.assertEqual((results[0]['copied'], results[0]['skipped'], results[0]['failed']), (2, 1, 0))
+        self.assertEqual(len(drive.children[dest_id]), 3)
+
+    def test_columnar_counts_match_the_tree(self):
+        drive = FakeDrive()
+        root_id = drive.add_folder('Root')
+        for i in range(3):
+            sub_id = drive.add_folder(f'Sub {i}', root_id)
+            for j in range(i + 1):
+                drive.add_item({'name': f'file-{j}.txt', 'mimeType': 'text/plain'}, sub_id)
+
+        tree_results = list(run_batch(2, [root_id], service_factory=lambda: drive))
+        columnar_results = list(run_batch(2, [root_id], service_factory=lambda: drive, columnar=True))
+
+        # Assertions
+        self.assertEqual(columnar_results, tree_results)
+        self.assertEqual((columnar_results[0]['total_files'], columnar_results[0]['total_folders']), (6, 3))
+
+if __name__ == '__main__':
+    unittest.main()
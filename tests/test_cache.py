@@ -0,0 +1,92 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+from gdrive.cache import MetadataCache, set_metadata_cache
+from tests.helpers import unthrottle
+from gdrive.utils import list_drive_files
+from gdrive.crawler import crawl_tree
+from gdrive.tree import TREE_FIELDS
+from benchmarks.fake_drive import FakeDrive
+
+class TestMetadataCache(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the mock service
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = MetadataCache(os.path.join(self.tmpdir.name, 'cache.sqlite3'), ttl=60)
+        self.items = [{'id': '1', 'name': 'file1.txt', 'mimeType': 'text/plain'}]
+
+    # Called after every test method
+    def tearDown(self):
+        set_metadata_cache(None)
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_get_returns_fresh_listing(self):
+        self.cache.put('folder', 'files(id)', self.items, '2024-01-01T00:00:00Z')
+
+        # Assertions
+        self.assertEqual(self.cache.get('folder', 'files(id)'), self.items)
+        self.assertEqual(self.cache.get('folder', 'files(id)', '2024-01-01T00:00:00Z'), self.items)
+        self.assertIsNone(self.cache.get('folder', 'files(id, name)'))  # Different projection
+        self.assertIsNone(self.cache.get('folder', 'files(id)', '2024-02-01T00:00:00Z'))  # Folder changed since
+
+    @patch('gdrive.cache.time.time')
+    def test_expired_listings_are_misses(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.cache.put('folder', 'files(id)', self.items)
+        mock_time.return_value = 1061.0
+
+        # Assertions
+        self.assertIsNone(self.cache.get('folder', 'files(id)'))
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self):
+        self.cache.max_bytes = 150
+        for folder_id in ('a', 'b', 'c'):
+            self.cache.put(folder_id, 'files(id)', self.items)
+        self.cache.get('a', 'files(id)')  # Make 'b' the least recently used
+
+        self.cache.evict()
+
+        # Assertions
+        self.assertIsNotNone(self.cache.get('a', 'files(id)'))
+        self.assertIsNone(self.cache.get('b', 'files(id)'))
+
+    def test_list_drive_files_uses_cache(self):
+        set_metadata_cache(self.cache)
+        service = MagicMock()
+        service.files().list().execute.return_value = {'files': self.items}
+        service.files().list.reset_mock()
+
+        first = list(list_drive_files(service, 'folder', 'files(id, name, mimeType)'))
+        second = list(list_drive_files(service, 'folder', 'files(id, name, mimeType)'))
+
+        # Assertions
+        self.assertEqual(first, self.items)
+        self.assertEqual(second, self.items)
+        self.assertEqual(service.files().list.call_count, 1)  # The repeat listing is answered locally
+
+    def test_destination_crawls_bypass_and_drop_cached_listings(self):
+        set_metadata_cache(self.cache)
+        drive = FakeDrive()
+        root_id = drive.add_folder('Destination')
+        sub_id = drive.add_folder('Sub', root_id)
+        drive.add_item({'id': 'old', 'name': 'old.txt', 'mimeType': 'text/plain'}, sub_id)
+        crawl_tree(drive, root_id, fields=TREE_FIELDS, workers=2, service_factory=lambda: drive, coalesce=True)
+        # Written to without changing the subfolder's modifiedTime, as Drive often does
+        drive.add_item({'id': 'new', 'name': 'new.txt', 'mimeType': 'text/plain'}, sub_id)
+
+        cached = crawl_tree(drive, root_id, fields=TREE_FIELDS, workers=2, service_factory=lambda: drive, coalesce=True)
+        fresh = crawl_tree(drive, root_id, fields=TREE_FIELDS, workers=2, service_factory=lambda: drive, coalesce=True,
+                           use_cache=False)
+
+        # Assertions
+        self.assertNotIn('new', cached.nodes)  # The stale listing a destination must not be read from
+        self.assertIn('new', fresh.nodes)
+        self.assertIsNone(self.cache.get(root_id, TREE_FIELDS))
+        self.assertIsNone(self.cache.get(sub_id, TREE_FIELDS))
+
+if __name__ == '__main__':
+    unittest.main()
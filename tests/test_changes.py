@@ -0,0 +1,165 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+from gdrive.tree import DriveTree
+from gdrive.changes import apply_changes, refresh_tree, save_snapshot, load_snapshot, load_or_crawl_snapshot
+from tests.helpers import unthrottle
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+def file(id, parent, mime_type='text/plain', **extra):
+    return {'id': id, 'name': f'{id}.txt', 'mimeType': mime_type, 'parents': [parent], **extra}
+
+class TestApplyChanges(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the mock service
+        # root -> (a, sub -> (b, inner -> c))
+        self.tree = DriveTree('root', 'Root')
+        self.tree.add_item({'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain'}, 'root')
+        self.tree.add_item({'id': 'sub', 'name': 'sub', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain'}, 'sub')
+        self.tree.add_item({'id': 'inner', 'name': 'inner', 'mimeType': FOLDER}, 'sub')
+        self.tree.add_item({'id': 'c', 'name': 'c.txt', 'mimeType': 'text/plain'}, 'inner')
+        self.tree.compute_aggregates()
+
+    def assert_counts_match_full_recount(self):
+        expected = {node_id: (node.file_count, node.folder_count, node.total_files, node.total_folders)
+                    for node_id, node in self.tree.nodes.items()}
+        self.tree.compute_aggregates()
+        actual = {node_id: (node.file_count, node.folder_count, node.total_files, node.total_folders)
+                  for node_id, node in self.tree.nodes.items()}
+        self.assertEqual(expected, actual)
+
+    def test_adds_removes_trashes_and_renames(self):
+        changes = [
+            {'fileId': 'd', 'file': file('d', 'inner')},
+            {'fileId': 'a', 'removed': True},
+            {'fileId': 'b', 'file': file('b', 'sub', trashed=True)},
+            {'fileId': 'c', 'file': dict(file('c', 'inner'), name='renamed.txt')},
+            {'fileId': 'elsewhere', 'file': file('elsewhere', 'other-folder')},  # Outside the snapshot
+        ]
+
+        entered = apply_changes(self.tree, changes)
+
+        # Assertions
+        self.assertEqual(entered, [])
+        self.assertNotIn('a', self.tree.nodes)
+        self.assertNotIn('b', self.tree.nodes)
+        self.assertNotIn('elsewhere', self.tree.nodes)
+        self.assertEqual(self.tree.nodes['c'].name, 'renamed.txt')
+        self.assertEqual(self.tree.nodes['inner'].children, ['c', 'd'])
+        self.assertEqual(self.tree.root.total_files, 2)
+        self.assertEqual(self.tree.root.total_folders, 2)
+        self.assert_counts_match_full_recount()
+
+    def test_moves_within_and_out_of_the_tree(self):
+        changes = [
+            {'fileId': 'inner', 'file': dict(file('inner', 'root'), mimeType=FOLDER)},
+            {'fileId': 'b', 'file': file('b', 'other-folder')},
+        ]
+
+        apply_changes(self.tree, changes)
+
+        # Assertions
+        self.assertEqual(self.tree.nodes['inner'].parent_id, 'root')
+        self.assertEqual(self.tree.root.children, ['a', 'sub', 'inner'])
+        self.assertNotIn('b', self.tree.nodes)  # Moved out of the folder
+        self.assertEqual(self.tree.nodes['sub'].total_files, 0)
+        self.assertEqual(self.tree.root.total_files, 2)
+        self.assert_counts_match_full_recount()
+
+    def test_new_folders_are_returned_for_listing(self):
+        # The child is reported before the folder it was created in
+        changes = [
+            {'fileId': 'e', 'file': file('e', 'new')},
+            {'fileId': 'new', 'file': dict(file('new', 'sub'), mimeType=FOLDER)},
+        ]
+
+        entered = apply_changes(self.tree, changes)
+
+        # Assertions
+        self.assertEqual(entered, ['new'])
+        self.assertEqual(self.tree.nodes['e'].parent_id, 'new')
+        self.assert_counts_match_full_recount()
+
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_refresh_lists_only_folders_moved_in(self, mock_list_drive_files):
+        mock_list_drive_files.side_effect = lambda service, folder_id, fields, **kwargs: iter(
+            [{'id': 'f', 'name': 'f.txt', 'mimeType': 'text/plain'}] if folder_id == 'moved' else []
+        )
+        service = MagicMock()
+        service.changes().list().execute.side_effect = [
+            {'changes': [], 'nextPageToken': 'page-2'},
+            {'changes': [{'fileId': 'moved', 'file': dict(file('moved', 'root'), mimeType=FOLDER)}],
+             'newStartPageToken': 'token-2'},
+        ]
+
+        new_token = refresh_tree(service, self.tree, 'token-1')
+
+        # Assertions
+        self.assertEqual(new_token, 'token-2')
+        mock_list_drive_files.assert_called_once()
+        self.assertEqual(self.tree.nodes['f'].parent_id, 'moved')
+        self.assertEqual(self.tree.root.total_files, 4)
+        self.assertEqual(self.tree.root.total_folders, 3)
+
+class TestSnapshot(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the mock service
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'snapshot.json')
+        self.tree = DriveTree('root', 'Root')
+        self.tree.add_item({'id': 'sub', 'name': 'sub', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain', 'size': '5'}, 'sub')
+        self.tree.compute_aggregates()
+
+    # Called after every test method
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        save_snapshot(self.tree, self.path, 'token-1')
+
+        tree, token = load_snapshot(self.path)
+
+        # Assertions
+        self.assertEqual(token, 'token-1')
+        self.assertEqual(tree.root.name, 'Root')
+        self.assertEqual(tree.folder_contents('sub'), self.tree.folder_contents('sub'))
+        self.assertEqual(tree.root.total_files, 1)
+
+    def test_crawls_once_then_refreshes(self):
+        service = MagicMock()
+        service.changes().getStartPageToken().execute.return_value = {'startPageToken': 'token-1'}
+        service.changes().list().execute.return_value = {'changes': [], 'newStartPageToken': 'token-2'}
+        crawl = MagicMock(return_value=self.tree)
+
+        first = load_or_crawl_snapshot(service, self.path, 'root', crawl)
+        second = load_or_crawl_snapshot(service, self.path, 'root', crawl)
+
+        # Assertions
+        crawl.assert_called_once()  # The second run only reads the changes
+        self.assertEqual(second.total_items(), first.total_items())
+        self.assertEqual(load_snapshot(self.path)[1], 'token-2')
+
+    def test_snapshot_with_other_fields_is_crawled_again(self):
+        service = MagicMock()
+        service.changes().getStartPageToken().execute.return_value = {'startPageToken': 'token-1'}
+        crawl = MagicMock(return_value=self.tree)
+        save_snapshot(self.tree, self.path, 'token-0', fields='files(id, name, mimeType)')
+
+        load_or_crawl_snapshot(service, self.path, 'root', crawl, fields='files(id, name, mimeType, size)')
+
+        # Assertions
+        crawl.assert_called_once()
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path, 'files(id, name, mimeType)')
+        self.assertEqual(load_snapshot(self.path, 'files(id, name, mimeType, size)')[1], 'token-1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import random
+from unittest.mock import patch
+from benchmarks.fake_drive import FakeDrive
+from gdrive.columnar import ColumnarTree, np
+from gdrive.crawler import crawl_columnar, crawl_tree
+from tests.helpers import unthrottle
+from gdrive.tree import DriveTree, TREE_FIELDS
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestColumnarTree(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        # A random tree of 2000 items, crawled the usual way
+        rng = random.Random(1)
+        self.tree = DriveTree('root', 'Root')
+        folders = ['root']
+        for i in range(2000):
+            folder = rng.random() < 0.2
+            item = {'id': f'i{i}', 'name': f'i{i}', 'mimeType': FOLDER if folder else 'text/plain'}
+            if not folder:
+                item['size'] = str(rng.randrange(1000))
+            self.tree.add_item(item, rng.choice(folders))
+            if folder:
+                folders.append(item['id'])
+        self.tree.compute_aggregates()
+        self.columnar = ColumnarTree.from_tree(self.tree)
+
+    def assert_matches_tree(self, rollups):
+        for node in [self.tree.root] + list(self.tree.walk()):
+            totals = rollups.totals(self.columnar.index[node.id])
+            if node.is_folder:
+                expected_bytes = sum(int(n.size or 0) for n in self.tree.walk(node.id))
+                self.assertEqual((totals['file_count'], totals['folder_count'], totals['total_files'], totals['total_folders']),
+                                 (node.file_count, node.folder_count, node.total_files, node.total_folders))
+            else:
+                expected_bytes = int(node.size)
+            self.assertEqual(totals['total_bytes'], expected_bytes)
+
+    def test_python_rollup_matches_the_tree(self):
+        # Assertions
+        self.assert_matches_tree(self.columnar.rollup(vectorized=False))
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_vectorized_rollup_matches_the_tree(self):
+        # Assertions
+        self.assert_matches_tree(self.columnar.rollup(vectorized=True))
+
+    def test_items_are_added_once(self):
+        tree = ColumnarTree('root')
+        tree.add_item({'id': 'sub', 'mimeType': FOLDER}, 'root')
+        first = tree.add_item({'id': 'doc', 'mimeType': 'application/vnd.google-apps.document', 'quotaBytesUsed': '7'}, 'sub')
+        again = tree.add_item({'id': 'doc', 'mimeType': 'application/vnd.google-apps.document'}, 'root')
+        totals = tree.rollup(vectorized=False).totals(0)
+
+        # Assertions
+        self.assertEqual(first, again)  # Seen through a second parent, still one node
+        self.assertEqual(list(tree.depth), [0, 1, 2])
+        self.assertEqual(totals, {'file_count': 0, 'folder_count': 1, 'total_files': 1, 'total_folders': 1, 'total_bytes': 7})
+
+    @patch('gdrive.columnar.np', None)  # NumPy not installed
+    def test_falls_back_to_python_without_numpy(self):
+        rollups = self.columnar.rollup()
+
+        # Assertions
+        self.assertEqual(rollups.totals(0)['total_files'], self.tree.root.total_files)
+        with self.assertRaises(ImportError):
+            self.columnar.rollup(vectorized=True)
+
+    def test_crawls_straight_into_columns(self):
+        unthrottle(self)  # Don't throttle the fake service
+        drive = FakeDrive()
+        root = drive.add_folder('root', folder_id='root')
+        for i in range(3):
+            sub = drive.add_folder(f'sub{i}', root)
+            for j in range(4):
+                drive.add_item({'name': f'f{j}.txt', 'mimeType': 'text/plain', 'size': str(j)}, sub)
+        shared = drive.add_item({'name': 'shared.txt', 'mimeType': 'text/plain', 'size': '5'}, root)
+        drive.add_item(dict(shared), sub)  # The same file in a second folder
+
+        tree = crawl_tree(drive, root, fields=TREE_FIELDS)
+        columnar = crawl_columnar(drive, root, fields=TREE_FIELDS, workers=2, service_factory=lambda: drive)
+        totals = columnar.rollup(vectorized=False).totals(0)
+
+        # Assertions
+        self.assertEqual(len(columnar) - 1, tree.total_items())
+        self.assertEqual((totals['total_files'], totals['total_folders'], totals['total_bytes']),
+                         (tree.root.total_files, tree.root.total_folders, 23))
+
+if __name__ == '__main__':
+    unittest.main()
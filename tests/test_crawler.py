@@ -0,0 +1,154 @@
+import unittest
+import io
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from gdrive.crawler import ConcurrentCrawler, crawl_tree
+from gdrive.utils import count_children_recursively
+from tests.helpers import unthrottle
+from gdrive.tree import DriveTree
+from benchmarks.fake_drive import FakeDrive
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+def make_listings(width, depth):
+    """Builds a synthetic tree where every folder holds `width` files and `width` subfolders."""
+    listings = {}
+    pending = [('root', 0)]
+    while pending:
+        folder_id, level = pending.pop()
+        items = [{'id': f'{folder_id}/f{i}', 'name': f'f{i}', 'mimeType': 'text/plain'} for i in range(width)]
+        if level < depth:
+            for i in range(width):
+                child_id = f'{folder_id}/d{i}'
+                items.append({'id': child_id, 'name': f'd{i}', 'mimeType': FOLDER})
+                pending.append((child_id, level + 1))
+        listings[folder_id] = items
+    return listings
+
+class TestConcurrentCrawler(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the mock services
+        self.listings = make_listings(width=3, depth=3)
+        self.services = []
+        self.lock = threading.Lock()
+
+    def service_factory(self):
+        with self.lock:
+            service = MagicMock()
+            self.services.append(service)
+            return service
+
+    def fake_list_drive_files(self, service, folder_id, fields, **kwargs):
+        return iter(self.listings[folder_id])
+
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_concurrent_totals_match_serial(self, mock_list_drive_files):
+        mock_list_drive_files.side_effect = self.fake_list_drive_files
+
+        serial = crawl_tree(MagicMock(), 'root')
+        concurrent = crawl_tree(MagicMock(), 'root', workers=4, service_factory=self.service_factory)
+
+        # Assertions
+        self.assertEqual(concurrent.root.total_files, serial.root.total_files)
+        self.assertEqual(concurrent.root.total_folders, serial.root.total_folders)
+        self.assertEqual(concurrent.total_items(), len(self.listings) - 1 + sum(
+            1 for items in self.listings.values() for item in items if item['mimeType'] != FOLDER))
+        # Children keep their listing order, so the tree walks identically
+        self.assertEqual([n.id for n in concurrent.walk()], [n.id for n in serial.walk()])
+
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_each_worker_gets_its_own_service(self, mock_list_drive_files):
+        used = {}
+
+        def record(service, folder_id, fields, **kwargs):
+            used.setdefault(threading.get_ident(), set()).add(id(service))
+            return iter(self.listings[folder_id])
+
+        mock_list_drive_files.side_effect = record
+
+        ConcurrentCrawler(self.service_factory, workers=4).crawl('root')
+
+        # Assertions
+        self.assertLessEqual(len(self.services), 4)
+        for services in used.values():
+            self.assertEqual(len(services), 1)  # A thread never switches service objects
+        self.assertEqual(len(set().union(*used.values())), len(used))  # No two threads share a service
+
+    @patch('gdrive.utils.list_drive_files_in_folders')
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_coalesced_crawl_matches_serial(self, mock_list_drive_files, mock_list_drive_files_in_folders):
+        mock_list_drive_files.side_effect = self.fake_list_drive_files
+        mock_list_drive_files_in_folders.side_effect = lambda service, folder_ids, fields, **kwargs: iter(
+            [(folder_id, item) for folder_id in folder_ids for item in self.listings[folder_id]])
+
+        serial = crawl_tree(MagicMock(), 'root')
+        serial_calls = mock_list_drive_files.call_count
+        mock_list_drive_files.reset_mock()
+        coalesced = crawl_tree(MagicMock(), 'root', workers=2, service_factory=self.service_factory, coalesce=True)
+
+        # Assertions
+        self.assertEqual(coalesced.root.total_files, serial.root.total_files)
+        self.assertEqual(coalesced.root.total_folders, serial.root.total_folders)
+        self.assertEqual(sorted(n.id for n in coalesced.walk()), sorted(n.id for n in serial.walk()))
+        coalesced_calls = mock_list_drive_files.call_count + mock_list_drive_files_in_folders.call_count
+        self.assertLess(coalesced_calls, serial_calls)
+
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_tree_output_is_deterministic(self, mock_list_drive_files):
+        mock_list_drive_files.side_effect = self.fake_list_drive_files
+
+        with patch('sys.stdout', new_callable=io.StringIO) as serial_output:  # Capture the tree output
+            count_children_recursively(MagicMock(), 'root', 'Root')
+        with patch('sys.stdout', new_callable=io.StringIO) as concurrent_output:
+            count_children_recursively(MagicMock(), 'root', 'Root', workers=4, service_factory=self.service_factory)
+
+        # Assertions
+        self.assertTrue(serial_output.getvalue())
+        self.assertEqual(concurrent_output.getvalue(), serial_output.getvalue())
+
+    def test_coalesced_tree_does_not_depend_on_listing_speed(self):
+        drive = FakeDrive()
+        folders = ['root']
+        drive.add_folder('Root', folder_id='root')
+        for i in range(40):
+            parent_id = folders[i // 3]
+            # Added in reverse name order, so only the listing order puts them in name order
+            drive.add_item({'id': f'file-{i}', 'name': f'z{40 - i}.txt', 'mimeType': 'text/plain'}, parent_id)
+            folders.append(drive.add_folder(f'y{40 - i}', parent_id))
+        # An item with two parents, in two folders that are listed at the same time
+        drive.add_item({'id': 'shared', 'name': 'shared.txt', 'mimeType': 'text/plain'}, folders[1])
+        drive.items['shared']['parents'].append(folders[2])
+        drive.children[folders[2]].append('shared')
+
+        def layout(tree):
+            return [(node.id, node.parent_id) for node in tree.walk()]
+
+        serial = DriveTree.build(drive, 'root', 'Root')
+        first_parent = serial.nodes['shared'].parent_id
+
+        class SlowDrive:
+            # Lists the folder the serial crawl placed the shared item in more slowly than the others
+            def files(self):
+                files = drive.files()
+
+                def list_files(**params):
+                    request = files.list(**params)
+                    if f"'{first_parent}' in parents" in params['q']:
+                        execute = request.execute
+                        request.execute = lambda: time.sleep(0.05) or execute()
+                    return request
+                return MagicMock(list=list_files)
+
+        runs = [crawl_tree(drive, 'root', 'Root', workers=workers, service_factory=SlowDrive, coalesce=True)
+                for workers in (1, 3, 8)]
+
+        # Assertions
+        for tree in runs:
+            self.assertEqual(layout(tree), layout(serial))
+        self.assertEqual([node.name for node in serial.children('root')][:2], ['y38', 'y39'])  # Folders first, by name
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+from googleapiclient.errors import HttpError
+from benchmarks.fake_drive import FakeDrive, parse_fields
+from benchmarks.run import run_suite
+from benchmarks.trees import SHAPES
+from gdrive.batch import execute_batch
+from gdrive.changes import get_start_page_token, refresh_tree
+from gdrive.crawler import crawl_tree
+from gdrive.retry import configure_rate_limit, get_rate_limiter, set_rate_limiter
+from gdrive.utils import list_drive_files, list_drive_files_in_folders, execute_with_retry
+from tests.helpers import unthrottle
+
+class TestFakeDrive(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        self.drive = FakeDrive()
+        self.root = self.drive.add_folder('root', folder_id='root')
+        self.sub = self.drive.add_folder('sub', self.root, folder_id='sub')
+        for i in range(5):
+            self.drive.add_item({'id': f'f{i}', 'name': f'f{i}.txt', 'mimeType': 'text/plain', 'size': '1'}, self.root)
+        self.drive.add_item({'id': 's0', 'name': 's0.txt', 'mimeType': 'text/plain'}, self.sub)
+
+    def test_parse_fields(self):
+        # Assertions
+        self.assertEqual(parse_fields('nextPageToken, files(id, parents)'),
+                         {'nextPageToken': None, 'files': {'id': None, 'parents': None}})
+        self.assertIsNone(parse_fields(None))
+
+    def test_list_paginates_and_projects_fields(self):
+        items = list(list_drive_files(self.drive, self.root, 'files(id, name)', page_size=2))
+
+        # Assertions
+        self.assertEqual([item['id'] for item in items], ['sub', 'f0', 'f1', 'f2', 'f3', 'f4'])
+        self.assertEqual(set(items[1]), {'id', 'name'})
+        self.assertEqual(self.drive.calls['files.list'], 3)
+
+    def test_coalesced_parents_query(self):
+        items = list(list_drive_files_in_folders(self.drive, [self.root, self.sub], 'files(id)'))
+
+        # Assertions
+        self.assertIn(('sub', {'id': 's0', 'parents': ['sub']}), items)
+        self.assertEqual(len(items), 7)
+        self.assertEqual(self.drive.calls['files.list'], 1)
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    def test_batch_retries_injected_errors(self, mock_sleep):
+        self.drive.fail_next(429)
+        requests = {i: self.drive.files().copy(fileId=f'f{i}', body={'parents': [self.sub]}) for i in range(3)}
+
+        results, errors = execute_batch(self.drive, requests)
+
+        # Assertions
+        self.assertEqual(len(results), 3)
+        self.assertEqual(errors, {})
+        self.assertEqual(self.drive.calls['batch'], 2)  # The rate-limited call went out in a second batch
+        self.assertEqual(self.drive.errors[429], 1)
+        self.assertEqual(len(self.drive.children[self.sub]), 4)
+
+    @patch('gdrive.utils.time.sleep')  # Skip the backoff delays
+    def test_quota_returns_rate_limit_errors(self, mock_sleep):
+        drive = FakeDrive(quota_qps=1)
+        drive.add_folder('root', folder_id='root')
+        execute_with_retry(drive.files().get(fileId='root'))
+
+        with self.assertRaises(HttpError) as context:
+            drive.call('files.get', {'fileId': 'root'})
+
+        # Assertions
+        self.assertEqual(context.exception.resp.status, 403)
+        self.assertIn(b'userRateLimitExceeded', context.exception.content)
+
+    def test_changes_refresh_a_snapshot(self):
+        tree = crawl_tree(self.drive, self.root)
+        token = get_start_page_token(self.drive)
+        self.drive.files().create(body={'name': 'new', 'mimeType': 'text/plain', 'parents': [self.sub]}).execute()
+        self.drive.files().update(fileId='f0', body={'trashed': True}).execute()
+
+        token = refresh_tree(self.drive, tree, token)
+
+        # Assertions
+        self.assertNotIn('f0', tree.nodes)
+        self.assertEqual(tree.root.total_files, 6)
+        self.assertEqual(token, '2')
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_every_shape_and_assessment_runs_offline(self):
+        self.addCleanup(set_rate_limiter, get_rate_limiter())
+        limiter = configure_rate_limit(10)
+        results = run_suite(sorted(SHAPES), [1, 2, 3], workers=4, error_rate=0.02)
+
+        # Assertions
+        self.assertIs(get_rate_limiter(), limiter)  # The suite's unthrottled limiter does not leak into later code
+        self.assertEqual(len(results), 9)
+        for result in results:
+            self.assertGreater(result['items'], 0)
+            self.assertGreater(result['api_calls'], 0)
+        wide = {r['assessment']: r for r in results if r['shape'] == 'wide'}
+        self.assertEqual(wide[2]['items'], 220)
+        self.assertLess(wide[2]['round_trips'], 21)  # Coalescing lists the 21 folders in fewer calls
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from benchmarks.fake_drive import FakeDrive
+from benchmarks.memory import measure_memory
+from gdrive.fields import COUNT_FIELDS, TREE_FIELDS, item_fields, page_fields
+from tests.helpers import unthrottle
+from gdrive.utils import count_files_and_folders, list_drive_files
+
+class TestFields(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        self.drive = FakeDrive()
+        self.root = self.drive.add_folder('root', folder_id='root')
+        self.drive.add_folder('sub', self.root)
+        for i in range(3):
+            self.drive.add_item({'id': f'f{i}', 'name': f'f{i}.txt', 'mimeType': 'text/plain', 'size': '1'}, self.root)
+
+    def test_page_fields_adds_what_pagination_needs(self):
+        # Assertions
+        self.assertEqual(item_fields(TREE_FIELDS), ['id', 'name', 'mimeType', 'size', 'modifiedTime', 'md5Checksum'])
+        self.assertEqual(page_fields(COUNT_FIELDS), 'nextPageToken, files(mimeType)')
+        self.assertEqual(page_fields(COUNT_FIELDS, parents=True), 'nextPageToken, files(parents, mimeType)')
+        self.assertEqual(page_fields('nextPageToken, files(parents, id)', parents=True), 'nextPageToken, files(parents, id)')
+
+    def test_counting_requests_only_the_mime_type(self):
+        counts = count_files_and_folders(self.drive, self.root)
+        items = list(list_drive_files(self.drive, self.root, COUNT_FIELDS, page_size=2))
+
+        # Assertions
+        self.assertEqual(counts, (3, 1))
+        self.assertEqual(len(items), 4)  # Paginated through both pages
+        self.assertEqual({tuple(item) for item in items}, {('mimeType',)})
+
+    def test_tree_nodes_hold_less_than_raw_items(self):
+        result = measure_memory(2000)
+
+        # Assertions
+        self.assertLess(result['node_bytes_per_item'], result['dict_bytes_per_item'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+from gdrive.journal import CopyJournal, FAILED
+from gdrive.pipeline import copy_tree_pipelined
+from gdrive.tree import DriveTree
+from tests.helpers import unthrottle, request, FakeService
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestCopyJournal(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'journal.sqlite3')
+        self.tree = DriveTree('root')
+        self.tree.add_item({'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain'}, 'root')
+        self.tree.add_item({'id': 'sub', 'name': 'sub', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain'}, 'sub')
+        self.tree.compute_aggregates()
+
+    # Called after every test method
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_survive_reopening(self):
+        journal = CopyJournal(self.path)
+        journal.start('root', 'dest', self.tree)
+        journal.record('a', 'copy-a')
+        journal.record('sub', None, FAILED)
+        journal.close()
+
+        journal = CopyJournal(self.path)
+
+        # Assertions
+        self.assertEqual(journal.completed(), {'a': 'copy-a'})  # Failed items are retried on resume
+        self.assertEqual(journal.load_plan('root', 'dest').total_items(), 3)
+        self.assertIsNone(journal.load_plan('root', 'other-dest'))
+        journal.close()
+
+    def test_failure_does_not_overwrite_copy(self):
+        journal = CopyJournal(self.path)
+        journal.record('a', 'copy-a')
+        journal.flush()
+        journal.record('a', None, FAILED)
+
+        # Assertions
+        self.assertEqual(journal.completed(), {'a': 'copy-a'})
+        journal.close()
+
+    @patch('gdrive.journal.FLUSH_EVERY', 2)
+    def test_records_are_committed_in_batches(self):
+        journal = CopyJournal(self.path)
+        reader = CopyJournal(self.path)
+        journal.record('a', 'copy-a')
+
+        # Assertions
+        self.assertEqual(reader.completed(), {})  # Still buffered
+        journal.record('b', 'copy-b')
+        self.assertEqual(reader.completed(), {'a': 'copy-a', 'b': 'copy-b'})
+        journal.close()
+        reader.close()
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    @patch('gdrive.pipeline.copy_file_request', side_effect=request)
+    @patch('gdrive.pipeline.create_folder_request', side_effect=request)
+    def test_resumed_copy_skips_completed_items(self, mock_create_folder_request, mock_copy_file_request, mock_sleep):
+        journal = CopyJournal(self.path)
+        journal.start('root', 'dest', self.tree)
+        journal.record('sub', 'existing-sub')  # Created by the interrupted run
+        service = FakeService()
+        worker_service = FakeService()
+
+        copied = copy_tree_pipelined(service, self.tree, 'dest', journal=journal, workers=1,
+                                     service_factory=lambda: worker_service)
+
+        # Assertions
+        self.assertEqual(copied, 2)
+        self.assertEqual(service.executed, [])  # The only folder is reused, not created again
+        self.assertEqual(worker_service.executed, [{'key': 'a', 'parent': 'dest'}, {'key': 'b', 'parent': 'existing-sub'}])
+        self.assertEqual(journal.completed(), {'a': 'new-a', 'sub': 'existing-sub', 'b': 'new-b'})
+        journal.close()
+
+if __name__ == '__main__':
+    unittest.main()
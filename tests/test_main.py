@@ -0,0 +1,98 @@
+import unittest
+import io
+from contextlib import redirect_stderr
+from unittest.mock import patch
+from main import main, parse_args, GDriveReportingTool
+
+class TestParseArgs(unittest.TestCase):
+
+    def test_backend_defaults_to_threads(self):
+        # Assertions
+        self.assertEqual(parse_args([]).backend, 'threads')
+        self.assertEqual(parse_args(['--backend', 'asyncio']).backend, 'asyncio')
+
+    def test_top_must_be_positive(self):
+        # Assertions
+        self.assertEqual(parse_args(['--top', '3']).top, 3)
+        for value in ('0', '-1', 'ten'):
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                parse_args(['--top', value])
+
+    def test_counts_and_limits_must_be_positive(self):
+        # Assertions
+        for option in ('--concurrency', '--pool-size', '--frontier-limit'):
+            for value in ('0', '-3'):
+                with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                    parse_args([option, value])
+
+    def test_interactive_options_are_rejected_in_batch_mode(self):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):
+            parse_args(['--assessment', '2', '--roots', 'a', '--snapshot', 'tree.json', '--quiet'])
+
+        # Assertions
+        self.assertIn('--snapshot, --quiet cannot be combined with --assessment', stderr.getvalue())
+
+    @patch('main.batch_runner.print_results', return_value=(1, 0))
+    @patch('main.batch_runner.run_batch')
+    def test_batch_mode_receives_the_crawl_and_sync_options(self, mock_run_batch, mock_print_results):
+        with patch('sys.stderr', new_callable=io.StringIO):
+            main(['--assessment', '3', '--roots', 'a:b', '--sync', '--native-policy', 'always', '--flat-scan',
+                  '--drive-id', 'drive'])
+
+        # Assertions
+        options = mock_run_batch.call_args.kwargs
+        self.assertEqual((options['sync'], options['native_policy']), (True, 'always'))
+        self.assertEqual((options['flat_scan'], options['drive_id'], options['backend']), (True, 'drive', 'threads'))
+
+    @patch('main.importlib.util.find_spec', return_value=None)
+    def test_asyncio_backend_needs_aiohttp(self, mock_find_spec):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):
+            parse_args(['--backend', 'asyncio'])
+
+        # Assertions
+        mock_find_spec.assert_called_once_with('aiohttp')
+        self.assertIn('requires aiohttp', stderr.getvalue())
+
+    @patch('reports.count_source.count_files')
+    @patch('builtins.input', side_effect=['1', 'folder', 'no'])
+    def test_flat_scan_reaches_the_assessments(self, mock_input, mock_count_files):
+        args = parse_args(['--flat-scan', '--drive-id', 'drive'])
+        tool = GDriveReportingTool(flat_scan=args.flat_scan, drive_id=args.drive_id)
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            tool.run_assessment()
+
+        # Assertions
+        mock_count_files.assert_called_once_with('folder', flat_scan=True, drive_id='drive')
+
+    def test_columnar_rejects_tree_options(self):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):
+            parse_args(['--columnar', '--manifest', 'items.csv', '--flat-scan'])
+
+        # Assertions
+        self.assertIn('--columnar cannot be combined with --manifest, --flat-scan', stderr.getvalue())
+
+    @patch('reports.count_recursive.crawl_columnar')
+    @patch('reports.count_recursive.count_children_recursively')
+    @patch('reports.count_recursive.execute_with_retry', return_value={'name': 'Team'})
+    @patch('reports.count_recursive.GDriveAuth')
+    @patch('builtins.input', side_effect=['2', 'folder', 'no'])
+    def test_columnar_counts_interactive_assessment_2(self, mock_input, mock_auth, mock_execute_with_retry,
+                                                      mock_count_children_recursively, mock_crawl_columnar):
+        mock_crawl_columnar.return_value.rollup.return_value.totals.return_value = {'total_files': 7, 'total_folders': 2}
+        tool = GDriveReportingTool(columnar=parse_args(['--columnar']).columnar)
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            tool.run_assessment()
+
+        # Assertions
+        mock_count_children_recursively.assert_not_called()  # No DriveTree is built or printed
+        self.assertEqual(mock_crawl_columnar.call_args.args[1:3], ('folder', 'Team'))
+        total_line = next(line for line in stdout.getvalue().splitlines() if 'excluding root folder' in line)
+        self.assertTrue(total_line.endswith('9'))
+
+if __name__ == '__main__':
+    unittest.main()
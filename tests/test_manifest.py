@@ -0,0 +1,62 @@
+import unittest
+import csv
+import gzip
+import json
+import os
+import tempfile
+from gdrive.manifest import write_manifest, manifest_format
+from gdrive.tree import DriveTree
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestManifest(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        # Root -> (a.txt, sub -> (b.txt))
+        self.tree = DriveTree('root', 'Root')
+        self.tree.add_item({'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain', 'size': '10', 'md5Checksum': 'aaa'}, 'root')
+        self.tree.add_item({'id': 'sub', 'name': 'sub', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain', 'size': '20',
+                            'modifiedTime': '2024-01-01T00:00:00.000Z'}, 'sub')
+        self.tree.compute_aggregates()
+
+    # Called after every test method
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_jsonl_gzip_manifest(self):
+        path = os.path.join(self.tmpdir.name, 'manifest.jsonl.gz')
+
+        written = write_manifest(self.tree, path)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+
+        # Assertions
+        self.assertEqual(written, 5)  # Three items and two folder rollups
+        self.assertEqual([r['path'] for r in records[:3]], ['Root/a.txt', 'Root/sub', 'Root/sub/b.txt'])
+        self.assertEqual(records[2]['parent_id'], 'sub')
+        self.assertEqual(records[0]['md5Checksum'], 'aaa')
+        self.assertEqual(records[3], {
+            'record': 'folder_rollup', 'id': 'root', 'parent_id': None, 'path': 'Root', 'mimeType': FOLDER,
+            'file_count': 1, 'folder_count': 1, 'total_files': 2, 'total_folders': 1,
+        })
+
+    def test_csv_manifest(self):
+        path = os.path.join(self.tmpdir.name, 'manifest.csv')
+
+        write_manifest(self.tree, path)
+
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        # Assertions
+        self.assertEqual(manifest_format(path), 'csv')
+        self.assertEqual(rows[2]['modifiedTime'], '2024-01-01T00:00:00.000Z')
+        self.assertEqual(rows[4]['record'], 'folder_rollup')
+        self.assertEqual(rows[4]['total_files'], '1')
+
+if __name__ == '__main__':
+    unittest.main()
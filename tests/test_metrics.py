@@ -0,0 +1,105 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from benchmarks.fake_drive import FakeDrive
+from gdrive.batch import execute_batch
+from gdrive.metrics import ApiMetrics, get_metrics, reset_metrics, write_metrics, request_method
+from tests.helpers import unthrottle
+from gdrive.utils import execute_with_retry
+
+class TestApiMetrics(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        self.metrics = reset_metrics()
+        self.drive = FakeDrive()
+        self.drive.add_folder('root', folder_id='root')
+        for i in range(3):
+            self.drive.add_item({'id': f'f{i}', 'name': f'f{i}.txt', 'mimeType': 'text/plain'}, 'root')
+
+    def test_histogram_and_percentiles(self):
+        metrics = ApiMetrics()
+        for seconds in (0.01, 0.02, 0.2, 3.0):
+            metrics.record_call('files.list', seconds)
+        stats = metrics.methods['files.list']
+
+        # Assertions
+        self.assertEqual(stats.buckets[0], 2)  # Both calls under 25 ms
+        self.assertEqual(stats.timed_calls, 4)
+        self.assertLessEqual(stats.percentile(0.5), 0.025)
+        self.assertEqual(stats.percentile(1.0), 3.0)  # Capped at the slowest call
+
+    @patch('gdrive.utils.time.sleep')  # Skip the backoff delays
+    def test_execute_with_retry_records_calls_retries_and_quota_errors(self, mock_sleep):
+        self.drive.fail_next(403, reason='userRateLimitExceeded')
+        self.drive.fail_next(503)
+
+        response = execute_with_retry(self.drive.files().get(fileId='f0', fields='id, name'))
+
+        stats = get_metrics().methods['files.get']
+        # Assertions
+        self.assertEqual(response, {'id': 'f0', 'name': 'f0.txt'})
+        self.assertEqual((stats.calls, stats.errors, stats.retries, stats.quota_errors), (3, 2, 2, 1))
+        self.assertEqual(stats.timed_calls, 3)
+        self.assertGreater(stats.bytes_received, 0)
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    def test_batches_count_sub_requests_and_time_round_trips(self, mock_sleep):
+        self.drive.fail_next(429)
+        requests = {i: self.drive.files().copy(fileId=f'f{i}', body={'parents': ['root']}) for i in range(3)}
+
+        execute_batch(self.drive, requests)
+
+        methods = get_metrics().methods
+        # Assertions
+        self.assertEqual(methods['batch'].timed_calls, 2)
+        self.assertEqual(methods['files.copy'].calls, 4)
+        self.assertEqual(methods['files.copy'].timed_calls, 0)  # Sub-requests share the batch's round trip
+        self.assertEqual(methods['files.copy'].retries, 1)
+        self.assertEqual(methods['files.copy'].quota_errors, 1)
+
+    def test_request_method_names(self):
+        request = type('Request', (), {'methodId': 'drive.files.list', 'method': 'GET'})()
+
+        # Assertions
+        self.assertEqual(request_method(request), 'files.list')
+        self.assertEqual(request_method(self.drive.changes().list(pageToken='1')), 'changes.list')
+        self.assertEqual(request_method({'key': 'a'}), 'unknown')
+
+    def test_exports_json_and_prometheus(self):
+        self.metrics.record_call('files.list', 0.03, bytes_received=100)
+        self.metrics.record_retry('files.list')
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = os.path.join(tmpdir, 'metrics.json')
+            prom_path = os.path.join(tmpdir, 'metrics.prom')
+            write_metrics(self.metrics, json_path)
+            write_metrics(self.metrics, prom_path)
+            with open(json_path) as f:
+                exported = json.load(f)
+            with open(prom_path) as f:
+                textfile = f.read()
+
+        # Assertions
+        self.assertEqual(exported['files.list']['retries'], 1)
+        self.assertEqual(exported['files.list']['bytes_received'], 100)
+        self.assertIn('gdrive_api_calls_total{method="files.list"} 1', textfile)
+        self.assertIn('gdrive_api_latency_seconds_bucket{method="files.list",le="0.025"} 0', textfile)
+        self.assertIn('gdrive_api_latency_seconds_bucket{method="files.list",le="+Inf"} 1', textfile)
+
+    def test_summary_table(self):
+        self.metrics.record_call('files.list', 0.05)
+        out = io.StringIO()
+
+        self.metrics.print_summary(out)
+
+        # Assertions
+        self.assertIn('files.list', out.getvalue())
+        self.assertIn('p95 ms', out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
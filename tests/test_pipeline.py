@@ -0,0 +1,70 @@
+import unittest
+import threading
+from unittest.mock import patch
+from gdrive.pipeline import copy_tree_pipelined
+from gdrive.tree import DriveTree
+from tests.helpers import unthrottle, http_error, request, FakeService
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestCopyPipeline(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        # root -> (a, sub -> (b, inner -> (c)))
+        self.tree = DriveTree('root')
+        self.tree.add_item({'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain'}, 'root')
+        self.tree.add_item({'id': 'sub', 'name': 'sub', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain'}, 'sub')
+        self.tree.add_item({'id': 'inner', 'name': 'inner', 'mimeType': FOLDER}, 'sub')
+        self.tree.add_item({'id': 'c', 'name': 'c.txt', 'mimeType': 'text/plain'}, 'inner')
+        self.tree.compute_aggregates()
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    @patch('gdrive.pipeline.copy_file_request', side_effect=request)
+    @patch('gdrive.pipeline.create_folder_request', side_effect=request)
+    def test_copies_files_into_created_folders(self, mock_create_folder_request, mock_copy_file_request, mock_sleep):
+        service = FakeService()
+        worker_service = FakeService()
+        copied_ids = []
+
+        copied = copy_tree_pipelined(service, self.tree, 'dest', on_copied=lambda node: copied_ids.append(node.id),
+                                     workers=4, service_factory=lambda: worker_service)
+
+        # Assertions
+        self.assertEqual(copied, 5)
+        self.assertEqual(sorted(copied_ids), ['a', 'b', 'c', 'inner', 'sub'])
+        self.assertEqual(service.executed, [{'key': 'sub', 'parent': 'dest'}, {'key': 'inner', 'parent': 'new-sub'}])  # Folders only
+        self.assertCountEqual(worker_service.executed, [
+            {'key': 'a', 'parent': 'dest'},
+            {'key': 'b', 'parent': 'new-sub'},
+            {'key': 'c', 'parent': 'new-inner'},
+        ])
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    @patch('gdrive.pipeline.copy_file_request', side_effect=request)
+    @patch('gdrive.pipeline.create_folder_request', side_effect=request)
+    def test_failed_folders_are_not_descended(self, mock_create_folder_request, mock_copy_file_request, mock_sleep):
+        service = FakeService(failures={'sub': [http_error(403)]})
+        worker_service = FakeService()
+        failed_ids = []
+        threads = set()
+
+        def on_error(node, error):
+            failed_ids.append(node.id)
+
+        def on_copied(node):
+            threads.add(threading.current_thread().name)
+
+        copied = copy_tree_pipelined(service, self.tree, 'dest', on_copied=on_copied, on_error=on_error,
+                                     workers=2, service_factory=lambda: worker_service)
+
+        # Assertions
+        self.assertEqual(copied, 1)  # Only a.txt
+        self.assertEqual(failed_ids, ['sub'])
+        self.assertEqual(worker_service.executed, [{'key': 'a', 'parent': 'dest'}])
+        self.assertTrue(all(name.startswith('drive-copier') for name in threads))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from google.oauth2.credentials import Credentials
+from gdrive.pool import ServicePool, ThreadServices, share_credentials
+
+class TestSharedCredentials(unittest.TestCase):
+
+    def test_concurrent_workers_refresh_an_expired_token_once(self):
+        creds = Credentials(token='expired', refresh_token='refresh_token_value')
+        creds.expiry = datetime.utcnow() - timedelta(minutes=5)
+        refreshes = []
+
+        def fake_refresh(request):
+            refreshes.append(request)
+            threading.Event().wait(0.05)  # Hold the lock while the other workers pile up
+            creds.token = 'fresh'
+            creds.expiry = datetime.utcnow() + timedelta(hours=1)
+
+        creds.refresh = fake_refresh
+        share_credentials(creds)
+        barrier = threading.Barrier(32)
+
+        def send_request(_):
+            headers = {}
+            barrier.wait()
+            # The same call an authorized transport makes before every request
+            creds.before_request(MagicMock(), 'GET', 'https://www.googleapis.com/drive/v3/files', headers)
+            return headers['authorization']
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            authorizations = list(executor.map(send_request, range(32)))
+
+        # Assertions
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(set(authorizations), {'Bearer fresh'})
+
+    def test_sharing_twice_keeps_one_lock(self):
+        creds = MagicMock()
+
+        share_credentials(creds)
+        locked_refresh = creds.refresh
+        share_credentials(creds)
+
+        # Assertions
+        self.assertIs(creds.refresh, locked_refresh)
+
+class TestServicePool(unittest.TestCase):
+
+    def test_clients_are_reused_and_never_shared(self):
+        pool = ServicePool(MagicMock(side_effect=lambda: object()), size=8)
+        in_use = set()
+        lock = threading.Lock()
+        overlaps = []
+
+        def work(_):
+            with pool.lease() as service:
+                with lock:
+                    if id(service) in in_use:
+                        overlaps.append(service)
+                    in_use.add(id(service))
+                threading.Event().wait(0.001)
+                with lock:
+                    in_use.discard(id(service))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(200)))
+
+        # Assertions
+        self.assertEqual(overlaps, [])
+        self.assertLessEqual(pool.built, 8)  # Never more clients than concurrent workers
+
+    def test_keeps_at_most_size_idle_clients(self):
+        pool = ServicePool(MagicMock(side_effect=lambda: object()), size=2)
+        services = [pool.acquire() for _ in range(5)]
+
+        for service in services:
+            pool.release(service)
+
+        # Assertions
+        self.assertEqual(pool.built, 5)
+        self.assertEqual(len(pool._idle), 2)
+        self.assertIn(pool.acquire(), services)
+
+    def test_thread_services_return_clients_to_the_pool(self):
+        pool = ServicePool(MagicMock(side_effect=lambda: object()), size=8)
+        services = ThreadServices(pool)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            used = set(executor.map(lambda _: id(services.get()), range(50)))
+        services.close()
+        # A later stage picks up the same clients instead of building new ones
+        second = ThreadServices(pool)
+        reused = id(second.get())
+
+        # Assertions
+        self.assertLessEqual(len(used), 4)
+        self.assertEqual(pool.built, len(used))
+        self.assertIn(reused, used)
+
+if __name__ == '__main__':
+    unittest.main()
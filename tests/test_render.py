@@ -0,0 +1,55 @@
+import unittest
+import io
+from gdrive.render import TreeRenderer
+from gdrive.tree import DriveTree
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestTreeRenderer(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        # Root -> (a.txt, sub -> (b.txt, inner -> (c.txt)), other)
+        self.tree = DriveTree('root', 'Root')
+        self.tree.add_item({'id': 'sub', 'name': 'sub', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain', 'webViewLink': 'http://a'}, 'root')
+        self.tree.add_item({'id': 'other', 'name': 'other', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain'}, 'sub')
+        self.tree.add_item({'id': 'inner', 'name': 'inner', 'mimeType': FOLDER}, 'sub')
+        self.tree.add_item({'id': 'c', 'name': 'c.txt', 'mimeType': 'text/plain'}, 'inner')
+        self.tree.compute_aggregates()
+
+    def render(self, **options):
+        out = io.StringIO()
+        TreeRenderer(out=out, **options).render(self.tree)
+        return out.getvalue().splitlines()
+
+    def test_files_before_subfolders_in_listing_order(self):
+        lines = self.render(hyperlinks=False, buffer_lines=2)
+
+        # Assertions
+        self.assertEqual([line.split(' (')[0] for line in lines], [
+            '📂 Root',
+            '    📄 a.txt',
+            '    📂 sub',
+            '        📄 b.txt',
+            '        📂 inner',
+            '            📄 c.txt',
+            '    📂 other',
+        ])
+        self.assertEqual(lines[1], '    📄 a.txt (ID: a) - http://a')
+        self.assertEqual(lines[0], '📂 Root (ID: root, Folders: 2, Files: 1)')
+
+    def test_depth_limit_and_folders_only(self):
+        lines = self.render(max_depth=1, folders_only=True)
+
+        # Assertions
+        self.assertEqual([line.split(' (')[0] for line in lines], ['📂 Root', '    📂 sub', '    📂 other'])
+
+    def test_hyperlinks_and_quiet(self):
+        # Assertions
+        self.assertIn('\033]8;;http://a\033\\webViewLink', self.render()[1])
+        self.assertEqual(self.render(quiet=True), [])
+
+if __name__ == '__main__':
+    unittest.main()
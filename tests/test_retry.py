@@ -0,0 +1,99 @@
+import unittest
+import json
+import httplib2
+from unittest.mock import patch, MagicMock
+from googleapiclient.errors import HttpError
+from gdrive.retry import TokenBucket, is_retryable_error, is_rate_limit_error, retry_after_seconds
+from gdrive.utils import execute_with_retry
+from tests.helpers import unthrottle
+
+def http_error(status, reason=None, headers=None):
+    content = json.dumps({'error': {'code': status, 'errors': [{'reason': reason}] if reason else []}}).encode()
+    return HttpError(httplib2.Response({'status': status, **(headers or {})}), content, uri='http://mock.url')
+
+class TestRetryPolicy(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the mock requests
+
+    def test_classifies_errors(self):
+        # Assertions
+        self.assertTrue(is_retryable_error(http_error(429)))
+        self.assertTrue(is_retryable_error(http_error(503)))
+        self.assertTrue(is_retryable_error(http_error(403, 'userRateLimitExceeded')))
+        self.assertTrue(is_retryable_error(http_error(403, 'rateLimitExceeded')))
+        self.assertTrue(is_retryable_error(ConnectionResetError()))
+        self.assertFalse(is_retryable_error(http_error(403, 'insufficientFilePermissions')))
+        self.assertFalse(is_retryable_error(http_error(404, 'notFound')))
+        self.assertFalse(is_retryable_error(ValueError('bad folder id')))
+        self.assertTrue(is_rate_limit_error(http_error(403, 'userRateLimitExceeded')))
+        self.assertFalse(is_rate_limit_error(http_error(500)))
+
+    def test_retry_after_seconds(self):
+        # Assertions
+        self.assertEqual(retry_after_seconds(http_error(429, headers={'retry-after': '7'})), 7.0)
+        self.assertEqual(retry_after_seconds(http_error(429, headers={'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'})), 0.0)
+        self.assertIsNone(retry_after_seconds(http_error(429)))
+
+    @patch('gdrive.utils.time.sleep')  # Skip the backoff delay
+    def test_fatal_errors_are_raised_without_retry(self, mock_sleep):
+        request = MagicMock()
+        request.execute.side_effect = http_error(404, 'notFound')
+
+        # Assertions
+        with self.assertRaises(HttpError) as context:
+            execute_with_retry(request)
+        self.assertEqual(context.exception.resp.status, 404)  # The original error is kept
+        self.assertEqual(request.execute.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @patch('gdrive.utils.time.sleep')  # Skip the backoff delay
+    def test_honors_retry_after(self, mock_sleep):
+        request = MagicMock()
+        request.execute.side_effect = [http_error(429, headers={'retry-after': '3'}), {'id': '1'}]
+
+        result = execute_with_retry(request)
+
+        # Assertions
+        self.assertEqual(result, {'id': '1'})
+        mock_sleep.assert_any_call(3.0)
+
+    @patch('gdrive.utils.time.sleep')  # Skip the backoff delay
+    def test_gives_up_with_last_error(self, mock_sleep):
+        request = MagicMock()
+        request.execute.side_effect = http_error(503)
+
+        # Assertions
+        with self.assertRaises(HttpError):
+            execute_with_retry(request)
+        self.assertEqual(request.execute.call_count, 5)
+
+class TestTokenBucket(unittest.TestCase):
+
+    @patch('gdrive.retry.time.monotonic')
+    def test_waits_when_empty(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        # Assertions
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1)  # Third request waits for the next token
+        mock_monotonic.return_value = 101.0
+        self.assertEqual(bucket.reserve(), 0.0)  # Tokens refill over time
+
+    @patch('gdrive.retry.time.monotonic')
+    def test_pause_holds_back_every_caller(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=10, capacity=10)
+
+        bucket.pause(5)
+
+        # Assertions
+        self.assertAlmostEqual(bucket.reserve(), 5.0)
+        mock_monotonic.return_value = 106.0
+        self.assertEqual(bucket.reserve(), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
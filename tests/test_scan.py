@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock
+from gdrive.scan import scan_drive, scan_tree, tree_from_items
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestScan(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        self.service = MagicMock()  # A mock Google Drive service
+        self.items = [
+            {'id': 'b', 'name': 'b.txt', 'mimeType': 'text/plain', 'parents': ['sub']},
+            {'id': 'sub', 'name': 'sub', 'mimeType': FOLDER, 'parents': ['root']},
+            {'id': 'a', 'name': 'a.txt', 'mimeType': 'text/plain', 'parents': ['root']},
+            {'id': 'elsewhere', 'name': 'x.txt', 'mimeType': 'text/plain', 'parents': ['other']},
+            {'id': 'root', 'name': 'Root', 'mimeType': FOLDER, 'parents': ['drive']},
+        ]
+
+    def test_scan_drive_pages_through_shared_drive(self):
+        self.service.files().list().execute.side_effect = [
+            {'files': self.items[:2], 'nextPageToken': 'token-2'},
+            {'files': self.items[2:]},
+        ]
+        self.service.files().list.reset_mock()
+
+        items = list(scan_drive(self.service, drive_id='drive', fields='files(id, name, mimeType)'))
+
+        # Assertions
+        self.assertEqual(len(items), 5)
+        self.assertEqual(self.service.files().list.call_count, 2)  # One call per page, not per folder
+        _, call_kwargs = self.service.files().list.call_args
+        self.assertEqual(call_kwargs['corpora'], 'drive')
+        self.assertEqual(call_kwargs['driveId'], 'drive')
+        self.assertTrue(call_kwargs['supportsAllDrives'])
+        self.assertTrue(call_kwargs['includeItemsFromAllDrives'])
+        self.assertEqual(call_kwargs['pageToken'], 'token-2')
+        self.assertIn('parents', call_kwargs['fields'])
+
+    def test_tree_from_items_keeps_only_the_subtree(self):
+        tree = tree_from_items(self.items, 'root', 'Root')
+
+        # Assertions
+        self.assertEqual(sorted(tree.nodes), ['a', 'b', 'root', 'sub'])
+        self.assertEqual(tree.root.total_files, 2)
+        self.assertEqual(tree.root.total_folders, 1)
+        self.assertEqual(tree.nodes['b'].parent_id, 'sub')
+
+    def test_scan_tree(self):
+        self.service.files().get().execute.return_value = {'id': 'sub'}
+        self.service.files().list().execute.return_value = {'files': self.items}
+
+        tree = scan_tree(self.service, 'sub')
+
+        # Assertions
+        self.assertEqual([n.id for n in tree.walk()], ['b'])
+        _, call_kwargs = self.service.files().list.call_args
+        self.assertEqual(call_kwargs['corpora'], 'user')
+
+    def test_scan_tree_scans_the_folders_shared_drive(self):
+        self.service.files().get().execute.return_value = {'id': 'sub', 'driveId': 'drive'}
+        self.service.files().list().execute.return_value = {'files': self.items}
+
+        scan_tree(self.service, 'sub')
+
+        # Assertions
+        _, call_kwargs = self.service.files().list.call_args
+        self.assertEqual(call_kwargs['corpora'], 'drive')
+        self.assertEqual(call_kwargs['driveId'], 'drive')
+
+    def test_scan_tree_resolves_the_root_alias(self):
+        self.service.files().get().execute.return_value = {'id': 'root'}
+        self.service.files().list().execute.return_value = {'files': self.items}
+
+        tree = scan_tree(self.service, 'alias')
+
+        # Assertions
+        self.assertEqual(tree.root_id, 'alias')
+        self.assertEqual(tree.nodes['sub'].parent_id, 'alias')
+        self.assertEqual(tree.root.total_files, 2)
+
+    def test_folder_missing_from_the_scan_is_an_error(self):
+        # Assertions
+        with self.assertRaises(ValueError):
+            tree_from_items(self.items, 'on-another-drive')
+        self.assertEqual(tree_from_items(self.items, 'b').total_items(), 0)  # Present, just empty
+
+if __name__ == '__main__':
+    unittest.main()
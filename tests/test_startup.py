@@ -0,0 +1,42 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+from benchmarks.startup import heavy_modules_loaded_by_main
+from gdrive.auth import build, load_discovery_document
+
+class TestStartup(unittest.TestCase):
+
+    def test_main_imports_no_heavy_modules(self):
+        # Assertions
+        self.assertEqual(heavy_modules_loaded_by_main(), [])
+
+    def test_uses_the_bundled_discovery_document(self):
+        document = load_discovery_document()
+
+        # Assertions
+        self.assertIn('"drive"', document)
+        self.assertIs(load_discovery_document(), document)  # Read once per process
+
+    @patch('gdrive.auth.get_static_doc', return_value=None)
+    def test_falls_back_to_the_on_disk_cache(self, mock_get_static_doc):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'drive.v3.json')
+            with open(path, 'w') as f:
+                f.write('{"name": "drive"}')
+
+            # Assertions
+            self.assertEqual(load_discovery_document.__wrapped__(path), '{"name": "drive"}')
+
+    @patch('gdrive.auth.discovery')
+    def test_build_reuses_the_loaded_document(self, mock_discovery):
+        credentials = MagicMock()
+
+        build('drive', 'v3', credentials=credentials)
+
+        # Assertions
+        mock_discovery.build_from_document.assert_called_once_with(load_discovery_document(), credentials=credentials)
+        mock_discovery.build.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
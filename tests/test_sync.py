@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch
+from gdrive.sync import sync_tree_batched, needs_copy
+from gdrive.tree import DriveTree, DriveNode
+from gdrive.traversal import Frontier
+from tests.helpers import unthrottle, request, FakeService
+
+FOLDER = 'application/vnd.google-apps.folder'
+DOC = 'application/vnd.google-apps.document'
+
+class TestNeedsCopy(unittest.TestCase):
+
+    def test_compares_checksums_and_native_policy(self):
+        source = DriveNode('s', 'a.txt', 'text/plain', size='10', md5_checksum='aaa')
+        same = DriveNode('d', 'a.txt', 'text/plain', size='10', md5_checksum='aaa')
+        changed = DriveNode('d', 'a.txt', 'text/plain', size='10', md5_checksum='bbb')
+        doc = DriveNode('s', 'notes', DOC, modified_time='2024-02-01T00:00:00.000Z')
+        older_copy = DriveNode('d', 'notes', DOC, modified_time='2024-01-01T00:00:00.000Z')
+
+        # Assertions
+        self.assertFalse(needs_copy(source, same))
+        self.assertTrue(needs_copy(source, changed))
+        self.assertTrue(needs_copy(doc, older_copy, 'newer'))
+        self.assertFalse(needs_copy(doc, older_copy, 'never'))
+        self.assertFalse(needs_copy(older_copy, doc, 'newer'))
+        self.assertTrue(needs_copy(older_copy, doc, 'always'))
+
+class TestSyncTreeBatched(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        # source: root -> (same.txt, changed.txt, sub -> (new.txt), fresh -> (deep.txt))
+        self.source = DriveTree('src')
+        self.source.add_item({'id': 's-same', 'name': 'same.txt', 'mimeType': 'text/plain', 'size': '1', 'md5Checksum': 'x'}, 'src')
+        self.source.add_item({'id': 's-changed', 'name': 'changed.txt', 'mimeType': 'text/plain', 'size': '2', 'md5Checksum': 'new'}, 'src')
+        self.source.add_item({'id': 's-sub', 'name': 'sub', 'mimeType': FOLDER}, 'src')
+        self.source.add_item({'id': 's-new', 'name': 'new.txt', 'mimeType': 'text/plain', 'size': '3', 'md5Checksum': 'y'}, 's-sub')
+        self.source.add_item({'id': 's-fresh', 'name': 'fresh', 'mimeType': FOLDER}, 'src')
+        self.source.add_item({'id': 's-deep', 'name': 'deep.txt', 'mimeType': 'text/plain', 'size': '4', 'md5Checksum': 'z'}, 's-fresh')
+        self.source.compute_aggregates()
+        # destination: root -> (same.txt, changed.txt (outdated), sub -> ())
+        self.dest = DriveTree('dst')
+        self.dest.add_item({'id': 'd-same', 'name': 'same.txt', 'mimeType': 'text/plain', 'size': '1', 'md5Checksum': 'x'}, 'dst')
+        self.dest.add_item({'id': 'd-changed', 'name': 'changed.txt', 'mimeType': 'text/plain', 'size': '2', 'md5Checksum': 'old'}, 'dst')
+        self.dest.add_item({'id': 'd-sub', 'name': 'sub', 'mimeType': FOLDER}, 'dst')
+        self.dest.compute_aggregates()
+
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    @patch('gdrive.sync.trash_file_request')
+    @patch('gdrive.sync.copy_file_request', side_effect=request)
+    @patch('gdrive.sync.create_folder_request', side_effect=request)
+    def test_copies_only_missing_and_changed_items(self, mock_create_folder_request, mock_copy_file_request,
+                                                   mock_trash_file_request, mock_sleep):
+        mock_trash_file_request.side_effect = lambda service, file_id: {'key': f'trash-{file_id}'}
+        service = FakeService()
+
+        stats = sync_tree_batched(service, self.source, self.dest)
+
+        # Assertions
+        self.assertEqual(stats, {'copied': 3, 'replaced': 1, 'skipped': 2, 'failed': 0})
+        self.assertIn({'key': 's-new', 'parent': 'd-sub'}, service.executed)  # Existing folder reused
+        self.assertIn({'key': 's-deep', 'parent': 'new-s-fresh'}, service.executed)  # Created folder filled
+        self.assertIn({'key': 'trash-d-changed'}, service.executed)  # Outdated copy replaced
+        self.assertNotIn('s-same', [request['key'] for request in service.executed])
+
+    @patch('gdrive.traversal.SPILL_CHUNK_SIZE', 2)
+    @patch('gdrive.traversal._max_in_memory', 2)  # Force the frontier to spill
+    @patch('gdrive.batch.time.sleep')  # Skip the backoff delays
+    @patch('gdrive.sync.trash_file_request', side_effect=lambda service, file_id: {'key': f'trash-{file_id}'})
+    @patch('gdrive.sync.copy_file_request', side_effect=request)
+    @patch('gdrive.sync.create_folder_request', side_effect=request)
+    def test_wide_trees_spill_the_frontier(self, mock_create_folder_request, mock_copy_file_request,
+                                           mock_trash_file_request, mock_sleep):
+        # Half of the 200 subfolders already exist in the destination, each holding one new file
+        for i in range(200):
+            self.source.add_item({'id': f's-wide{i}', 'name': f'wide{i}', 'mimeType': FOLDER}, 'src')
+            self.source.add_item({'id': f's-file{i}', 'name': 'file.txt', 'mimeType': 'text/plain', 'size': '1'}, f's-wide{i}')
+            if i % 2:
+                self.dest.add_item({'id': f'd-wide{i}', 'name': f'wide{i}', 'mimeType': FOLDER}, 'dst')
+        service = FakeService()
+        spill = Frontier._spill
+
+        with patch.object(Frontier, '_spill', autospec=True, side_effect=spill) as mock_spill:
+            stats = sync_tree_batched(service, self.source, self.dest)
+
+        # Assertions
+        self.assertTrue(mock_spill.called)
+        self.assertEqual(stats['copied'], 3 + 100 + 200)  # The original new items, the missing folders and every file
+        self.assertEqual(stats['skipped'], 2 + 100)
+        self.assertIn({'key': 's-file1', 'parent': 'd-wide1'}, service.executed)
+        self.assertIn({'key': 's-file0', 'parent': 'new-s-wide0'}, service.executed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+from unittest.mock import patch
+from benchmarks.fake_drive import FakeDrive
+from gdrive.crawler import crawl_tree
+from gdrive.pipeline import copy_tree_pipelined
+from tests.helpers import unthrottle
+from gdrive.traversal import Frontier, traverse, SPILL_CHUNK_SIZE
+from gdrive.tree import DriveTree
+from gdrive.verify import verify_folders
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestFrontier(unittest.TestCase):
+
+    def test_spills_to_disk_and_keeps_fifo_order(self):
+        entries = [f'folder-{i}' if i % 2 else (f'src-{i}', f'dst-{i}', f'/path/{i}') for i in range(5000)]
+        frontier = Frontier(max_in_memory=10)
+        popped = []
+
+        for i, entry in enumerate(entries):
+            frontier.append(entry)
+            if i % 3 == 0:
+                popped.append(frontier.popleft())  # Interleaved, as a traversal does
+            # Memory stays bounded while the rest waits on disk
+            self.assertLessEqual(len(frontier._head), 10)
+            self.assertLess(len(frontier._tail), SPILL_CHUNK_SIZE)
+        spill_path = frontier.spill_path
+        popped.extend(frontier.pop_many(len(frontier)))
+        frontier.close()
+
+        # Assertions
+        self.assertIsNotNone(spill_path)
+        self.assertEqual(popped, entries)
+        self.assertFalse(os.path.exists(spill_path))  # Removed on close
+
+    def test_small_frontiers_stay_in_memory(self):
+        with Frontier(['a', 'b'], max_in_memory=10) as frontier:
+            # Assertions
+            self.assertEqual(frontier.peek(), 'a')
+            self.assertEqual(frontier.pop_many(5), ['a', 'b'])
+            self.assertIsNone(frontier.spill_path)
+            self.assertFalse(frontier)
+
+    def test_traverse_yields_every_task_once(self):
+        frontier = Frontier([1], max_in_memory=4)
+        seen = []
+
+        # Every task n < 500 adds 2n and 2n + 1, a binary tree of 499 tasks
+        for task, children in traverse(frontier, lambda n: [c for c in (2 * n, 2 * n + 1) if c < 500], workers=4):
+            seen.append(task)
+            frontier.extend(children)
+        frontier.close()
+
+        # Assertions
+        self.assertEqual(sorted(seen), list(range(1, 500)))
+
+class TestDeepTrees(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        unthrottle(self)  # Don't throttle the fake service
+        # A chain of folders far deeper than the recursion limit, one file per level
+        self.depth = 3000
+        self.drive = FakeDrive()
+        self.root = folder_id = self.drive.add_folder('root', folder_id='root')
+        for level in range(self.depth):
+            self.drive.add_item({'id': f'file-{level}', 'name': 'file.txt', 'mimeType': 'text/plain', 'size': '1'}, folder_id)
+            folder_id = self.drive.add_folder(f'level-{level}', folder_id)
+
+    @patch('gdrive.traversal._max_in_memory', 2)  # Force every frontier to spill
+    def test_crawl_and_verify_a_deep_chain(self):
+        tree = crawl_tree(self.drive, self.root, workers=4, service_factory=lambda: self.drive, coalesce=True)
+        serial = DriveTree.build(self.drive, self.root)
+        copy = self.drive.add_folder('copy')
+        copy_tree_pipelined(self.drive, tree, copy, workers=4, service_factory=lambda: self.drive)
+        differences = verify_folders(self.drive, self.root, copy, tree, workers=4, service_factory=lambda: self.drive)
+
+        # Assertions
+        self.assertEqual((tree.root.total_files, tree.root.total_folders), (self.depth, self.depth))
+        self.assertEqual(serial.total_items(), tree.total_items())
+        self.assertEqual(differences, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from gdrive.tree import DriveTree
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+class TestDriveTree(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        self.service = MagicMock()  # A mock Google Drive service
+        # root -> file1, sub -> (file2, file3, empty)
+        self.listings = {
+            'root': [
+                {'id': 'file1', 'name': 'file1.txt', 'mimeType': 'text/plain', 'size': '10'},
+                {'id': 'sub', 'name': 'sub', 'mimeType': FOLDER},
+            ],
+            'sub': [
+                {'id': 'file2', 'name': 'file2.txt', 'mimeType': 'text/plain', 'size': '20'},
+                {'id': 'file3', 'name': 'file3.txt', 'mimeType': 'text/plain', 'size': '30'},
+                {'id': 'empty', 'name': 'empty', 'mimeType': FOLDER},
+            ],
+            'empty': [],
+        }
+
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_build_lists_each_folder_once(self, mock_list_drive_files):
+        mock_list_drive_files.side_effect = lambda service, folder_id, fields, **kwargs: iter(self.listings[folder_id])
+
+        tree = DriveTree.build(self.service, 'root', 'Root')
+
+        # Assertions
+        self.assertEqual(mock_list_drive_files.call_count, 3)  # One listing per folder
+        self.assertEqual(tree.total_items(), 5)
+        self.assertEqual(tree.root.total_files, 3)
+        self.assertEqual(tree.root.total_folders, 2)
+        self.assertEqual(tree.nodes['sub'].file_count, 2)
+        self.assertEqual(tree.nodes['sub'].folder_count, 1)
+        self.assertEqual([n.id for n in tree.walk()], ['file1', 'sub', 'file2', 'file3', 'empty'])
+
+    @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
+    def test_folder_contents_matches_api_items(self, mock_list_drive_files):
+        mock_list_drive_files.side_effect = lambda service, folder_id, fields, **kwargs: iter(self.listings[folder_id])
+
+        tree = DriveTree.build(self.service, 'root')
+
+        # Assertions
+        self.assertEqual(tree.folder_contents('root'), self.listings['root'])
+
+    def test_nodes_are_compact(self):
+        tree = DriveTree('root')
+        # Decoded separately, as every item of an API response is
+        first = tree.add_item({'id': 'a', 'name': 'a.pdf', 'mimeType': ''.join(['application/', 'pdf'])}, 'root')
+        second = tree.add_item({'id': 'b', 'name': 'b.pdf', 'mimeType': ''.join(['application/', 'pdf'])}, 'root')
+
+        # Assertions
+        self.assertFalse(hasattr(first, '__dict__'))  # __slots__ only
+        self.assertIs(first.mime_type, second.mime_type)  # One interned string per MIME type
+        self.assertIs(first.children, second.children)  # Files share the empty children sequence
+        self.assertIsInstance(tree.root.children, list)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from gdrive.usage import compute_storage_usage, format_bytes
+from gdrive.tree import DriveTree
+
+FOLDER = 'application/vnd.google-apps.folder'
+DOC = 'application/vnd.google-apps.document'
+
+class TestStorageUsage(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        # root -> (small.txt, big -> (huge.bin, nested -> (mid.bin, notes)), empty)
+        self.tree = DriveTree('root')
+        self.tree.add_item({'id': 'small', 'name': 'small.txt', 'mimeType': 'text/plain', 'size': '10'}, 'root')
+        self.tree.add_item({'id': 'big', 'name': 'big', 'mimeType': FOLDER}, 'root')
+        self.tree.add_item({'id': 'huge', 'name': 'huge.bin', 'mimeType': 'application/octet-stream', 'size': '1000'}, 'big')
+        self.tree.add_item({'id': 'nested', 'name': 'nested', 'mimeType': FOLDER}, 'big')
+        self.tree.add_item({'id': 'mid', 'name': 'mid.bin', 'mimeType': 'application/octet-stream', 'size': '100'}, 'nested')
+        self.tree.add_item({'id': 'notes', 'name': 'notes', 'mimeType': DOC, 'quotaBytesUsed': '5'}, 'nested')
+        self.tree.add_item({'id': 'empty', 'name': 'empty', 'mimeType': FOLDER}, 'root')
+        self.tree.compute_aggregates()
+
+    def test_rolls_up_bytes_bottom_up(self):
+        usage = compute_storage_usage(self.tree, top_n=2)
+
+        # Assertions
+        self.assertEqual(usage.total_bytes, 1115)
+        self.assertEqual(usage.folder_bytes['nested'], 105)  # quotaBytesUsed counts for Google-native files
+        self.assertEqual(usage.folder_files['big'], 3)
+        self.assertEqual(usage.folder_bytes['empty'], 0)
+        self.assertEqual([(size, node.id) for size, node in usage.top_folders], [(1105, 'big'), (105, 'nested')])
+        self.assertEqual([(size, node.id) for size, node in usage.top_files], [(1000, 'huge'), (100, 'mid')])
+        self.assertEqual(usage.by_mime_type['application/octet-stream'], [2, 1100])
+        self.assertEqual(usage.by_mime_type[DOC], [1, 5])
+
+    def test_top_zero_lists_nothing(self):
+        usage = compute_storage_usage(self.tree, top_n=0)
+
+        # Assertions
+        self.assertEqual(usage.total_bytes, 1115)
+        self.assertEqual(usage.top_folders, [])
+        self.assertEqual(usage.top_files, [])
+
+    def test_format_bytes(self):
+        # Assertions
+        self.assertEqual(format_bytes(512), '512 B')
+        self.assertEqual(format_bytes(1536), '1.5 KiB')
+        self.assertEqual(format_bytes(3 * 1024 ** 4), '3.0 TiB')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,26 @@
 import unittest
+import httplib2
 from unittest.mock import patch, MagicMock
-from gdrive.utils import list_drive_files, count_files_and_folders, count_children_recursively, are_folders_identical
+from googleapiclient.errors import HttpError
+from tests.helpers import unthrottle
+from gdrive.utils import (
+    list_drive_files, list_drive_files_in_folders, coalesce_folder_ids, build_parents_query,
+    count_files_and_folders, count_children_recursively, are_folders_identical
+)
 
 class TestUtils(unittest.TestCase):
 
     # Called before every test method
     def setUp(self):
+        unthrottle(self)  # Don't throttle the mock service
         self.service = MagicMock()  # A mock Google Drive service
 
     # Called after every test method
     def tearDown(self):
         pass
 
-    def test_list_drive_files_with_retry(self):
+    @patch('gdrive.utils.time.sleep')  # Skip the backoff delay
+    def test_list_drive_files_with_retry(self, mock_sleep):
         mock_files = {
             'files': [
                 {'id': '1', 'name': 'file1.txt', 'mimeType': 'text/plain'},
@@ -20,19 +28,72 @@ class TestUtils(unittest.TestCase):
             ]
         }
 
-        # First call raises an exception, second call succeeds
-        self.service.files().list().execute.side_effect = [Exception("Temporary error"), mock_files]
+        # First call fails with a transient server error, second call succeeds
+        temporary_error = HttpError(httplib2.Response({'status': 503}), b'Temporary error', uri='http://mock.url')
+        self.service.files().list().execute.side_effect = [temporary_error, mock_files]
 
         # Call the function
         folder_id = '123456'
         fields = 'files(id, name, mimeType)'
-        files = list_drive_files(self.service, folder_id, fields)
+        files = list(list_drive_files(self.service, folder_id, fields))
 
         # Assertions
         self.assertEqual(len(files), 2)
         self.assertEqual(files[0]['name'], 'file1.txt')
         self.assertEqual(self.service.files().list.call_count, 2)  # Should be called twice due to retry
 
+    def test_list_drive_files_follows_page_tokens(self):
+        first_page = {
+            'files': [{'id': '1', 'name': 'file1.txt', 'mimeType': 'text/plain'}],
+            'nextPageToken': 'token-2',
+        }
+        second_page = {
+            'files': [{'id': '2', 'name': 'file2.txt', 'mimeType': 'text/plain'}],
+        }
+        self.service.files().list().execute.side_effect = [first_page, second_page]
+        self.service.files().list.reset_mock()
+
+        # Call the function
+        files = list(list_drive_files(self.service, '123456', 'files(id, name, mimeType)'))
+
+        # Assertions
+        self.assertEqual([f['id'] for f in files], ['1', '2'])
+        self.assertEqual(self.service.files().list.call_count, 2)  # One call per page
+        _, second_call_kwargs = self.service.files().list.call_args
+        self.assertEqual(second_call_kwargs['pageToken'], 'token-2')
+        self.assertEqual(second_call_kwargs['pageSize'], 1000)
+        self.assertIn('nextPageToken', second_call_kwargs['fields'])
+
+    def test_list_drive_files_in_folders_splits_by_parent(self):
+        mock_files = {
+            'files': [
+                {'id': '1', 'name': 'file1.txt', 'mimeType': 'text/plain', 'parents': ['a']},
+                {'id': '2', 'name': 'file2.txt', 'mimeType': 'text/plain', 'parents': ['other', 'b']},
+            ]
+        }
+        self.service.files().list().execute.return_value = mock_files
+        self.service.files().list.reset_mock()
+
+        # Call the function
+        items = list(list_drive_files_in_folders(self.service, ['a', 'b'], 'files(id, name, mimeType)'))
+
+        # Assertions
+        self.assertEqual([(parent, item['id']) for parent, item in items], [('a', '1'), ('b', '2')])
+        _, call_kwargs = self.service.files().list.call_args
+        self.assertEqual(call_kwargs['q'], "('a' in parents or 'b' in parents) and trashed=false")
+        self.assertIn('parents', call_kwargs['fields'])
+
+    def test_coalesce_folder_ids_respects_query_length(self):
+        folder_ids = [f'folder{i:03d}' for i in range(100)]
+
+        groups = coalesce_folder_ids(folder_ids, max_query_length=500)
+
+        # Assertions
+        self.assertEqual([folder_id for group in groups for folder_id in group], folder_ids)
+        self.assertGreater(len(groups), 1)
+        for group in groups:
+            self.assertLessEqual(len(build_parents_query(group)), 500)
+
     @patch('gdrive.utils.list_drive_files')  # Mock the list_drive_files function
     def test_count_files_and_folders(self, mock_list_drive_files):
         # Setup the mock to return a fake list of files and folders
@@ -47,7 +108,7 @@ class TestUtils(unittest.TestCase):
         file_count, folder_count = count_files_and_folders(self.service, folder_id)
 
         # Assertions
-        mock_list_drive_files.assert_called_once_with(self.service, folder_id, 'files(id, mimeType)')
+        mock_list_drive_files.assert_called_once_with(self.service, folder_id, 'files(mimeType)')  # Counting needs only the mimeType
         self.assertEqual(file_count, 1)
         self.assertEqual(folder_count, 1)
 
@@ -86,8 +147,8 @@ class TestUtils(unittest.TestCase):
 
         # Assertions
         self.assertTrue(result)
-        mock_get_folder_contents.assert_any_call(self.service, folder_id1)
-        mock_get_folder_contents.assert_any_call(self.service, folder_id2)
+        mock_get_folder_contents.assert_any_call(self.service, folder_id1, use_cache=True)
+        mock_get_folder_contents.assert_any_call(self.service, folder_id2, use_cache=False)  # The copy side is never cached
 
 if __name__ == '__main__':
     unittest.main()
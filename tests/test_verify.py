@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from gdrive.verify import verify_folders, iter_differences, merge_join, MISSING, EXTRA, SIZE, CHECKSUM
+from gdrive.utils import are_folders_identical
+from gdrive.tree import DriveTree
+
+FOLDER = 'application/vnd.google-apps.folder'
+DOC = 'application/vnd.google-apps.document'
+
+def item(id, name, mime_type='text/plain', **extra):
+    return {'id': id, 'name': name, 'mimeType': mime_type, **extra}
+
+class TestVerifyFolders(unittest.TestCase):
+
+    # Called before every test method
+    def setUp(self):
+        self.service = MagicMock()  # A mock Google Drive service
+        self.listings = {
+            'src': [
+                item('s1', 'same.txt', size='1', md5Checksum='a'),
+                item('s2', 'dup.txt', size='1', md5Checksum='x'),
+                item('s3', 'dup.txt', size='2', md5Checksum='y'),
+                item('s4', 'edited.txt', size='5', md5Checksum='old'),
+                item('s5', 'notes', DOC),
+                item('s6', 'sub', FOLDER),
+            ],
+            'dst': [
+                # Same duplicates, listed in the opposite order
+                item('d3', 'dup.txt', size='2', md5Checksum='y'),
+                item('d2', 'dup.txt', size='1', md5Checksum='x'),
+                item('d1', 'same.txt', size='1', md5Checksum='a'),
+                item('d4', 'edited.txt', size='5', md5Checksum='new'),
+                item('d5', 'notes', DOC),
+                item('d6', 'sub', FOLDER),
+                item('d7', 'stray.txt', size='1'),
+            ],
+            's6': [item('s8', 'inner.bin', size='10'), item('s9', 'lost.txt', size='1')],
+            'd6': [item('d8', 'inner.bin', size='11')],
+        }
+
+    def list_folder(self, service, folder_id, use_cache=True):
+        return list(self.listings[folder_id])
+
+    def test_merge_join_pairs_duplicates(self):
+        pairs = list(merge_join(self.listings['src'][1:3], self.listings['dst'][:2]))
+
+        # Assertions
+        self.assertEqual([(s['id'], d['id']) for s, d in pairs], [('s2', 'd2'), ('s3', 'd3')])
+
+    @patch('gdrive.utils.get_folder_contents')  # Mock the get_folder_contents function
+    def test_reports_every_difference(self, mock_get_folder_contents):
+        mock_get_folder_contents.side_effect = self.list_folder
+
+        differences = verify_folders(self.service, 'src', 'dst', workers=3, service_factory=lambda: self.service)
+
+        # Assertions
+        self.assertCountEqual([(d.kind, d.path) for d in differences], [
+            (CHECKSUM, '/edited.txt'),
+            (EXTRA, '/stray.txt'),
+            (SIZE, '/sub/inner.bin'),
+            (MISSING, '/sub/lost.txt'),
+        ])
+        self.assertEqual(differences[0].to_dict()['kind'], differences[0].kind)
+
+    @patch('gdrive.utils.get_folder_contents')  # Mock the get_folder_contents function
+    def test_source_side_can_come_from_snapshot(self, mock_get_folder_contents):
+        mock_get_folder_contents.side_effect = self.list_folder
+        tree = DriveTree('src')
+        for listed in self.listings['src']:
+            tree.add_item(listed, 'src')
+        for listed in self.listings['s6']:
+            tree.add_item(listed, 's6')
+        tree.compute_aggregates()
+
+        differences = list(iter_differences(self.service, 'src', 'dst', source_tree=tree, workers=1))
+
+        # Assertions
+        self.assertEqual(len(differences), 4)
+        listed_ids = [call.args[1] for call in mock_get_folder_contents.call_args_list]
+        self.assertCountEqual(listed_ids, ['dst', 'd6'])  # Only the destination is listed
+
+    @patch('gdrive.utils.get_folder_contents')  # Mock the get_folder_contents function
+    def test_are_folders_identical_reports_size_mismatch(self, mock_get_folder_contents):
+        # A size mismatch used to crash on logging.WARNING(...)
+        mock_get_folder_contents.side_effect = [[item('1', 'a.txt', size='1')], [item('2', 'a.txt', size='2')]]
+
+        # Assertions
+        self.assertFalse(are_folders_identical(self.service, 'src', 'dst'))
+
+if __name__ == '__main__':
+    unittest.main()